@@ -1,4 +1,5 @@
 # __init__.py (Root level)
+from . import controllers
 from . import models
 from . import report
 from . import wizards
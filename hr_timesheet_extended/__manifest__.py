@@ -1,6 +1,6 @@
 {
     'name': 'Extended HR Timesheet with Approval Workflow',
-    'version': '17.0.1.0.0',
+    'version': '17.0.1.1.0',
     'category': 'Human Resources/Timesheets',
     'summary': 'Enhanced timesheet with hierarchical approval workflow and payroll integration',
     'description': """
@@ -35,14 +35,27 @@ This module extends the standard HR Timesheet functionality with:
         'security/ir.model.access.csv',
         'wizards/hr_timesheet_rejection_wizard_views.xml',
         'wizards/hr_timesheet_to_payroll_wizard_views.xml',
+        'wizards/hr_timesheet_approval_export_wizard_views.xml',
+        'wizards/hr_timesheet_period_close_wizard_views.xml',
         'data/hr_timesheet_data.xml',
+        'data/ir_cron_data.xml',
         'views/hr_timesheet_grid_views.xml',
         'views/hr_timesheet_views.xml',
         'views/hr_timesheet_approval_views.xml',
         'views/calendar_event_views.xml',
+        'views/hr_timesheet_daily_summary_views.xml',
+        'views/hr_timesheet_approval_job_views.xml',
+        'views/timesheet_line_report_views.xml',
+        'views/hr_timesheet_approval_inbox_views.xml',
+        'views/res_users_views.xml',
         'report/timesheet_approval_report_templates.xml'
 
     ],
+    'assets': {
+        'web.assets_backend': [
+            'hr_timesheet_extended/static/src/**/*',
+        ],
+    },
 
     'installable': True,
     'application': False,
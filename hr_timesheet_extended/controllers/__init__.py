@@ -0,0 +1,2 @@
+# controllers/__init__.py
+from . import main
@@ -0,0 +1,10 @@
+from odoo import http
+from odoo.http import request
+
+
+class TimesheetApprovalController(http.Controller):
+
+    @http.route('/hr_timesheet_extended/pending_approvals', type='json', auth='user')
+    def pending_approvals(self):
+        """Per-stage counts, hours and oldest waiting age of the approvals waiting on the current user"""
+        return request.env['hr.timesheet.approval']._get_pending_summary()
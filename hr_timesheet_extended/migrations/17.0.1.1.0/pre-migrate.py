@@ -0,0 +1,30 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """
+    Report the overlapping approval periods of an employee before the
+    employee_period_excl exclusion constraint is added. The constraint cannot
+    be created while they exist; until they are fixed, the module falls back
+    to the Python overlap check for new and modified approvals.
+    """
+    if not version:
+        return
+    cr.execute("""
+        SELECT a.employee_id, a.id, a.name, a.date_start, a.date_end, b.id, b.name, b.date_start, b.date_end
+          FROM hr_timesheet_approval a
+          JOIN hr_timesheet_approval b
+            ON b.employee_id = a.employee_id
+           AND b.id > a.id
+           AND daterange(b.date_start, b.date_end, '[]') && daterange(a.date_start, a.date_end, '[]')
+      ORDER BY a.employee_id, a.id, b.id
+    """)
+    overlaps = cr.fetchall()
+    for employee_id, id_a, name_a, start_a, end_a, id_b, name_b, start_b, end_b in overlaps:
+        _logger.warning("Timesheet approvals %s (id %s, %s - %s) and %s (id %s, %s - %s) of employee %s overlap",
+                        name_a, id_a, start_a, end_a, name_b, id_b, start_b, end_b, employee_id)
+    if overlaps:
+        _logger.warning("%s overlapping timesheet approval pairs found: the employee_period_excl constraint "
+                        "will not be created until their periods are corrected", len(overlaps))
@@ -3,6 +3,15 @@ from . import timesheet_approval_mixin
 from . import hr_timesheet
 from . import hr_timesheet_approval
 from . import calendar_event
+from . import hr_timesheet_expected_hours
+from . import resource_calendar
+from . import hr_contract
+from . import hr_timesheet_daily_summary
+from . import res_users
+from . import hr_timesheet_approval_job
+from . import hr_timesheet_payroll_shard
+from . import hr_timesheet_approval_inbox
+from . import hr_timesheet_approval_notification
 
 
 
@@ -1,9 +1,14 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
+from datetime import timedelta
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Event fields that change the meeting timesheets of the attendees
+TIMESHEET_SYNC_FIELDS = {'name', 'start', 'stop', 'duration', 'allday', 'partner_ids',
+                         'timesheet_project_id', 'timesheet_task_id'}
+
 
 class CalendarEvent(models.Model):
     _inherit = 'calendar.event'
@@ -16,6 +21,8 @@ class CalendarEvent(models.Model):
                                            domain=[('allow_timesheets', '=', True)])
     timesheet_task_id = fields.Many2one('project.task', string='task',
                                         domain="[('project_id', '=', timesheet_project_id)]")
+    # أحداث متكررة مؤجلة: لم يتم إنشاء جداولها الزمنية بعد
+    timesheet_pending = fields.Boolean(string='Timesheets Pending', copy=False, index=True, readonly=True)
 
     @api.onchange('timesheet_project_id')
     def _onchange_timesheet_project_id(self):
@@ -35,66 +42,233 @@ class CalendarEvent(models.Model):
         # إنشاء أحداث التقويم بشكل طبيعي
         events = super(CalendarEvent, self).create(vals_list)
 
-        # ثم إنشاء سجلات جدول الزمني لكل حدث
-        for event in events:
-            self._create_timesheet_for_event(event)
+        # ثم إنشاء سجلات جدول الزمني لجميع الأحداث دفعة واحدة
+        self._create_timesheets_for_events(events)
 
         return events
 
+    def write(self, vals):
+        res = super(CalendarEvent, self).write(vals)
+        # مزامنة الجداول الزمنية فقط عند تغيير الحقول المؤثرة عليها
+        if TIMESHEET_SYNC_FIELDS.intersection(vals):
+            self._sync_timesheets()
+        return res
+
+    def unlink(self):
+        # حذف إدخالات المسودة فقط، والإدخالات المقدمة أو المعتمدة تبقى بدون اجتماع
+        # (إدخالات جميع الحاضرين، لذلك يتم البحث عنها بصلاحيات النظام)
+        lines = self._get_meeting_timesheets()
+        protected = lines.filtered(lambda line: line._is_meeting_line_protected())
+        if protected:
+            _logger.info("الاحتفاظ بـ %s إدخال جدول زمني مقدم أو معتمد عند حذف الاجتماعات", len(protected))
+        (lines - protected).unlink()
+        return super(CalendarEvent, self).unlink()
+
     def _create_timesheet_for_event(self, event):
         """
         إنشاء إدخالات جدول زمني لجميع الحاضرين بناءً على مدة الاجتماع
         """
-        # تخطي الأحداث التي تستمر طوال اليوم
-        if event.allday:
-            return
+        return self._create_timesheets_for_events(event)
+
+    @api.model
+    def _create_timesheets_for_events(self, events):
+        """
+        إنشاء إدخالات جدول زمني لجميع الحاضرين في جميع الأحداث بطلب إنشاء واحد
+
+        :return: the created ``account.analytic.line`` records
+        """
+        return events._sync_timesheets()
+
+    def _filter_timesheet_project_access(self):
+        """
+        Return the events whose organizer (or the current user, for events
+        without one) can read the timesheet project: the lines are written as
+        superuser, so the project must be one the organizer could book time on.
+        """
+        allowed = self.browse()
+        for event in self:
+            project = event.timesheet_project_id
+            user = event.user_id or self.env.user
+            if not project or (project.with_user(user).check_access_rights('read', raise_exception=False)
+                               and project.with_user(user)._filter_access_rules('read')):
+                allowed |= event
+            else:
+                _logger.warning("Meeting %s: the organizer %s cannot read the project %s, timesheets not synced",
+                                event.id, user.login, project.id)
+        return allowed
+
+    @api.model
+    def _get_locked_timesheet_days(self, vals_list):
+        """Return the (employee_id, date) pairs of ``vals_list`` covered by a submitted or approved approval"""
+        covering = self.env['hr.timesheet.approval'].sudo()._get_covering_approvals(
+            (vals['employee_id'], vals['date']) for vals in vals_list)
+        return {key for key, approval in covering.items() if approval._locks_timesheets()}
+
+    def _get_meeting_timesheets(self):
+        """Return the timesheet lines of the events, whoever their attendees are, as superuser"""
+        return self.env['account.analytic.line'].sudo().search([('calendar_event_id', 'in', self.ids)])
+
+    @api.model
+    def _get_partner_employees(self, partners):
+        """Return {partner_id: employee} of the employees whose user is linked to the partners, in one query"""
+        employees = self.env['hr.employee'].sudo().search([('user_id.partner_id', 'in', partners.ids)])
+        partner_employees = {}
+        for employee in employees:
+            partner_employees.setdefault(employee.user_id.partner_id.id, employee)
+        return partner_employees
 
-        # تخطي إذا لم يتم تحديد مشروع أو مهمة
-        if not event.timesheet_project_id or not event.timesheet_task_id:
+    def _get_expected_timesheet_vals(self):
+        """
+        Return {(event_id, employee_id): vals} of the meeting timesheets the
+        events should have, resolving all attendees in one query.
+        """
+        # تخطي الأحداث التي تستمر طوال اليوم أو بدون مشروع أو مهمة
+        events = self.filtered(lambda e: not e.allday and e.timesheet_project_id and e.timesheet_task_id)
+        if len(events) < len(self.filtered(lambda e: not e.allday)):
             _logger.info("تخطي إنشاء الجدول الزمني: المشروع أو المهمة غير محددة")
-            return
 
-        # استخدام المشروع والمهمة المحددين في النموذج
-        project_id = event.timesheet_project_id.id
-        task_id = event.timesheet_task_id.id
+        # البحث عن الموظفين المرتبطين بجميع الحاضرين باستعلام واحد
+        partner_employees = self._get_partner_employees(events.partner_ids)
 
-        # حساب المدة بالساعات
-        duration = event.duration
-        created_timesheets = self.env['account.analytic.line']
+        expected = {}
+        for event in events:
+            for partner in event.partner_ids:
+                employee = partner_employees.get(partner.id)
+                if not employee:
+                    _logger.info("تخطي إنشاء الجدول الزمني للشريك %s: لا يوجد موظف مرتبط", partner.name)
+                    continue
+                expected[(event.id, employee.id)] = event._prepare_timesheet_vals(employee)
+        return expected
 
-        # إنشاء timesheet لكل شريك (حاضر) له موظف مرتبط
-        for partner in event.partner_ids:
-            # البحث عن الموظف المرتبط بالشريك
-            employee = self.env['hr.employee'].search([('user_id.partner_id', '=', partner.id)], limit=1)
-            if not employee:
-                _logger.info("تخطي إنشاء الجدول الزمني للشريك %s: لا يوجد موظف مرتبط", partner.name)
-                continue
+    @api.model
+    def _is_lazy_recurring_mode(self):
+        return self.env['ir.config_parameter'].sudo().get_param(
+            'hr_timesheet_extended.recurring_timesheet_mode', 'eager') == 'lazy'
 
-            # التحقق من وجود مستخدم مرتبط بالموظف
-            if not employee.user_id:
-                _logger.info("تخطي إنشاء الجدول الزمني للموظف %s: لا يوجد مستخدم مرتبط", employee.name)
+    def _split_deferred_events(self):
+        """
+        Return the events to sync now and the future occurrences of recurring
+        events whose timesheets are deferred until they have passed (lazy mode).
+        Occurrences that already have timesheets are always synced, so that a
+        rescheduled meeting does not keep stale lines until the cron runs.
+        """
+        if not self._is_lazy_recurring_mode():
+            return self, self.browse()
+        now = fields.Datetime.now()
+        deferred = self.filtered(lambda e: e.recurrency and e.stop and e.stop > now)
+        if deferred:
+            deferred -= deferred._get_meeting_timesheets().calendar_event_id
+        return self - deferred, deferred
+
+    def _sync_timesheets(self, force=False):
+        """
+        Bring the meeting timesheets of the events in line with their attendees,
+        time and project: missing lines are created, changed draft lines are
+        updated and draft lines of removed attendees are deleted. Submitted,
+        approved and validated lines, and the days of submitted or approved
+        approvals, are never touched.
+
+        The lines belong to all the attendees, so they are written as superuser,
+        on the lines of these events only: any user allowed to edit a meeting can
+        move or cancel it without access to the timesheets of the others. Events
+        whose organizer cannot read the project are left out.
+
+        :param force: also sync the future occurrences deferred in lazy mode
+        :return: the created ``account.analytic.line`` records
+        """
+        AnalyticLine = self.env['account.analytic.line'].sudo()
+        events, deferred = (self, self.browse()) if force else self._split_deferred_events()
+        deferred.sudo().filtered(lambda e: not e.timesheet_pending).write({'timesheet_pending': True})
+        events.sudo().filtered('timesheet_pending').write({'timesheet_pending': False})
+        events = events._filter_timesheet_project_access()
+        expected = events._get_expected_timesheet_vals()
+        locked_days = events._get_locked_timesheet_days(expected.values())
+
+        # البحث عن الإدخالات الموجودة أولاً وتحديثها، بدلاً من الاعتماد على القيد الفريد
+        existing = {}
+        for line in events._get_meeting_timesheets():
+            existing.setdefault((line.calendar_event_id.id, line.employee_id.id), line)
+
+        to_unlink = AnalyticLine
+        updates = {}
+        for key, line in existing.items():
+            if line._is_meeting_line_protected():
+                continue
+            vals = expected.get(key)
+            if vals is None:
+                to_unlink |= line
                 continue
+            if (vals['employee_id'], vals['date']) in locked_days:
+                continue
+            changes = line._get_meeting_line_changes(vals)
+            if changes:
+                updates.setdefault(tuple(sorted(changes.items())), []).append(line.id)
+
+        if to_unlink:
+            to_unlink.unlink()
+        # إدخالات الاجتماع نفسه تتغير بنفس القيم، لذلك يتم تجميعها في كتابة واحدة
+        for changes, line_ids in updates.items():
+            AnalyticLine.browse(line_ids).write(dict(changes))
+
+        vals_list = [vals for key, vals in expected.items()
+                     if key not in existing and (vals['employee_id'], vals['date']) not in locked_days]
+        created_timesheets = AnalyticLine
+        for vals, (timesheet, error) in zip(vals_list, AnalyticLine._create_rows_safe(vals_list)):
+            if error:
+                _logger.error("فشل إنشاء إدخال الجدول الزمني للموظف %s للاجتماع %s: %s",
+                              vals['employee_id'], vals['calendar_event_id'], error)
+            else:
+                created_timesheets |= timesheet
+
+        if vals_list or updates or to_unlink:
+            _logger.info("مزامنة الجداول الزمنية لـ %s اجتماع: %s إنشاء، %s تحديث، %s حذف",
+                         len(events), len(created_timesheets), sum(len(ids) for ids in updates.values()),
+                         len(to_unlink))
+        return created_timesheets
+
+    @api.model
+    def _cron_materialize_timesheets(self, batch_size=200):
+        """Create the timesheets of the deferred recurring occurrences that have passed"""
+        events = self.search([
+            ('timesheet_pending', '=', True),
+            ('stop', '<=', fields.Datetime.now()),
+        ], order='stop', limit=batch_size)
+        events._sync_timesheets(force=True)
+        if len(events) == batch_size:
+            self.env.ref('hr_timesheet_extended.ir_cron_materialize_recurring_timesheets')._trigger()
+
+    @api.model
+    def _materialize_period_timesheets(self, periods):
+        """
+        Create the deferred timesheets of the meetings of many
+        (partner_id, date_from, date_to) periods, before these periods are
+        submitted for approval.
+        """
+        periods = [period for period in periods if period[0]]
+        if not periods:
+            return
+        events = self.sudo().search([
+            ('timesheet_pending', '=', True),
+            ('partner_ids', 'in', [period[0] for period in periods]),
+            ('start', '>=', fields.Datetime.to_datetime(min(period[1] for period in periods))),
+            ('start', '<', fields.Datetime.to_datetime(max(period[2] for period in periods)) + timedelta(days=1)),
+        ])
+        events = events.filtered(lambda event: any(
+            partner_id in event.partner_ids.ids and date_from <= event.start.date() <= date_to
+            for partner_id, date_from, date_to in periods))
+        if events:
+            events._sync_timesheets(force=True)
 
-            # بيانات إدخال الجدول الزمني
-            timesheet_vals = {
-                'name': event.name,
-                'project_id': project_id,
-                'task_id': task_id,
-                'unit_amount': duration,
-                'employee_id': employee.id,
-                'user_id': employee.user_id.id,
-                'date': event.start.date(),
-                'calendar_event_id': event.id,  # ربط مع الاجتماع
-            }
-
-            # إنشاء إدخال الجدول الزمني
-            try:
-                timesheet = self.env['account.analytic.line'].create(timesheet_vals)
-                created_timesheets += timesheet
-                _logger.info("تم إنشاء إدخال جدول زمني للموظف %s للاجتماع '%s' بمدة %.2f ساعات",
-                             employee.name, event.name, duration)
-            except Exception as e:
-                _logger.error("فشل إنشاء إدخال الجدول الزمني للموظف %s: %s", employee.name, str(e))
-
-        if not created_timesheets:
-            _logger.warning("لم يتم إنشاء أي إدخال جدول زمني للاجتماع %s", event.name)
\ No newline at end of file
+    def _prepare_timesheet_vals(self, employee):
+        """بيانات إدخال الجدول الزمني لموظف حاضر في الاجتماع"""
+        self.ensure_one()
+        return {
+            'name': self.name,
+            'project_id': self.timesheet_project_id.id,
+            'task_id': self.timesheet_task_id.id,
+            'unit_amount': self.duration,
+            'employee_id': employee.id,
+            'user_id': employee.user_id.id,
+            'date': self.start.date(),
+            'calendar_event_id': self.id,  # ربط مع الاجتماع
+        }
@@ -0,0 +1,56 @@
+from odoo import models, api
+
+
+class HrContract(models.Model):
+    _inherit = 'hr.contract'
+
+    @api.model
+    def _get_open_contracts_batch(self, keys):
+        """
+        Resolve the open contracts of many employees in a single query.
+
+        :param keys: iterable of ``(employee_id, date_from, date_to)`` tuples;
+            use the same date twice to resolve the contract of a single day
+        :return: dict mapping each key to the ``hr.contract`` recordset of the
+            open contracts overlapping the period, most recent first
+        """
+        keys = list(dict.fromkeys(key for key in keys if key[0] and key[1] and key[2]))
+        result = {key: self.browse() for key in keys}
+        if not keys:
+            return result
+
+        self.flush_model(['employee_id', 'state', 'active', 'date_start', 'date_end'])
+        self.env.cr.execute("""
+            SELECT k.idx, c.id
+              FROM unnest(%s::int[], %s::date[], %s::date[])
+                   WITH ORDINALITY AS k(employee_id, date_from, date_to, idx)
+              JOIN hr_contract c ON c.employee_id = k.employee_id
+             WHERE c.state = 'open'
+               AND c.active
+               AND c.date_start <= k.date_to
+               AND (c.date_end IS NULL OR c.date_end >= k.date_from)
+          ORDER BY k.idx, c.date_start DESC, c.id DESC
+        """, ([key[0] for key in keys], [key[1] for key in keys], [key[2] for key in keys]))
+
+        contract_ids = {}
+        for idx, contract_id in self.env.cr.fetchall():
+            contract_ids.setdefault(keys[idx - 1], []).append(contract_id)
+        for key, ids in contract_ids.items():
+            result[key] = self.browse(ids)
+        return result
+
+    @api.model
+    def _get_contract_employee_ids(self, employee_ids):
+        """Return the ids of the employees among ``employee_ids`` having at least one running or expired contract"""
+        employee_ids = [employee_id for employee_id in employee_ids if employee_id]
+        if not employee_ids:
+            return set()
+        self.flush_model(['employee_id', 'state', 'active'])
+        self.env.cr.execute("""
+            SELECT DISTINCT employee_id
+              FROM hr_contract
+             WHERE employee_id = ANY(%s)
+               AND state IN ('open', 'close')
+               AND active
+        """, [employee_ids])
+        return {employee_id for employee_id, in self.env.cr.fetchall()}
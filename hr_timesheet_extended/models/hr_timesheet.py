@@ -1,10 +1,21 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
 from datetime import datetime, timedelta
+from collections import defaultdict
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Line fields feeding hr.timesheet.daily.summary
+DAILY_SUMMARY_FIELDS = {'unit_amount', 'employee_id', 'date', 'project_id', 'holiday_id', 'global_leave_id',
+                        'validated'}
+
+# Line fields feeding the totals of timesheet.approval.report
+APPROVAL_REPORT_FIELDS = {'unit_amount', 'employee_id', 'date', 'timesheet_approval_id'}
+
+# Line fields feeding timesheet.line.report
+LINE_REPORT_FIELDS = DAILY_SUMMARY_FIELDS | {'task_id', 'state', 'timesheet_approval_id'}
+
 class AccountAnalyticLine(models.Model):
     _inherit = ['account.analytic.line', 'timesheet.approval.mixin']
     _name = 'account.analytic.line'
@@ -12,10 +23,11 @@ class AccountAnalyticLine(models.Model):
     # Fields to track who approved and when
     manager_id = fields.Many2one('res.users', string='Manager', compute='_compute_manager_id', store=False)
     ceo_id = fields.Many2one('res.users', string='CEO', domain=lambda self: [
-        ('groups_id', 'in', self.env.ref('hr_timesheet_extended.group_timesheet_ceo').id)])
-    hr_manager_id = fields.Many2one('res.users', string='HR Manager',
-                                    domain=lambda self: [('groups_id', 'in', self.env.ref(
-                                        'hr_timesheet_extended.group_timesheet_hr_approve').id)])
+        ('id', 'in', list(self.env['res.users']._get_timesheet_approver_ids(
+            'hr_timesheet_extended.group_timesheet_ceo', self.env.company.id)))])
+    hr_manager_id = fields.Many2one('res.users', string='HR Manager', domain=lambda self: [
+        ('id', 'in', list(self.env['res.users']._get_timesheet_approver_ids(
+            'hr_timesheet_extended.group_timesheet_hr_approve', self.env.company.id)))])
 
     # Computed fields for totals (will be displayed in the footer)
     total_hours = fields.Float(string='Total Hours', compute='_compute_total_hours', store=True, compute_sudo=True,
@@ -29,6 +41,11 @@ class AccountAnalyticLine(models.Model):
     # Link to approval record
     timesheet_approval_id = fields.Many2one('hr.timesheet.approval', string='Timesheet Approval')
 
+    _sql_constraints = [
+        ('calendar_event_employee_uniq', 'unique(calendar_event_id, employee_id)',
+         'An employee can only have one timesheet entry per meeting.'),
+    ]
+
     def _check_can_write(self, values):
         # Si se está ejecutando en modo superusuario o con la bandera de omitir validación, permitir la modificación
         if self.env.su or self.env.context.get('skip_timesheet_validation'):
@@ -51,6 +68,276 @@ class AccountAnalyticLine(models.Model):
 
         return super()._check_can_write(values)
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super(AccountAnalyticLine, self).create(vals_list)
+        lines._attach_to_covering_approvals()
+        self.env['hr.timesheet.daily.summary'].sudo()._refresh_days(lines._get_daily_summary_keys())
+        self.env['timesheet.approval.report']._schedule_refresh(lines.timesheet_approval_id.ids)
+        self.env['timesheet.line.report']._schedule_refresh(lines._get_daily_summary_keys())
+        return lines
+
+    def write(self, vals):
+        if APPROVAL_REPORT_FIELDS.intersection(vals):
+            # Totals of the old and new approvals change when lines move or change
+            approval_ids = set(self.timesheet_approval_id.ids)
+            if vals.get('timesheet_approval_id'):
+                approval_ids.add(vals['timesheet_approval_id'])
+            self.env['timesheet.approval.report']._schedule_refresh(approval_ids)
+        if not LINE_REPORT_FIELDS.intersection(vals):
+            return super(AccountAnalyticLine, self).write(vals)
+        keys = self._get_daily_summary_keys()
+        res = super(AccountAnalyticLine, self).write(vals)
+        keys |= self._get_daily_summary_keys()
+        if DAILY_SUMMARY_FIELDS.intersection(vals):
+            self.env['hr.timesheet.daily.summary'].sudo()._refresh_days(keys)
+        self.env['timesheet.line.report']._schedule_refresh(keys)
+        return res
+
+    def unlink(self):
+        self.env['timesheet.approval.report']._schedule_refresh(self.timesheet_approval_id.ids)
+        self.env['hr.timesheet.approval.inbox']._close(self)
+        keys = self._get_daily_summary_keys()
+        res = super(AccountAnalyticLine, self).unlink()
+        self.env['hr.timesheet.daily.summary'].sudo()._refresh_days(keys)
+        self.env['timesheet.line.report']._schedule_refresh(keys)
+        return res
+
+    def _attach_to_covering_approvals(self):
+        """Link new timesheet lines to the draft approval covering their day, if any"""
+        lines = self.filtered(lambda line: line.project_id and not line.timesheet_approval_id)
+        covering = self.env['hr.timesheet.approval'].sudo()._get_covering_approvals(
+            lines._get_daily_summary_keys())
+        line_ids_by_approval = {}
+        for line in lines:
+            approval = covering.get((line.employee_id.id, line.date))
+            if approval and approval.state == 'draft':
+                line_ids_by_approval.setdefault(approval.id, []).append(line.id)
+        for approval_id, line_ids in line_ids_by_approval.items():
+            self.browse(line_ids).with_context(skip_timesheet_validation=True).write({
+                'timesheet_approval_id': approval_id,
+            })
+
+    def _get_daily_summary_keys(self):
+        """Return the (employee_id, date) pairs of the daily summaries these lines contribute to"""
+        return {(line.employee_id.id, line.date) for line in self.sudo() if line.employee_id and line.date}
+
+    def _is_meeting_line_protected(self):
+        """
+        Meeting lines that left the draft state, were validated or belong to a
+        submitted or approved approval are kept as they are
+        """
+        self.ensure_one()
+        return self.state != 'draft' or self.validated or self.timesheet_approval_id._locks_timesheets()
+
+    def _get_meeting_line_changes(self, vals):
+        """Return the subset of the meeting line ``vals`` that differ from this line"""
+        self.ensure_one()
+        changes = {}
+        for name, value in vals.items():
+            current = self[name]
+            if isinstance(current, models.BaseModel):
+                current = current.id
+            if current != value:
+                changes[name] = value
+        return changes
+
+    @api.model
+    def _create_rows_safe(self, vals_list):
+        """
+        Create many lines with a single create call. When the batch fails, retry
+        the rows one by one, each in its own savepoint, so that a bad row does
+        not prevent the others from being created.
+
+        :return: list of ``(line, error)`` tuples in the order of ``vals_list``;
+            ``line`` is empty and ``error`` holds the message for failed rows
+        """
+        if not vals_list:
+            return []
+        try:
+            with self.env.cr.savepoint():
+                lines = self.create(vals_list)
+            return [(line, None) for line in lines]
+        except Exception as e:
+            _logger.info("Batch creation of %s timesheet lines failed, retrying row by row: %s", len(vals_list), e)
+
+        results = []
+        for vals in vals_list:
+            try:
+                with self.env.cr.savepoint():
+                    results.append((self.create(vals), None))
+            except Exception as e:
+                results.append((self.browse(), str(e)))
+        return results
+
+    @api.model
+    def import_timesheet_rows(self, rows):
+        """
+        Bulk entry point for external time-clock systems. Every row is a dict
+        with ``date``, ``unit_amount``, an employee (``employee_id`` or badge
+        ``barcode``), a project (``project_id`` or ``project`` name), optionally
+        a task (``task_id`` or ``task`` name) and a ``name``. Employees,
+        projects and tasks are resolved with one lookup per batch, valid rows
+        are created together and attached to the draft approval covering their
+        day.
+
+        :return: list of dicts, one per row and in the same order, with
+            ``status`` ('created' or 'error'), ``id``, ``approval_id`` and ``error``
+        """
+        results = [{'index': index, 'status': 'error', 'id': False, 'approval_id': False, 'error': False}
+                   for index in range(len(rows))]
+
+        # Malformed rows get their error here and are left out of the reference lookups
+        valid_rows = {}
+        for index, row in enumerate(rows):
+            error = self._check_import_row(row)
+            if error:
+                results[index]['error'] = error
+            else:
+                valid_rows[index] = row
+        resolved = self._resolve_import_references(list(valid_rows.values()))
+
+        vals_list = []
+        row_indexes = []
+        for index, row in valid_rows.items():
+            try:
+                vals_list.append(self._prepare_import_vals(row, resolved))
+                row_indexes.append(index)
+            except (UserError, ValidationError, ValueError, TypeError) as e:
+                results[index]['error'] = str(e)
+
+        for index, (line, error) in zip(row_indexes, self._create_rows_safe(vals_list)):
+            if error:
+                results[index]['error'] = error
+            else:
+                results[index].update({
+                    'status': 'created',
+                    'id': line.id,
+                    'approval_id': line.timesheet_approval_id.id,
+                })
+        _logger.info("Imported %s of %s timesheet rows",
+                     sum(result['status'] == 'created' for result in results), len(rows))
+        return results
+
+    @api.model
+    def _check_import_row(self, row):
+        """Return the error of a malformed import row, or False when its shape is valid"""
+        if not isinstance(row, dict):
+            return _("Each row must be a dictionary.")
+        for key in ('employee_id', 'project_id', 'task_id'):
+            value = row.get(key)
+            if value and (not isinstance(value, int) or isinstance(value, bool)):
+                return _("%s must be an integer.") % key
+        for key in ('barcode', 'project', 'task', 'name'):
+            value = row.get(key)
+            if value and not isinstance(value, str):
+                return _("%s must be a string.") % key
+        return False
+
+    @api.model
+    def _resolve_import_references(self, rows):
+        """
+        Resolve the employees, projects and tasks referenced by well-formed
+        rows, one search per model. Names and badges map to all the matching
+        records, so that ambiguous references can be reported.
+        """
+        Employee = self.env['hr.employee']
+        Project = self.env['project.project']
+        Task = self.env['project.task']
+
+        barcodes = {row['barcode'] for row in rows if row.get('barcode')}
+        employee_ids = {row['employee_id'] for row in rows if row.get('employee_id')}
+        employees = Employee.search(['|', ('id', 'in', list(employee_ids)), ('barcode', 'in', list(barcodes))])
+
+        project_ids = {row['project_id'] for row in rows if row.get('project_id')}
+        project_names = {row['project'] for row in rows if row.get('project')}
+        projects = Project.search([
+            ('allow_timesheets', '=', True),
+            '|', ('id', 'in', list(project_ids)), ('name', 'in', list(project_names)),
+        ])
+
+        task_ids = {row['task_id'] for row in rows if row.get('task_id')}
+        task_names = {row['task'] for row in rows if row.get('task')}
+        tasks = Task.browse()
+        if task_ids or task_names:
+            tasks = Task.search([
+                ('project_id', 'in', projects.ids),
+                '|', ('id', 'in', list(task_ids)), ('name', 'in', list(task_names)),
+            ])
+
+        employees_by_barcode = defaultdict(list)
+        for employee in employees:
+            if employee.barcode:
+                employees_by_barcode[employee.barcode].append(employee)
+        projects_by_name = defaultdict(list)
+        for project in projects:
+            projects_by_name[project.name].append(project)
+        tasks_by_name = defaultdict(list)
+        for task in tasks:
+            tasks_by_name[(task.project_id.id, task.name)].append(task)
+
+        return {
+            'employee_by_id': {employee.id: employee for employee in employees},
+            'employees_by_barcode': employees_by_barcode,
+            'project_by_id': {project.id: project for project in projects},
+            'projects_by_name': projects_by_name,
+            'task_by_id': {task.id: task for task in tasks},
+            'tasks_by_name': tasks_by_name,
+        }
+
+    @api.model
+    def _get_unique_import_match(self, matches, label, reference):
+        """Return the only record of ``matches``, or raise when the reference is unknown or ambiguous"""
+        if len(matches) > 1:
+            raise UserError(_("Ambiguous %s %s: %s records match.") % (label, reference, len(matches)))
+        return matches[0] if matches else None
+
+    @api.model
+    def _prepare_import_vals(self, row, resolved):
+        """Validate one import row against the resolved references and return its line values"""
+        if row.get('employee_id'):
+            employee = resolved['employee_by_id'].get(row['employee_id'])
+        else:
+            employee = self._get_unique_import_match(
+                resolved['employees_by_barcode'].get(row.get('barcode'), []), _("badge"), row.get('barcode'))
+        if not employee:
+            raise UserError(_("Unknown employee."))
+
+        if row.get('project_id'):
+            project = resolved['project_by_id'].get(row['project_id'])
+        else:
+            project = self._get_unique_import_match(
+                resolved['projects_by_name'].get(row.get('project'), []), _("project"), row.get('project'))
+        if not project:
+            raise UserError(_("Unknown project or project without timesheets."))
+
+        task = self.env['project.task']
+        if row.get('task_id'):
+            task = resolved['task_by_id'].get(row['task_id'])
+            if not task or task.project_id != project:
+                raise UserError(_("The task does not belong to the project."))
+        elif row.get('task'):
+            task = self._get_unique_import_match(
+                resolved['tasks_by_name'].get((project.id, row['task']), []), _("task"), row['task'])
+            if not task:
+                raise UserError(_("Unknown task %s in project %s.") % (row['task'], project.name))
+
+        date = fields.Date.to_date(row.get('date'))
+        if not date:
+            raise UserError(_("A date is required."))
+        unit_amount = float(row.get('unit_amount') or 0.0)
+        if unit_amount < 0 or unit_amount > 24:
+            raise UserError(_("Hours must be between 0 and 24."))
+
+        return {
+            'name': row.get('name') or '/',
+            'date': date,
+            'unit_amount': unit_amount,
+            'employee_id': employee.id,
+            'project_id': project.id,
+            'task_id': task.id,
+        }
+
     def action_create_timesheet_approval(self):
         """
         إنشاء طلب موافقة على ورقة الوقت للسجلات المحددة.
@@ -132,16 +419,18 @@ class AccountAnalyticLine(models.Model):
                 date_start = min(grid_dates)
                 date_end = max(grid_dates)
 
-        # التحقق مما إذا كان طلب موافقة موجود بالفعل لهذا الموظف والفترة
+        # التحقق مما إذا كان طلب موافقة موجود بالفعل يتداخل مع هذه الفترة
+        # (قيد الاستبعاد في قاعدة البيانات يمنع التداخل عند النقرات المتزامنة)
         existing_approval = self.env['hr.timesheet.approval'].search([
             ('employee_id', '=', employee.id),
-            ('date_start', '=', date_start),
-            ('date_end', '=', date_end)
+            ('date_start', '<=', date_end),
+            ('date_end', '>=', date_start)
         ], limit=1)
 
         if existing_approval:
-            raise UserError(_("يوجد بالفعل طلب موافقة للفترة من %s إلى %s") %
-                            (date_start, date_end))
+            raise UserError(_("يوجد بالفعل طلب موافقة %s للفترة من %s إلى %s يتداخل مع الفترة من %s إلى %s") %
+                            (existing_approval.name, existing_approval.date_start, existing_approval.date_end,
+                             date_start, date_end))
 
         # إنشاء طلب موافقة
         approval_vals = {
@@ -203,33 +492,33 @@ class AccountAnalyticLine(models.Model):
 
     @api.depends('employee_id', 'date')
     def _compute_minimum_hours(self):
+        # Resolve the active contract of every (employee, day) pair at once
+        contracts = self.env['hr.contract']._get_open_contracts_batch(
+            (line.employee_id.id, line.date, line.date) for line in self)
+
+        line_calendars = {}
+        calendar_ranges = {}
         for line in self:
-            # Get the working hours from the employee's contract
-            minimum_hours = 8.0  # Default value if no contract is found
-
-            if line.employee_id and line.date:
-                # Find the active contract for the employee
-                contract = self.env['hr.contract'].search([
-                    ('employee_id', '=', line.employee_id.id),
-                    ('state', '=', 'open'),
-                    ('date_start', '<=', line.date),
-                    '|',
-                    ('date_end', '>=', line.date),
-                    ('date_end', '=', False)
-                ], limit=1)
-
-                if contract:
-                    # If there's a resource calendar defined in the contract
-                    if contract.resource_calendar_id:
-                        # Calculate the expected hours for this day
-                        working_hours = contract.resource_calendar_id.get_work_hours_count(
-                            datetime.combine(line.date, datetime.min.time()),
-                            datetime.combine(line.date, datetime.max.time()),
-                            compute_leaves=True,
-                        )
-                        if working_hours > 0:
-                            minimum_hours = working_hours
+            if not line.employee_id or not line.date:
+                continue
+            contract = contracts[(line.employee_id.id, line.date, line.date)][:1]
+            calendar = contract.resource_calendar_id
+            if calendar:
+                line_calendars[line] = calendar
+                date_from, date_to = calendar_ranges.get(calendar, (line.date, line.date))
+                calendar_ranges[calendar] = (min(date_from, line.date), max(date_to, line.date))
+
+        # Expected hours of every (calendar, day) pair, filled in bulk from the cache
+        expected_hours = self.env['hr.timesheet.expected.hours'].sudo()._get_expected_hours_batch(calendar_ranges)
 
+        for line in self:
+            # Default value if no contract is found
+            minimum_hours = 8.0
+            calendar = line_calendars.get(line)
+            if calendar:
+                working_hours = expected_hours[calendar.id].get(line.date, 0.0)
+                if working_hours > 0:
+                    minimum_hours = working_hours
             line.minimum_hours = minimum_hours
 
     @api.depends('total_hours', 'minimum_hours')
@@ -358,24 +647,20 @@ class AccountAnalyticLine(models.Model):
     # Allow for batch approval actions from the grid view
     def action_submit_selected(self):
         """Submit multiple timesheets for approval"""
-        for record in self:
-            if record.state == 'draft':
-                record.action_submit()
+        self.filtered(lambda record: record.state == 'draft').action_submit()
         return True
 
     def action_manager_approve_selected(self):
         """Manager approve multiple timesheets"""
-        for record in self:
-            if record.state == 'submitted' and self.env.user == record.manager_id:
-                record.action_manager_approve()
+        self.filtered(
+            lambda record: record.state == 'submitted' and self.env.user == record.manager_id
+        ).action_manager_approve()
         return True
 
     def action_ceo_approve_selected(self):
         """CEO approve multiple timesheets"""
-        for record in self:
-            if record.state == 'manager_approved' and self.env.user.has_group(
-                    'hr_timesheet_extended.group_timesheet_ceo'):
-                record.action_ceo_approve()
+        if self.env.user.has_group('hr_timesheet_extended.group_timesheet_ceo'):
+            self.filtered(lambda record: record.state == 'manager_approved').action_ceo_approve()
         return True
 
     def action_hr_approve_selected(self):
@@ -383,7 +668,5 @@ class AccountAnalyticLine(models.Model):
         if not self.env.user.has_group('hr_timesheet_extended.group_timesheet_hr_approve'):
             raise UserError(_("يمكن لمعتمدي الموارد البشرية فقط إجراء الموافقة النهائية."))
 
-        for record in self:
-            if record.state == 'ceo_approved':
-                record.action_hr_approve()
-        return True
\ No newline at end of file
+        self.filtered(lambda record: record.state == 'ceo_approved').action_hr_approve()
+        return True
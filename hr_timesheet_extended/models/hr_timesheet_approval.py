@@ -1,10 +1,28 @@
-from odoo import models, fields, api, _
-from odoo.exceptions import UserError
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import sql
 from datetime import datetime, timedelta
 import logging
+import psycopg2
+import time
 
 _logger = logging.getLogger(__name__)
 
+# Signature expected at each state before the next transition
+SIGNATURE_FIELDS = {
+    'draft': 'employee_signature',
+    'submitted': 'manager_signature',
+    'manager_approved': 'ceo_signature',
+    'ceo_approved': 'hr_signature',
+}
+
+# Pending approval summaries are cached per user and companies until an approval changes state
+# (the sequence is bumped, for all workers) or for at most this many seconds (waiting times)
+PENDING_SUMMARY_SEQUENCE = 'hr_timesheet_approval_pending_summary_seq'
+PENDING_SUMMARY_TTL = 60
+# Postcommit flag of the transactions that already scheduled the sequence bump
+PENDING_SUMMARY_INVALIDATION_KEY = 'hr_timesheet_extended.pending_summary_invalidation'
+
 
 class HrTimesheetApproval(models.Model):
     _name = 'hr.timesheet.approval'
@@ -17,7 +35,7 @@ class HrTimesheetApproval(models.Model):
                                   default=lambda self: self.env.user.employee_id, tracking=True)
     department_id = fields.Many2one('hr.department', string='Department', related='employee_id.department_id',
                                     store=True)
-    has_timeoff_entries = fields.Boolean(string='Has Time Off Entries', compute='_compute_has_special_entries',
+    has_timeoff_entries = fields.Boolean(string='Has Time Off Entries', compute='_compute_line_stats',
                                          store=True)
     date_start = fields.Date(string='Start Date', required=True, tracking=True)
     date_end = fields.Date(string='End Date', required=True, tracking=True)
@@ -29,12 +47,12 @@ class HrTimesheetApproval(models.Model):
         compute='_compute_manager_id',
         store=True,
         compute_sudo=True)
-    ceo_id = fields.Many2one('res.users', string='CEO',
-                             domain=lambda self: [
-                                 ('groups_id', 'in', self.env.ref('hr_timesheet_extended.group_timesheet_ceo').id)])
-    hr_manager_id = fields.Many2one('res.users', string='HR Manager',
-                                    domain=lambda self: [('groups_id', 'in', self.env.ref(
-                                        'hr_timesheet_extended.group_timesheet_hr_approve').id)])
+    ceo_id = fields.Many2one('res.users', string='CEO', domain=lambda self: [
+        ('id', 'in', list(self.env['res.users']._get_timesheet_approver_ids(
+            'hr_timesheet_extended.group_timesheet_ceo', self.env.company.id)))])
+    hr_manager_id = fields.Many2one('res.users', string='HR Manager', domain=lambda self: [
+        ('id', 'in', list(self.env['res.users']._get_timesheet_approver_ids(
+            'hr_timesheet_extended.group_timesheet_hr_approve', self.env.company.id)))])
 
     # Timesheet lines
     timesheet_line_ids = fields.One2many('account.analytic.line', 'timesheet_approval_id', string='Timesheet Lines')
@@ -44,19 +62,26 @@ class HrTimesheetApproval(models.Model):
     minimum_hours = fields.Float(string='Minimum Work Hours', compute='_compute_minimum_hours', store=True)
     overtime_hours = fields.Float(string='Overtime Hours', compute='_compute_overtime_hours', store=True)
     company_id = fields.Many2one('res.company', string='Company', related='employee_id.company_id', store=True)
+    daily_overtime_hours = fields.Float(string='Daily Overtime Hours', compute='_compute_daily_overtime_hours',
+                                        help="Sum of the overtime of each day of the period")
 
     # إضافة حقل جديد لتتبع السجلات المحققة
-    has_validated_entries = fields.Boolean(string='Has Validated Entries', compute='_compute_has_validated_entries',
+    has_validated_entries = fields.Boolean(string='Has Validated Entries', compute='_compute_line_stats',
                                            store=True)
+    line_count = fields.Integer(string='Timesheet Entries', compute='_compute_line_stats', store=True)
+    timeoff_line_count = fields.Integer(string='Time Off Entries', compute='_compute_line_stats', store=True)
+    validated_line_count = fields.Integer(string='Validated Entries', compute='_compute_line_stats', store=True)
 
     # Notes and comments
     notes = fields.Text(string='Notes')
 
     # Signature fields for approval documentation
-    employee_signature = fields.Binary(string='Employee Signature')
-    manager_signature = fields.Binary(string='Manager Signature')
-    ceo_signature = fields.Binary(string='CEO Signature')
-    hr_signature = fields.Binary(string='HR Signature')
+    # Stored as attachments: the filestore keeps one file per checksum, so the
+    # copies made when signing with a stored signature share the same file
+    employee_signature = fields.Binary(string='Employee Signature', attachment=True)
+    manager_signature = fields.Binary(string='Manager Signature', attachment=True)
+    ceo_signature = fields.Binary(string='CEO Signature', attachment=True)
+    hr_signature = fields.Binary(string='HR Signature', attachment=True)
 
     # Payroll related fields
     work_entry_type_id = fields.Many2one('hr.work.entry.type', string='Work Entry Type',
@@ -66,22 +91,117 @@ class HrTimesheetApproval(models.Model):
     payroll_batch_id = fields.Many2one('hr.payslip.run', string='Payroll Batch', readonly=True,
                                        copy=False)
 
+    # Approval periods of an employee never overlap; the GiST index behind the
+    # constraint also serves the covering approval lookups
+    _sql_constraints = [
+        ('employee_period_excl',
+         "EXCLUDE USING gist (employee_id WITH =, daterange(date_start, date_end, '[]') WITH &&)",
+         'An approval request already covers part of this period for this employee.'),
+    ]
+
+    def init(self):
+        self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS %s" % PENDING_SUMMARY_SEQUENCE)
+
+    def _auto_init(self):
+        # The extension needs database owner rights; without it the exclusion constraint cannot be
+        # created and the Python check below keeps the periods apart
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        except psycopg2.Error as e:
+            _logger.warning("Could not create the btree_gist extension, overlapping timesheet approvals "
+                            "are prevented in Python only: %s", e)
+        return super(HrTimesheetApproval, self)._auto_init()
+
+    @api.constrains('employee_id', 'date_start', 'date_end')
+    def _check_overlap(self):
+        """Fallback of the employee_period_excl constraint, when the database could not create it"""
+        if sql.constraint_definition(self.env.cr, self._table, '%s_employee_period_excl' % self._table):
+            return
+        self.flush_model(['employee_id', 'date_start', 'date_end'])
+        self.env.cr.execute("""
+            SELECT a.name, b.name
+              FROM hr_timesheet_approval a
+              JOIN hr_timesheet_approval b
+                ON b.employee_id = a.employee_id
+               AND b.id != a.id
+               AND daterange(b.date_start, b.date_end, '[]') && daterange(a.date_start, a.date_end, '[]')
+             WHERE a.id = ANY(%s)
+             LIMIT 1
+        """, [self.ids])
+        overlap = self.env.cr.fetchone()
+        if overlap:
+            raise ValidationError(_("An approval request already covers part of this period for this employee "
+                                    "(%s and %s).") % overlap)
+
+    @api.model
+    def _get_covering_approvals(self, keys):
+        """
+        Find the approvals covering many employee days with one indexed query.
+
+        :param keys: iterable of ``(employee_id, date)`` pairs
+        :return: dict mapping each covered pair to its ``hr.timesheet.approval``
+        """
+        keys = list({key for key in keys if key[0] and key[1]})
+        if not keys:
+            return {}
+        self.flush_model(['employee_id', 'date_start', 'date_end'])
+        self.env.cr.execute("""
+            SELECT k.employee_id, k.date, a.id
+              FROM unnest(%s::int[], %s::date[]) AS k(employee_id, date)
+              JOIN hr_timesheet_approval a
+                ON a.employee_id = k.employee_id
+               AND daterange(a.date_start, a.date_end, '[]') @> k.date
+        """, ([key[0] for key in keys], [key[1] for key in keys]))
+        return {(employee_id, date): self.browse(approval_id)
+                for employee_id, date, approval_id in self.env.cr.fetchall()}
+
+    def _locks_timesheets(self):
+        """Whether the approval was submitted or approved, so that its days no longer get automatic timesheets"""
+        return bool(self) and self.state not in ('draft', 'rejected')
+
+    @api.model
+    def _get_covering_approval(self, employee, date):
+        """Return the approval covering ``date`` for ``employee``, if any"""
+        return self._get_covering_approvals([(employee.id, date)]).get((employee.id, date), self.browse())
+
     @api.depends('timesheet_line_ids', 'timesheet_line_ids.holiday_id', 'timesheet_line_ids.global_leave_id',
                  'timesheet_line_ids.validated')
-    def _compute_has_special_entries(self):
-        """Calcular si el timesheet approval tiene entradas especiales (tiempo libre o validadas)"""
-        for approval in self:
-            approval.has_validated_entries = any(
-                line.validated for line in approval.timesheet_line_ids if hasattr(line, 'validated'))
-
-            approval.has_timeoff_entries = any(
-                line.holiday_id or line.global_leave_id for line in approval.timesheet_line_ids)
-    @api.depends('timesheet_line_ids', 'timesheet_line_ids.validated')
-    def _compute_has_validated_entries(self):
-        """حساب ما إذا كان طلب الموافقة يحتوي على سجلات محققة"""
+    def _compute_line_stats(self):
+        """
+        Count the entries, time off entries and validated entries of all the
+        approvals with one grouped query, without loading their lines.
+        Records being edited in a form are counted from the cache instead.
+        """
+        stats = {}
+        approval_ids = [approval.id for approval in self if approval.id]
+        if approval_ids:
+            self.env['account.analytic.line'].flush_model(
+                ['timesheet_approval_id', 'holiday_id', 'global_leave_id', 'validated'])
+            self.env.cr.execute("""
+                SELECT timesheet_approval_id,
+                       COUNT(*),
+                       COUNT(*) FILTER (WHERE holiday_id IS NOT NULL OR global_leave_id IS NOT NULL),
+                       COUNT(*) FILTER (WHERE validated)
+                  FROM account_analytic_line
+                 WHERE timesheet_approval_id = ANY(%s)
+              GROUP BY timesheet_approval_id
+            """, [approval_ids])
+            stats = {row[0]: row[1:] for row in self.env.cr.fetchall()}
+
         for approval in self:
-            approval.has_validated_entries = any(
-                line.validated for line in approval.timesheet_line_ids if hasattr(line, 'validated'))
+            if approval.id:
+                line_count, timeoff_count, validated_count = stats.get(approval.id, (0, 0, 0))
+            else:
+                lines = approval.timesheet_line_ids
+                line_count = len(lines)
+                timeoff_count = len(lines.filtered(lambda line: line.holiday_id or line.global_leave_id))
+                validated_count = len(lines.filtered('validated'))
+            approval.line_count = line_count
+            approval.timeoff_line_count = timeoff_count
+            approval.validated_line_count = validated_count
+            approval.has_timeoff_entries = bool(timeoff_count)
+            approval.has_validated_entries = bool(validated_count)
 
     @api.depends('employee_id', 'employee_id.timesheet_manager_id', 'employee_id.parent_id',
                  'employee_id.parent_id.user_id')
@@ -102,7 +222,7 @@ class HrTimesheetApproval(models.Model):
         self.ensure_one()
 
         # Check if there are any timesheet lines
-        if not self.timesheet_line_ids:
+        if not self.line_count:
             raise UserError(_("No timesheet records are associated with this approval request."))
 
         # تعديل: تحديث نص للتحذير إذا كانت هناك سجلات محققة
@@ -158,45 +278,133 @@ class HrTimesheetApproval(models.Model):
 
     @api.depends('date_start', 'date_end', 'employee_id')
     def _compute_minimum_hours(self):
+        periods = {
+            approval: (approval.employee_id.id, approval.date_start, approval.date_end)
+            for approval in self if approval.date_start and approval.date_end and approval.employee_id
+        }
+        minimum_hours = self._get_period_minimum_hours(periods.values())
         for approval in self:
-            if approval.date_start and approval.date_end and approval.employee_id:
-                # Find the active contract for the employee
-                contract = self.env['hr.contract'].search([
-                    ('employee_id', '=', approval.employee_id.id),
-                    ('state', '=', 'open'),
-                    ('date_start', '<=', approval.date_end),
-                    '|',
-                    ('date_end', '>=', approval.date_start),
-                    ('date_end', '=', False)
-                ], limit=1)
-
-                minimum_hours = 0.0
-
-                if contract and contract.resource_calendar_id:
-                    # Calculate working days in the period
-                    current_date = approval.date_start
-                    while current_date <= approval.date_end:
-                        # Calculate hours for each day in the period
-                        working_hours = contract.resource_calendar_id.get_work_hours_count(
-                            datetime.combine(current_date, datetime.min.time()),
-                            datetime.combine(current_date, datetime.max.time()),
-                            compute_leaves=True,
-                        )
-                        minimum_hours += working_hours
-                        current_date += timedelta(days=1)
+            approval.minimum_hours = minimum_hours.get(periods.get(approval), 0.0)
+
+    @api.model
+    def _get_period_minimum_hours(self, periods):
+        """
+        Compute the expected work hours of many (employee_id, date_start, date_end)
+        periods at once.
+
+        :return: dict mapping each period to its expected hours
+        """
+        return {
+            period: sum(day_hours.values())
+            for period, day_hours in self._get_period_day_hours(periods).items()
+        }
+
+    @api.model
+    def _get_period_day_hours(self, periods):
+        """
+        Compute the expected work hours of each day of many (employee_id,
+        date_start, date_end) periods at once. Each period is split across the
+        contracts covering it, so a contract or calendar change mid-period is
+        taken into account. Work intervals are fetched once per calendar for the
+        union of its segments. Days without a contract are worth 0 hours, unless
+        the employee never had a contract: standard 8-hour weekdays are then
+        assumed.
+
+        :return: dict mapping each period to a {date: hours} dict
+        """
+        periods = list(dict.fromkeys(periods))
+        Contract = self.env['hr.contract']
+        contracts = Contract._get_open_contracts_batch(periods)
+        contract_employee_ids = Contract._get_contract_employee_ids({period[0] for period in periods})
+
+        # Assign each day of each period to the calendar of the most recent contract covering it
+        period_days = {}
+        calendar_ranges = {}
+        for period in periods:
+            employee_id, date_start, date_end = period
+            day_calendars = {}
+            for contract in contracts[period]:
+                segment_start = max(date_start, contract.date_start)
+                segment_end = min(date_end, contract.date_end or date_end)
+                calendar = contract.resource_calendar_id
+                for offset in range((segment_end - segment_start).days + 1):
+                    day_calendars.setdefault(segment_start + timedelta(days=offset), calendar)
+                if calendar and segment_start <= segment_end:
+                    range_start, range_end = calendar_ranges.get(calendar, (segment_start, segment_end))
+                    calendar_ranges[calendar] = (min(range_start, segment_start), max(range_end, segment_end))
+            period_days[period] = day_calendars
+
+        expected_hours = self.env['hr.timesheet.expected.hours'].sudo()._get_expected_hours_batch(calendar_ranges)
+
+        result = {}
+        for period in periods:
+            employee_id, date_start, date_end = period
+            day_calendars = period_days[period]
+            day_hours = {}
+            for offset in range((date_end - date_start).days + 1):
+                day = date_start + timedelta(days=offset)
+                calendar = day_calendars.get(day)
+                if calendar:
+                    day_hours[day] = expected_hours[calendar.id].get(day, 0.0)
+                elif employee_id not in contract_employee_ids and day.weekday() < 5:
+                    # Fallback if the employee has no contract at all - estimate based on
+                    # standard 8-hour days excluding weekends (this is a simplification)
+                    day_hours[day] = 8.0
                 else:
-                    # Fallback if no contract or calendar - estimate based on standard 8-hour days
-                    # excluding weekends (this is a simplification)
-                    current_date = approval.date_start
-                    while current_date <= approval.date_end:
-                        # Skip weekends (0=Monday, 6=Sunday in Python's datetime)
-                        if current_date.weekday() < 5:  # Weekday
-                            minimum_hours += 8.0
-                        current_date += timedelta(days=1)
-
-                approval.minimum_hours = minimum_hours
-            else:
-                approval.minimum_hours = 0.0
+                    day_hours[day] = 0.0
+            result[period] = day_hours
+        return result
+
+    @api.depends('employee_id', 'date_start', 'date_end')
+    def _compute_daily_overtime_hours(self):
+        """Sum the per-day overtime of the daily summaries of each approval period in one query"""
+        approvals = self.filtered(lambda a: isinstance(a.id, int))
+        overtime = {}
+        if approvals:
+            approvals.flush_recordset(['employee_id', 'date_start', 'date_end'])
+            self.env.cr.execute("""
+                SELECT a.id, SUM(s.overtime_hours)
+                  FROM hr_timesheet_approval a
+                  JOIN hr_timesheet_daily_summary s ON s.employee_id = a.employee_id
+                   AND s.date BETWEEN a.date_start AND a.date_end
+                 WHERE a.id = ANY(%s)
+              GROUP BY a.id
+            """, (approvals.ids,))
+            overtime = dict(self.env.cr.fetchall())
+        for approval in self:
+            approval.daily_overtime_hours = overtime.get(approval.id, 0.0)
+
+    def _materialize_meeting_timesheets(self):
+        """
+        Create the deferred timesheets of the recurring meetings of the approval
+        periods; the new lines join the draft approvals covering their day.
+        """
+        self.env['calendar.event']._materialize_period_timesheets([
+            (approval.employee_id.user_id.partner_id.id, approval.date_start, approval.date_end)
+            for approval in self.filtered(lambda a: a.state == 'draft' and a.date_start and a.date_end)
+        ])
+
+    def _fill_daily_summaries(self):
+        """Make sure every working day of the approval periods has a daily summary row"""
+        self.env['hr.timesheet.daily.summary'].sudo()._fill_periods([
+            (approval.employee_id.id, approval.date_start, approval.date_end)
+            for approval in self if approval.employee_id and approval.date_start and approval.date_end
+        ])
+
+    def action_view_daily_summary(self):
+        """Open the daily summaries of the approval period"""
+        self.ensure_one()
+        return {
+            'name': _('Daily Summary'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'hr.timesheet.daily.summary',
+            'view_mode': 'tree,pivot,graph',
+            'domain': [
+                ('employee_id', '=', self.employee_id.id),
+                ('date', '>=', self.date_start),
+                ('date', '<=', self.date_end),
+            ],
+        }
 
     @api.depends('total_hours', 'minimum_hours')
     def _compute_overtime_hours(self):
@@ -206,133 +414,400 @@ class HrTimesheetApproval(models.Model):
             else:
                 approval.overtime_hours = 0.0
 
-    @api.model
-    def create(self, vals):
-        if vals.get('name', _('New')) == _('New'):
-            vals['name'] = self.env['ir.sequence'].next_by_code('hr.timesheet.approval') or _('New')
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if vals.get('name', _('New')) == _('New'):
+                vals['name'] = self.env['ir.sequence'].next_by_code('hr.timesheet.approval') or _('New')
 
         # تحقق من وجود سجلات محققة عند الإنشاء
-        result = super(HrTimesheetApproval, self).create(vals)
+        result = super(HrTimesheetApproval, self).create(vals_list)
 
-        if result.has_validated_entries:
+        for approval in result.filtered('has_validated_entries'):
             # تسجيل هذه المعلومة وإضافة ملاحظة
-            _logger.info("Timesheet approval %s created with validated entries", result.name)
-            result.message_post(body=_("This approval contains validated timesheet entries that cannot be modified."))
+            _logger.info("Timesheet approval %s created with validated entries", approval.name)
+            approval.message_post(
+                body=_("This approval contains validated timesheet entries that cannot be modified."))
 
+        self.env['timesheet.approval.report']._schedule_refresh(result.ids)
+        result._fill_daily_summaries()
+        result._materialize_meeting_timesheets()
         return result
 
-    # Override methods from the mixin to update the related timesheet lines
-    def action_submit(self):
-        for approval in self:
-            # Verificar si hay líneas de tiempo libre y mostrar advertencia
-            timeoff_lines = approval.timesheet_line_ids.filtered(
-                lambda line: line.holiday_id or line.global_leave_id)
+    def write(self, vals):
+        res = super(HrTimesheetApproval, self).write(vals)
+        self.env['timesheet.approval.report']._schedule_refresh(self.ids)
+        if {'employee_id', 'date_start', 'date_end'} & set(vals):
+            self._fill_daily_summaries()
+        if 'state' in vals:
+            self._schedule_pending_summary_invalidation()
+        return res
 
-            if timeoff_lines and not self.env.context.get('timeoff_warning_shown'):
-                approval.message_post(
-                    body=_("Warning: This approval contains time off entries that cannot be modified directly."))
+    def _can_sign(self, field_name):
+        """Whether the current user is the one expected to put ``field_name`` on this record"""
+        self.ensure_one()
+        if field_name == 'employee_signature':
+            return self.employee_id.user_id == self.env.user
+        if field_name == 'manager_signature':
+            return self._check_manager_access()
+        if field_name == 'ceo_signature':
+            return self._check_ceo_access()
+        if field_name == 'hr_signature':
+            return self._check_hr_manager_access()
+        return False
+
+    def action_sign_with_stored_signature(self):
+        """Sign the records at their current stage with the signature stored on the current user"""
+        user = self.env.user
+        if not user.timesheet_signature:
+            raise UserError(_("Please store your signature in your preferences first."))
+        source = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', 'res.users'),
+            ('res_field', '=', 'timesheet_signature'),
+            ('res_id', '=', user.id),
+        ], limit=1)
+
+        records_by_field = {}
+        for record in self:
+            field_name = SIGNATURE_FIELDS.get(record.state)
+            if not field_name or not record._can_sign(field_name):
+                raise UserError(_("You cannot sign %s at its current stage.") % record.name)
+            records_by_field.setdefault(field_name, []).append(record.id)
+
+        for field_name, record_ids in records_by_field.items():
+            self.browse(record_ids)._set_signature_from_attachment(field_name, source, user.timesheet_signature)
+        return {'type': 'ir.actions.client', 'tag': 'soft_reload'}
+
+    def _set_signature_from_attachment(self, field_name, source, value):
+        """
+        Copy the ``source`` attachment into ``field_name`` of the records with
+        one attachment batch. The content is copied as is: the filestore
+        deduplicates files by checksum, so the signature is stored only once.
+        """
+        self.check_access_rights('write')
+        self.check_access_rule('write')
+        if not source:
+            self.write({field_name: value})
+            return
+        Attachment = self.env['ir.attachment'].sudo()
+        Attachment.search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', field_name),
+            ('res_id', 'in', self.ids),
+        ]).unlink()
+        Attachment.create([record._prepare_signature_attachment_vals(field_name, source) for record in self])
+        self.invalidate_recordset([field_name])
+
+    def _prepare_signature_attachment_vals(self, field_name, source):
+        self.ensure_one()
+        return {
+            'name': field_name,
+            'res_model': self._name,
+            'res_field': field_name,
+            'res_id': self.id,
+            'type': 'binary',
+            # create() ignores store_fname, checksum and file_size, so the bytes are
+            # copied; having the same checksum, they end up in the source's file
+            'raw': source.raw,
+            'mimetype': source.mimetype,
+        }
 
-            # Llamar al método original con contexto especial
-            res = super(HrTimesheetApproval, approval.with_context(skip_timesheet_validation=True)).action_submit()
+    def _sign_with_employee_signatures(self):
+        """
+        Put the signature stored on each employee's user on the records that
+        have no employee signature yet, with one attachment batch. Only the
+        users who opted in with ``timesheet_auto_submit`` are signed for, and
+        empty signatures count as missing.
 
-            # Actualizar todas las líneas de hoja de tiempo usando contexto de omisión
-            for line in approval.timesheet_line_ids:
-                line.with_context(skip_timesheet_validation=True).write({
-                    'state': 'submitted',
-                    'submitted_date': approval.submitted_date,
-                })
+        :return: the records carrying a non-empty employee signature
+        """
+        Attachment = self.env['ir.attachment'].sudo()
+        attachments = Attachment.search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'employee_signature'),
+            ('res_id', 'in', self.ids),
+        ])
+        signed_ids = set(attachments.filtered('file_size').mapped('res_id'))
+        sources = {
+            attachment.res_id: attachment
+            for attachment in Attachment.search([
+                ('res_model', '=', 'res.users'),
+                ('res_field', '=', 'timesheet_signature'),
+                ('res_id', 'in', self.employee_id.user_id.filtered('timesheet_auto_submit').ids),
+                ('file_size', '>', 0),
+            ])
+        }
+        to_sign = self.filtered(lambda record: record.id not in signed_ids
+                                and record.employee_id.user_id.id in sources)
+        attachments.filtered(lambda attachment: attachment.res_id in to_sign.ids).unlink()
+        created = Attachment.create([
+            record._prepare_signature_attachment_vals('employee_signature', sources[record.employee_id.user_id.id])
+            for record in to_sign
+        ])
+        to_sign.invalidate_recordset(['employee_signature'])
+        signed_ids.update(created.filtered('file_size').mapped('res_id'))
+        return self.browse(sorted(signed_ids))
 
-        return res
+    @api.model
+    def _get_period_bounds(self, anchor, period):
+        """Return the first and last day of the week (Monday to Sunday) or the month of ``anchor``"""
+        if period == 'month':
+            date_start = anchor.replace(day=1)
+            date_end = (date_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        else:
+            date_start = anchor - timedelta(days=anchor.weekday())
+            date_end = date_start + timedelta(days=6)
+        return date_start, date_end
 
-    def action_manager_approve(self):
-        self = self.with_context(skip_timesheet_validation=True)
-        for approval in self:
-            res = super(HrTimesheetApproval, approval).action_manager_approve()
+    @api.model
+    def _generate_period_approvals(self, date_start, date_end, auto_submit=False):
+        """
+        Create the approvals of the period for every employee of the current
+        companies having draft timesheet lines that are not linked to an
+        approval yet. Employees with an approval overlapping the period are
+        skipped, so that the generation can be run again safely.
+
+        :param auto_submit: submit the new approvals that carry a signature, signing
+            first for the employees who opted in with ``timesheet_auto_submit``;
+            no signature is ever added on behalf of the others
+        :return: the created approvals
+        """
+        AnalyticLine = self.env['account.analytic.line']
+        AnalyticLine.flush_model(['employee_id', 'date', 'project_id', 'state', 'timesheet_approval_id'])
+        self.flush_model(['employee_id', 'date_start', 'date_end'])
+        self.env.cr.execute("""
+            SELECT l.employee_id, ARRAY_AGG(l.id ORDER BY l.id)
+              FROM account_analytic_line l
+              JOIN hr_employee e ON e.id = l.employee_id
+             WHERE l.project_id IS NOT NULL
+               AND l.timesheet_approval_id IS NULL
+               AND COALESCE(l.state, 'draft') = 'draft'
+               AND l.date BETWEEN %(date_start)s AND %(date_end)s
+               AND e.active
+               AND e.company_id = ANY(%(company_ids)s)
+               AND NOT EXISTS (
+                   SELECT 1
+                     FROM hr_timesheet_approval a
+                    WHERE a.employee_id = l.employee_id
+                      AND daterange(a.date_start, a.date_end, '[]')
+                          && daterange(%(date_start)s, %(date_end)s, '[]'))
+          GROUP BY l.employee_id
+          ORDER BY l.employee_id
+        """, {'date_start': date_start, 'date_end': date_end, 'company_ids': self.env.companies.ids})
+        line_ids_by_employee = dict(self.env.cr.fetchall())
+        if not line_ids_by_employee:
+            return self.browse()
+
+        approvals = self.create([{
+            'employee_id': employee_id,
+            'date_start': date_start,
+            'date_end': date_end,
+            'state': 'draft',
+        } for employee_id in line_ids_by_employee])
+
+        # Link all the lines with one statement, then let the ORM recompute the approval totals
+        line_ids = []
+        line_approval_ids = []
+        for approval in approvals:
+            employee_line_ids = line_ids_by_employee[approval.employee_id.id]
+            line_ids += employee_line_ids
+            line_approval_ids += [approval.id] * len(employee_line_ids)
+        self.env.cr.execute("""
+            UPDATE account_analytic_line l
+               SET timesheet_approval_id = m.approval_id
+              FROM unnest(%s::int[], %s::int[]) AS m(line_id, approval_id)
+             WHERE l.id = m.line_id
+        """, (line_ids, line_approval_ids))
+        lines = AnalyticLine.browse(line_ids)
+        lines.invalidate_recordset(['timesheet_approval_id'])
+        approvals.invalidate_recordset(['timesheet_line_ids'])
+        lines.modified(['timesheet_approval_id'])
+        self.env['timesheet.approval.report']._schedule_refresh(approvals.ids)
+        self.env['timesheet.line.report']._schedule_refresh(lines._get_daily_summary_keys())
+        _logger.info("Generated %s timesheet approvals for %s - %s", len(approvals), date_start, date_end)
+
+        if auto_submit:
+            signed = approvals._sign_with_employee_signatures()
+            submittable = signed.filtered(lambda approval: not approval._get_transition_error('submit'))
+            if submittable:
+                submittable.action_submit()
+        return approvals
 
-            # Actualizar todas las líneas de hoja de tiempo usando contexto de omisión
-            for line in approval.timesheet_line_ids:
-                line.with_context(skip_timesheet_validation=True).write({
-                    'state': 'manager_approved',
-                    'manager_approval_date': approval.manager_approval_date,
-                })
+    @api.model
+    def _cron_close_previous_period(self):
+        """Generate the approvals of the last complete week or month in every company"""
+        params = self.env['ir.config_parameter'].sudo()
+        period = params.get_param('hr_timesheet_extended.period_close_range', 'week')
+        auto_submit = params.get_param('hr_timesheet_extended.period_close_auto_submit', 'False') == 'True'
+        current_start, _current_end = self._get_period_bounds(fields.Date.context_today(self), period)
+        date_start, date_end = self._get_period_bounds(current_start - timedelta(days=1), period)
+        for company in self.env['res.company'].search([]):
+            self.with_company(company).with_context(allowed_company_ids=company.ids)._generate_period_approvals(
+                date_start, date_end, auto_submit=auto_submit)
 
-        return res
+    @api.model
+    def _schedule_pending_summary_invalidation(self):
+        """
+        Expire the cached pending summaries once the transaction is committed.
+        The callback is registered on the first state change of the
+        transaction only, so that a batch of transitions bumps the generation
+        (and opens a cursor) once.
+        """
+        data = self.env.cr.postcommit.data
+        if not data.get(PENDING_SUMMARY_INVALIDATION_KEY):
+            data[PENDING_SUMMARY_INVALIDATION_KEY] = True
+            self.env.cr.postcommit.add(self._invalidate_pending_summary)
 
-    def action_ceo_approve(self):
-        self = self.with_context(skip_timesheet_validation=True)
-        for approval in self:
-            res = super(HrTimesheetApproval, approval).action_ceo_approve()
+    @api.model
+    def _invalidate_pending_summary(self):
+        """Expire the cached pending summaries of every worker, once the state change is committed"""
+        with self.env.registry.cursor() as cr:
+            cr.execute("SELECT nextval(%s)", [PENDING_SUMMARY_SEQUENCE])
 
-            # Actualizar todas las líneas de hoja de tiempo usando contexto de omisión
-            for line in approval.timesheet_line_ids:
-                line.with_context(skip_timesheet_validation=True).write({
-                    'state': 'ceo_approved',
-                    'ceo_approval_date': approval.ceo_approval_date,
-                })
+    @api.model
+    def _get_pending_summary(self):
+        """Return the pending approval summary of the current user, from the cache when still valid"""
+        self.env.cr.execute("SELECT last_value FROM %s" % PENDING_SUMMARY_SEQUENCE)
+        generation = self.env.cr.fetchone()[0]
+        return self._get_pending_summary_cached(generation, int(time.time() // PENDING_SUMMARY_TTL))
 
-        return res
+    @api.model
+    @tools.ormcache('self.env.uid', 'tuple(self.env.companies.ids)', 'generation', 'time_slot')
+    def _get_pending_summary_cached(self, generation, time_slot):
+        return self._compute_pending_summary()
 
-    def action_hr_approve(self):
-        self = self.with_context(skip_timesheet_validation=True)
-        for approval in self:
-            res = super(HrTimesheetApproval, approval).action_hr_approve()
+    @api.model
+    def _compute_pending_summary(self):
+        """
+        Count the approvals waiting on the current user per stage, with their
+        hours and how long the oldest one has been waiting, in one grouped query.
+        """
+        user = self.env.user
+        self.flush_model(['state', 'manager_id', 'company_id', 'total_hours', 'submitted_date',
+                          'manager_approval_date', 'ceo_approval_date'])
+        self.env.cr.execute("""
+            SELECT state,
+                   COUNT(*),
+                   COALESCE(SUM(total_hours), 0),
+                   EXTRACT(EPOCH FROM (NOW() AT TIME ZONE 'UTC') - MIN(
+                       CASE state
+                           WHEN 'submitted' THEN COALESCE(submitted_date, create_date)
+                           WHEN 'manager_approved' THEN COALESCE(manager_approval_date, create_date)
+                           ELSE COALESCE(ceo_approval_date, create_date)
+                       END)) / 86400
+              FROM hr_timesheet_approval
+             WHERE (company_id IS NULL OR company_id = ANY(%(company_ids)s))
+               AND ((state = 'submitted' AND manager_id = %(uid)s)
+                    OR (%(is_ceo)s AND state = 'manager_approved')
+                    OR (%(is_hr)s AND state = 'ceo_approved'))
+          GROUP BY state
+        """, {
+            'uid': user.id,
+            'company_ids': self.env.companies.ids,
+            'is_ceo': user.has_group('hr_timesheet_extended.group_timesheet_ceo'),
+            'is_hr': user.has_group('hr_timesheet_extended.group_timesheet_hr_approve'),
+        })
+        labels = dict(self._fields['state']._description_selection(self.env))
+        stages = [{
+            'state': state,
+            'name': labels.get(state, state),
+            'count': count,
+            'hours': float(hours),
+            'oldest_age_days': round(float(age or 0), 2),
+        } for state, count, hours, age in self.env.cr.fetchall()]
+        return {
+            'stages': stages,
+            'total_count': sum(stage['count'] for stage in stages),
+            'total_hours': sum(stage['hours'] for stage in stages),
+        }
 
-            # Actualizar todas las líneas de hoja de tiempo usando contexto de omisión
-            for line in approval.timesheet_line_ids:
-                line.with_context(skip_timesheet_validation=True).write({
-                    'state': 'hr_approved',
-                    'hr_approval_date': approval.hr_approval_date,
-                    'hr_manager_id': self.env.user.id,
-                })
+    def unlink(self):
+        self.env['timesheet.approval.report']._schedule_refresh(self.ids)
+        self.env['hr.timesheet.approval.inbox']._close(self)
+        return super(HrTimesheetApproval, self).unlink()
 
-        return res
+    # Override methods from the mixin to update the related timesheet lines
+    def _after_transition(self, state, vals):
+        res = super(HrTimesheetApproval, self)._after_transition(state, vals)
 
-    def action_reject(self, reason=None):
-        self = self.with_context(skip_timesheet_validation=True)
-        for approval in self:
-            res = super(HrTimesheetApproval, approval).action_reject(reason)
+        if state == 'submitted' and not self.env.context.get('timeoff_warning_shown'):
+            # Verificar si hay líneas de tiempo libre y mostrar advertencia
+            for approval in self.filtered('has_timeoff_entries'):
+                approval.message_post(
+                    body=_("Warning: This approval contains time off entries that cannot be modified directly."))
 
-            # Actualizar todas las líneas de hoja de tiempo usando contexto de omisión
-            for line in approval.timesheet_line_ids:
-                line.with_context(skip_timesheet_validation=True).write({
-                    'state': 'rejected',
-                    'rejection_date': approval.rejection_date,
-                    'rejection_reason': reason,
-                    'rejected_by': self.env.user.id,
-                })
+        line_vals = dict(vals)
+        if state == 'hr_approved':
+            line_vals['hr_manager_id'] = self.env.user.id
 
-        return res
+        lines = self.timesheet_line_ids
+        if state == 'draft':
+            # للسجلات المحققة، نضيف ملاحظة في السجل
+            validated_lines = lines.filtered('validated')
+            for approval in validated_lines.timesheet_approval_id:
+                approval_lines = validated_lines.filtered(lambda line: line.timesheet_approval_id == approval)
+                approval.message_post(body=_("Validated timesheet entries %s cannot be reset to draft.")
+                                      % ", ".join(approval_lines.mapped('name')))
+            lines -= validated_lines
 
-    def action_reset_to_draft(self):
-        for approval in self:
-            # التحقق ما إذا كانت جميع السجلات محققة
-            all_validated = approval.has_validated_entries and len(approval.timesheet_line_ids) == len(
-                approval.timesheet_line_ids.filtered('validated'))
-
-            if all_validated:
-                raise UserError(_("Cannot reset to draft: All timesheet entries in this approval are validated."))
-
-            res = super(HrTimesheetApproval, approval).action_reset_to_draft()
-
-            # Update non-validated timesheet lines only
-            for line in approval.timesheet_line_ids:
-                if not hasattr(line, 'validated') or not line.validated:
-                    line.write({
-                        'state': 'draft',
-                        'submitted_date': False,
-                        'manager_approval_date': False,
-                        'ceo_approval_date': False,
-                        'hr_approval_date': False,
-                        'rejection_date': False,
-                        'rejection_reason': False,
-                        'rejected_by': False,
-                    })
-                else:
-                    # للسجلات المحققة، نضيف ملاحظة في السجل
-                    approval.message_post(body=_("Validated timesheet entry %s cannot be reset to draft.") % line.name)
+        # Actualizar todas las líneas de todas las aprobaciones con una sola escritura agrupada
+        lines.with_context(skip_timesheet_validation=True).write(line_vals)
 
         return res
 
+    def _should_enqueue_transition(self):
+        """Large batches are handed off to a background job instead of running in the request"""
+        if self.env.context.get('approval_job_running'):
+            return False
+        threshold = int(self.env['ir.config_parameter'].sudo().get_param(
+            'hr_timesheet_extended.approval_job_threshold', 200))
+        return 0 < threshold < len(self)
+
+    def _enqueue_transition(self, transition, reason=None):
+        job = self.env['hr.timesheet.approval.job'].sudo()._enqueue(self, transition, reason)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Processing in background'),
+                'message': _('%s timesheet approvals will be processed in the background (%s). '
+                             'You will be notified when it is done.') % (len(self), job.name),
+                'sticky': False,
+                'type': 'info',
+            }
+        }
+
+    def action_submit(self):
+        if self._should_enqueue_transition():
+            return self._enqueue_transition('submit')
+        self._materialize_meeting_timesheets()
+        return super(HrTimesheetApproval, self.with_context(skip_timesheet_validation=True)).action_submit()
+
+    def action_manager_approve(self):
+        if self._should_enqueue_transition():
+            return self._enqueue_transition('manager_approve')
+        return super(HrTimesheetApproval, self.with_context(skip_timesheet_validation=True)).action_manager_approve()
+
+    def action_ceo_approve(self):
+        if self._should_enqueue_transition():
+            return self._enqueue_transition('ceo_approve')
+        return super(HrTimesheetApproval, self.with_context(skip_timesheet_validation=True)).action_ceo_approve()
+
+    def action_hr_approve(self):
+        if self._should_enqueue_transition():
+            return self._enqueue_transition('hr_approve')
+        return super(HrTimesheetApproval, self.with_context(skip_timesheet_validation=True)).action_hr_approve()
+
+    def action_reject(self, reason=None):
+        if self._should_enqueue_transition():
+            return self._enqueue_transition('reject', reason)
+        return super(HrTimesheetApproval, self.with_context(skip_timesheet_validation=True)).action_reject(reason)
+
+    def action_reset_to_draft(self):
+        if self._should_enqueue_transition():
+            return self._enqueue_transition('reset_to_draft')
+        return super(HrTimesheetApproval, self).action_reset_to_draft()
+
     def _onchange_employee_id(self):
         """When employee changes, update the manager and department head"""
         if self.employee_id:
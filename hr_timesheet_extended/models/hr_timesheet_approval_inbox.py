@@ -0,0 +1,88 @@
+from odoo import models, fields, api, _
+
+# Approval stages waiting on a whole group, with the group they are addressed to
+INBOX_STAGES = {
+    'ceo': 'hr_timesheet_extended.group_timesheet_ceo',
+    'hr': 'hr_timesheet_extended.group_timesheet_hr_approve',
+}
+
+
+class HrTimesheetApprovalInbox(models.Model):
+    """
+    Shared inbox of the approvals waiting on the CEO or HR approvers. Each
+    waiting record has one row per stage, addressed to the approver group,
+    instead of one activity per approver.
+    """
+    _name = 'hr.timesheet.approval.inbox'
+    _description = 'Timesheet Approval Inbox'
+    _order = 'create_date, id'
+    _rec_name = 'res_name'
+
+    res_model = fields.Char(string='Document Model', required=True, readonly=True, index=True)
+    res_id = fields.Many2oneReference(string='Document', model_field='res_model', required=True, readonly=True)
+    res_name = fields.Char(string='Document Name', readonly=True)
+    stage = fields.Selection([
+        ('ceo', 'CEO Approval'),
+        ('hr', 'HR Approval'),
+    ], string='Stage', required=True, readonly=True)
+    group_id = fields.Many2one('res.groups', string='Approvers', required=True, readonly=True, ondelete='cascade')
+    employee_id = fields.Many2one('hr.employee', string='Employee', readonly=True, ondelete='cascade')
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+
+    _sql_constraints = [
+        ('record_stage_uniq', 'unique(res_model, res_id, stage)', 'A document can only wait once per stage.'),
+    ]
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS hr_timesheet_approval_inbox_group_stage_index
+                ON hr_timesheet_approval_inbox (group_id, stage, company_id)
+        """)
+
+    @api.model
+    def _post(self, records, stage):
+        """Put ``records`` in the inbox of the approver group of ``stage``"""
+        group = self.env.ref(INBOX_STAGES[stage], raise_if_not_found=False)
+        if not records or not group:
+            return self.browse()
+        self._close(records, [stage])
+        Notification = self.env['hr.timesheet.approval.notification']
+        if Notification._is_digest_mode():
+            Notification._queue_for_group(records, group, dict(self._fields['stage'].selection)[stage])
+        return self.sudo().create([{
+            'res_model': record._name,
+            'res_id': record.id,
+            'res_name': record.display_name,
+            'stage': stage,
+            'group_id': group.id,
+            'employee_id': record.employee_id.id,
+            'company_id': record.company_id.id if 'company_id' in record._fields else False,
+        } for record in records])
+
+    @api.model
+    def _close(self, records, stages=None):
+        """Remove ``records`` from the inbox, for all stages or only ``stages``"""
+        if not records:
+            return
+        domain = [('res_model', '=', records._name), ('res_id', 'in', records.ids)]
+        if stages:
+            domain.append(('stage', 'in', stages))
+        self.sudo().search(domain).unlink()
+
+    @api.model
+    def _get_inbox_counters(self):
+        """Return {(res_model, stage): count} of the rows visible to the current user, in one grouped query"""
+        return {
+            (res_model, stage): count
+            for res_model, stage, count in self._read_group([], ['res_model', 'stage'], ['__count'])
+        }
+
+    def action_open_document(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self.res_model,
+            'res_id': self.res_id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
@@ -0,0 +1,203 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from markupsafe import Markup
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+TRANSITIONS = [
+    ('submit', 'Submit'),
+    ('manager_approve', 'Manager Approval'),
+    ('ceo_approve', 'CEO Approval'),
+    ('hr_approve', 'HR Approval'),
+    ('reject', 'Rejection'),
+    ('reset_to_draft', 'Reset to Draft'),
+]
+
+# Seconds a cron run may spend on jobs before handing over to a new run
+CRON_TIME_BUDGET = 240
+
+
+class HrTimesheetApprovalJob(models.Model):
+    """
+    Background job applying a workflow transition to a large set of timesheet
+    approvals. Approvals are processed in chunks by a cron, committing after
+    each chunk, and the outcome of every approval is kept on the job lines.
+    """
+    _name = 'hr.timesheet.approval.job'
+    _description = 'Timesheet Approval Job'
+    _inherit = ['mail.thread']
+    _order = 'id desc'
+
+    name = fields.Char(string='Reference', required=True, readonly=True, default=lambda self: _('New'))
+    transition = fields.Selection(TRANSITIONS, string='Operation', required=True, readonly=True)
+    reason = fields.Text(string='Rejection Reason', readonly=True)
+    user_id = fields.Many2one('res.users', string='Requested By', required=True, readonly=True,
+                              default=lambda self: self.env.user)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('running', 'In Progress'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, readonly=True, tracking=True)
+    chunk_size = fields.Integer(string='Chunk Size', readonly=True, default=lambda self: self._default_chunk_size())
+    line_ids = fields.One2many('hr.timesheet.approval.job.line', 'job_id', string='Approvals', readonly=True)
+    date_done = fields.Datetime(string='Finished On', readonly=True)
+
+    total_count = fields.Integer(string='Total', compute='_compute_counts')
+    done_count = fields.Integer(string='Processed', compute='_compute_counts')
+    failed_count = fields.Integer(string='Failed', compute='_compute_counts')
+    progress = fields.Float(string='Progress', compute='_compute_counts')
+
+    @api.model
+    def _default_chunk_size(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param(
+            'hr_timesheet_extended.approval_job_chunk_size', 50))
+
+    @api.depends('line_ids.state')
+    def _compute_counts(self):
+        counts = {
+            (job.id, state): count
+            for job, state, count in self.env['hr.timesheet.approval.job.line']._read_group(
+                [('job_id', 'in', self.ids)], ['job_id', 'state'], ['__count'])
+        }
+        for job in self:
+            done = counts.get((job.id, 'done'), 0)
+            failed = counts.get((job.id, 'failed'), 0)
+            job.done_count = done
+            job.failed_count = failed
+            job.total_count = done + failed + counts.get((job.id, 'pending'), 0)
+            job.progress = job.total_count and 100.0 * (done + failed) / job.total_count
+
+    @api.model
+    def _enqueue(self, approvals, transition, reason=None):
+        """Create a job applying ``transition`` to ``approvals`` and wake up the cron"""
+        job = self.create({
+            'name': _('%s of %s timesheet approvals') % (dict(TRANSITIONS)[transition], len(approvals)),
+            'transition': transition,
+            'reason': reason,
+            'user_id': self.env.user.id,
+            'line_ids': [(0, 0, {'approval_id': approval_id}) for approval_id in approvals.ids],
+        })
+        self.env.ref('hr_timesheet_extended.ir_cron_process_approval_jobs')._trigger()
+        return job
+
+    @api.model
+    def _cron_process_jobs(self):
+        deadline = time.time() + CRON_TIME_BUDGET
+        for job in self.search([('state', 'in', ('pending', 'running'))], order='id'):
+            if not job._process(deadline=deadline, auto_commit=True):
+                # Out of time: let a new run pick up the remaining chunks
+                self.env.ref('hr_timesheet_extended.ir_cron_process_approval_jobs')._trigger()
+                break
+
+    def _process(self, deadline=None, auto_commit=False):
+        """
+        Process the pending lines of the job chunk by chunk.
+
+        :return: False when the deadline was reached before the job was done
+        """
+        self.ensure_one()
+        self.state = 'running'
+        JobLine = self.env['hr.timesheet.approval.job.line']
+        Approval = self.env['hr.timesheet.approval'].with_user(self.user_id).with_context(
+            approval_job_running=True)
+
+        while True:
+            lines = JobLine.search([('job_id', '=', self.id), ('state', '=', 'pending')],
+                                   limit=max(self.chunk_size, 1), order='id')
+            if not lines:
+                break
+            errors = self._process_chunk(Approval.browse(lines.approval_id.ids))
+            failed_lines = lines.filtered(lambda line: line.approval_id.id in errors)
+            (lines - failed_lines).write({'state': 'done'})
+            for line in failed_lines:
+                line.write({'state': 'failed', 'error': errors[line.approval_id.id]})
+            if auto_commit:
+                self.env.cr.commit()
+            if deadline and time.time() > deadline:
+                return False
+
+        self._finalize()
+        if auto_commit:
+            self.env.cr.commit()
+        return True
+
+    def _process_chunk(self, approvals):
+        """
+        Apply the transition to one chunk and return {approval_id: error}.
+        When the chunk fails as a whole, its approvals are retried one by one
+        so that a single bad approval does not fail the others.
+        """
+        errors = {}
+        valid_ids = []
+        for approval in approvals:
+            try:
+                error = approval._get_transition_error(self.transition)
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+            if error:
+                errors[approval.id] = error
+            else:
+                valid_ids.append(approval.id)
+        if not valid_ids:
+            return errors
+
+        error = self._apply_transition(approvals.browse(valid_ids))
+        if error and len(valid_ids) > 1:
+            _logger.warning("Timesheet approval job %s: chunk failed, retrying one by one: %s", self.id, error)
+            for approval in approvals.browse(valid_ids):
+                error = self._apply_transition(approval)
+                if error:
+                    errors[approval.id] = error
+        elif error:
+            errors.update({approval_id: error for approval_id in valid_ids})
+        return errors
+
+    def _apply_transition(self, approvals):
+        """Apply the transition inside a savepoint and return the error message, or False"""
+        try:
+            with self.env.cr.savepoint():
+                if self.transition == 'reject':
+                    approvals.action_reject(self.reason)
+                else:
+                    getattr(approvals, 'action_%s' % self.transition)()
+                approvals.flush_model()
+        except Exception as e:
+            _logger.warning("Timesheet approval job %s: %s failed: %s", self.id, approvals, e)
+            # The savepoint rollback leaves the cache out of sync with the database
+            self.env.invalidate_all()
+            return str(e) or e.__class__.__name__
+        return False
+
+    def _finalize(self):
+        """Close the job and post a summary for the requester"""
+        self.ensure_one()
+        self.write({
+            'state': 'failed' if self.total_count and self.failed_count == self.total_count else 'done',
+            'date_done': fields.Datetime.now(),
+        })
+        failed_lines = self.line_ids.filtered(lambda line: line.state == 'failed')
+        summary = [_("%(done)s of %(total)s timesheet approvals processed, %(failed)s failed.",
+                     done=self.done_count, total=self.total_count, failed=self.failed_count)]
+        summary += ["%s: %s" % (line.approval_id.display_name, line.error) for line in failed_lines[:50]]
+        self.message_post(body=Markup("<br/>").join(summary), partner_ids=self.user_id.partner_id.ids,
+                          subtype_xmlid='mail.mt_comment')
+
+
+class HrTimesheetApprovalJobLine(models.Model):
+    _name = 'hr.timesheet.approval.job.line'
+    _description = 'Timesheet Approval Job Line'
+    _order = 'id'
+
+    job_id = fields.Many2one('hr.timesheet.approval.job', string='Job', required=True, ondelete='cascade',
+                             index=True)
+    approval_id = fields.Many2one('hr.timesheet.approval', string='Timesheet Approval', required=True,
+                                  ondelete='cascade')
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, index=True)
+    error = fields.Text(string='Error')
@@ -0,0 +1,141 @@
+from odoo import models, fields, api, _
+from markupsafe import Markup
+from collections import defaultdict
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class HrTimesheetApprovalNotification(models.Model):
+    """
+    Approval notifications waiting for the next digest. In digest mode the
+    workflow queues one row per recipient instead of creating activities, and
+    a cron sends every approver one summary mail per interval.
+    """
+    _name = 'hr.timesheet.approval.notification'
+    _description = 'Pending Timesheet Approval Notification'
+    _order = 'id'
+
+    user_id = fields.Many2one('res.users', string='Recipient', ondelete='cascade', index=True)
+    group_id = fields.Many2one('res.groups', string='Recipient Group', ondelete='cascade')
+    company_id = fields.Many2one('res.company', string='Company')
+    res_model = fields.Char(string='Document Model', required=True)
+    res_id = fields.Many2oneReference(string='Document', model_field='res_model', required=True)
+    res_state = fields.Char(string='Document State',
+                            help="State of the document when the notification was queued: the notification is "
+                                 "left out of the digest once the document has moved on.")
+    summary = fields.Char(string='Summary')
+    note = fields.Html(string='Note')
+
+    @api.model
+    def _is_digest_mode(self):
+        return self.env['ir.config_parameter'].sudo().get_param(
+            'hr_timesheet_extended.approval_notification_mode', 'immediate') == 'digest'
+
+    @api.model
+    def _queue_from_activity_vals(self, vals_list):
+        """Queue the approval activities described by ``vals_list`` for the next digest"""
+        models_by_id = {}
+        rows = []
+        for vals in vals_list:
+            model_id = vals['res_model_id']
+            if model_id not in models_by_id:
+                models_by_id[model_id] = self.env['ir.model'].browse(model_id).model
+            record = self.env[models_by_id[model_id]].browse(vals['res_id'])
+            rows.append({
+                'user_id': vals['user_id'],
+                'res_model': record._name,
+                'res_id': record.id,
+                'res_state': record.state if 'state' in record._fields else False,
+                'summary': vals.get('summary'),
+                'note': vals.get('note'),
+            })
+        return self.sudo().create(rows)
+
+    @api.model
+    def _queue_for_group(self, records, group, summary):
+        """Queue a notification of ``records`` for every member of ``group``"""
+        return self.sudo().create([{
+            'group_id': group.id,
+            'company_id': record.company_id.id if 'company_id' in record._fields else False,
+            'res_model': record._name,
+            'res_id': record.id,
+            'res_state': record.state if 'state' in record._fields else False,
+            'summary': summary,
+        } for record in records])
+
+    @api.model
+    def _cron_send_digest(self):
+        """
+        Send one summary mail per recipient listing the queued documents still
+        waiting for them, then empty the queue.
+        """
+        rows = self.search([])
+        if not rows:
+            return
+
+        # Expand the group rows to their active members in the company of the document
+        row_ids_by_user = defaultdict(list)
+        for row in rows:
+            if row.user_id:
+                row_ids_by_user[row.user_id].append(row.id)
+                continue
+            for user in row.group_id.users:
+                if user.active and (not row.company_id or row.company_id in user.company_ids):
+                    row_ids_by_user[user].append(row.id)
+
+        mail_vals = []
+        for user, row_ids in row_ids_by_user.items():
+            items = self.browse(row_ids)._get_digest_items(user)
+            if items and user.email:
+                mail_vals.append(self._prepare_digest_mail_vals(user, items))
+        if mail_vals:
+            self.env['mail.mail'].sudo().create(mail_vals)
+        _logger.info("Sent %s timesheet approval digests for %s notifications", len(mail_vals), len(rows))
+        rows.unlink()
+
+    def _get_digest_items(self, user):
+        """
+        Return the (record, summary) pairs of these rows whose document is still
+        pending for ``user``: it exists, is still in the state it was queued in,
+        and ``user`` is still its manager for submitted documents.
+        """
+        items = []
+        ids_by_model = defaultdict(set)
+        for row in self:
+            ids_by_model[row.res_model].add(row.res_id)
+        existing = {
+            model: set(self.env[model].browse(list(ids)).exists().ids)
+            for model, ids in ids_by_model.items()
+        }
+        seen = set()
+        for row in self:
+            key = (row.res_model, row.res_id, row.summary)
+            if row.res_id not in existing[row.res_model] or key in seen:
+                continue
+            record = self.env[row.res_model].browse(row.res_id)
+            if row.res_state and record.state != row.res_state:
+                continue
+            if row.user_id and row.res_state == 'submitted' and record._get_manager_user() != user:
+                continue
+            seen.add(key)
+            items.append((record, row.summary))
+        return items
+
+    @api.model
+    def _prepare_digest_mail_vals(self, user, items):
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        lines = Markup('').join(
+            Markup('<li><a href="%s/web#model=%s&amp;id=%s&amp;view_type=form">%s</a>: %s</li>') % (
+                base_url, record._name, record.id, record.sudo().display_name, summary or '')
+            for record, summary in items
+        )
+        body = Markup('<p>%s</p><ul>%s</ul>') % (
+            _('Hello %s, the following timesheets are waiting for you:', user.name), lines)
+        return {
+            'subject': _('Timesheet approvals: %s pending', len(items)),
+            'body_html': body,
+            'email_to': user.email_formatted,
+            'email_from': self.env.company.email_formatted or self.env.user.email_formatted,
+            'auto_delete': True,
+        }
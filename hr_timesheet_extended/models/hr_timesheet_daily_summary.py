@@ -0,0 +1,154 @@
+from odoo import models, fields, api
+from odoo.tools import split_every
+from datetime import timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Number of (employee, day) pairs summarized per query when the table is rebuilt
+REBUILD_BATCH_SIZE = 10000
+
+
+class HrTimesheetDailySummary(models.Model):
+    """
+    One row per employee and day, maintained incrementally from the timesheet
+    lines. Expected hours are counted once per day, so overtime and totals can
+    be summed in pivot and graph views without inflating the minimum hours.
+
+    Expected hours come from the employee's contracts, as for the approval
+    minimum hours, so a day reports the same expected hours whether it has
+    lines or not. Working days without any timesheet line get a row with their
+    expected hours only, so that the expected hours of a period are not
+    undercounted. These rows are created for the days refreshed from the lines
+    and for the whole period of every timesheet approval.
+    """
+    _name = 'hr.timesheet.daily.summary'
+    _description = 'Timesheet Daily Summary'
+    _order = 'date desc, employee_id'
+    _log_access = False
+    _rec_name = 'employee_id'
+
+    employee_id = fields.Many2one('hr.employee', string='Employee', required=True, readonly=True,
+                                  ondelete='cascade', index=True)
+    date = fields.Date(string='Date', required=True, readonly=True, index=True)
+    department_id = fields.Many2one('hr.department', string='Department', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    worked_hours = fields.Float(string='Worked Hours', readonly=True)
+    expected_hours = fields.Float(string='Expected Hours', readonly=True)
+    overtime_hours = fields.Float(string='Overtime Hours', readonly=True)
+    line_count = fields.Integer(string='Timesheet Entries', readonly=True)
+    has_timeoff = fields.Boolean(string='Has Time Off', readonly=True)
+    has_validated = fields.Boolean(string='Has Validated Entries', readonly=True)
+
+    _sql_constraints = [
+        ('employee_date_uniq', 'unique(employee_id, date)', 'Only one summary per employee and day is allowed.'),
+    ]
+
+    @api.model
+    def _refresh_days(self, keys):
+        """Recompute the summary rows of the given (employee_id, date) pairs from their timesheet lines"""
+        keys = list({key for key in keys if key[0] and key[1]})
+        if not keys:
+            return
+        self.env.cr.execute("""
+            DELETE FROM hr_timesheet_daily_summary s
+             USING unnest(%s::int[], %s::date[]) AS k(employee_id, date)
+             WHERE s.employee_id = k.employee_id
+               AND s.date = k.date
+        """, ([key[0] for key in keys], [key[1] for key in keys]))
+        self._insert_days(keys)
+        self.invalidate_model()
+
+    @api.model
+    def _fill_periods(self, periods):
+        """Create the rows of the working days without timesheet lines of (employee_id, date_from, date_to) periods"""
+        keys = {
+            (employee_id, date_from + timedelta(days=offset))
+            for employee_id, date_from, date_to in periods
+            for offset in range((date_to - date_from).days + 1)
+        }
+        if keys:
+            self._insert_days(keys)
+            self.invalidate_model()
+
+    @api.model
+    def _insert_days(self, keys):
+        """
+        Insert the rows of the (employee_id, date) ``keys`` that have no row yet.
+        Worked hours come from the timesheet lines and expected hours from the
+        employee's contracts, through the same computation as the approval
+        minimum hours, whether the day has lines or not. Days without lines
+        nor expected hours get no row.
+        """
+        keys = list(keys)
+        self.env['account.analytic.line'].flush_model([
+            'employee_id', 'date', 'project_id', 'unit_amount', 'holiday_id', 'global_leave_id', 'validated',
+        ])
+        self.env.cr.execute("""
+            SELECT k.employee_id,
+                   k.date,
+                   COALESCE(SUM(l.unit_amount), 0),
+                   COUNT(l.id),
+                   COALESCE(BOOL_OR(l.holiday_id IS NOT NULL OR l.global_leave_id IS NOT NULL), FALSE),
+                   COALESCE(BOOL_OR(l.validated), FALSE)
+              FROM unnest(%s::int[], %s::date[]) AS k(employee_id, date)
+         LEFT JOIN account_analytic_line l
+                ON l.employee_id = k.employee_id
+               AND l.date = k.date
+               AND l.project_id IS NOT NULL
+             WHERE NOT EXISTS (
+                   SELECT 1
+                     FROM hr_timesheet_daily_summary s
+                    WHERE s.employee_id = k.employee_id
+                      AND s.date = k.date)
+          GROUP BY k.employee_id, k.date
+        """, ([key[0] for key in keys], [key[1] for key in keys]))
+        days = self.env.cr.fetchall()
+        if not days:
+            return
+
+        day_hours = self.env['hr.timesheet.approval']._get_period_day_hours(
+            (employee_id, day, day) for employee_id, day, *_stats in days)
+        employees = self.env['hr.employee'].browse({employee_id for employee_id, *_rest in days})
+        employees.fetch(['department_id', 'company_id'])
+        rows = []
+        for employee_id, day, worked_hours, line_count, has_timeoff, has_validated in days:
+            expected_hours = day_hours[(employee_id, day, day)].get(day, 0.0)
+            if not line_count and not expected_hours:
+                continue
+            employee = employees.browse(employee_id)
+            rows.append((employee_id, day, employee.department_id.id or None, employee.company_id.id or None,
+                         worked_hours, expected_hours, max(worked_hours - expected_hours, 0.0), line_count,
+                         has_timeoff, has_validated))
+        if not rows:
+            return
+        self.env.cr.execute("""
+            INSERT INTO hr_timesheet_daily_summary (
+                employee_id, date, department_id, company_id, worked_hours, expected_hours,
+                overtime_hours, line_count, has_timeoff, has_validated
+            )
+            SELECT *
+              FROM unnest(%s::int[], %s::date[], %s::int[], %s::int[], %s::float8[], %s::float8[],
+                          %s::float8[], %s::int[], %s::bool[], %s::bool[])
+            ON CONFLICT (employee_id, date) DO NOTHING
+        """, tuple(map(list, zip(*rows))))
+
+    @api.model
+    def _rebuild_all(self):
+        """Rebuild the whole table from the timesheet lines and the approval periods"""
+        self.env['account.analytic.line'].flush_model(['employee_id', 'date', 'project_id'])
+        self.env['hr.timesheet.approval'].flush_model(['employee_id', 'date_start', 'date_end'])
+        self.env.cr.execute("DELETE FROM hr_timesheet_daily_summary")
+        self.env.cr.execute("""
+            SELECT DISTINCT employee_id, date
+              FROM account_analytic_line
+             WHERE project_id IS NOT NULL
+               AND employee_id IS NOT NULL
+        """)
+        for keys in split_every(REBUILD_BATCH_SIZE, self.env.cr.fetchall()):
+            self._insert_days(keys)
+        self.env.cr.execute("SELECT employee_id, date_start, date_end FROM hr_timesheet_approval")
+        for periods in split_every(REBUILD_BATCH_SIZE // 31, self.env.cr.fetchall()):
+            self._fill_periods(periods)
+        self.invalidate_model()
+        _logger.info("Rebuilt timesheet daily summaries")
@@ -0,0 +1,131 @@
+from odoo import models, fields, api
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from pytz import utc
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class HrTimesheetExpectedHours(models.Model):
+    """
+    Persistent cache of the expected working hours of a resource calendar for
+    a given day (calendar-wide leaves included). Rows are filled in bulk per
+    calendar and date range, and dropped whenever the calendar, its
+    attendances or its calendar-wide leaves change.
+    """
+    _name = 'hr.timesheet.expected.hours'
+    _description = 'Timesheet Expected Hours Cache'
+    _log_access = False
+    _order = 'calendar_id, date'
+
+    calendar_id = fields.Many2one('resource.calendar', string='Working Schedule', required=True,
+                                  ondelete='cascade', index=True)
+    date = fields.Date(string='Date', required=True)
+    hours = fields.Float(string='Expected Hours')
+
+    def init(self):
+        self.env.cr.execute("DROP INDEX IF EXISTS hr_timesheet_expected_hours_key_uniq")
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS hr_timesheet_expected_hours_calendar_date_uniq
+            ON hr_timesheet_expected_hours (calendar_id, date)
+        """)
+
+    @api.model
+    def _get_expected_hours(self, calendar, date_from, date_to):
+        """Return a {date: hours} mapping of ``calendar`` for [date_from, date_to]"""
+        return self._get_expected_hours_batch({calendar: (date_from, date_to)}).get(calendar.id, {})
+
+    @api.model
+    def _get_expected_hours_batch(self, calendar_ranges):
+        """
+        Return {calendar_id: {date: hours}} for every ``calendar: (date_from, date_to)``
+        item of ``calendar_ranges``. Missing days are computed with a single
+        ``_work_intervals_batch`` call per calendar and stored for later use.
+        """
+        calendar_ranges = {calendar: dates for calendar, dates in calendar_ranges.items() if calendar}
+        if not calendar_ranges:
+            return {}
+
+        global_from = min(date_from for date_from, date_to in calendar_ranges.values())
+        global_to = max(date_to for date_from, date_to in calendar_ranges.values())
+        self.env.cr.execute("""
+            SELECT calendar_id, date, hours
+              FROM hr_timesheet_expected_hours
+             WHERE calendar_id = ANY(%s)
+               AND date BETWEEN %s AND %s
+        """, ([calendar.id for calendar in calendar_ranges], global_from, global_to))
+        cached = defaultdict(dict)
+        for calendar_id, day, hours in self.env.cr.fetchall():
+            cached[calendar_id][day] = hours
+
+        result = {}
+        for calendar, (date_from, date_to) in calendar_ranges.items():
+            days = [date_from + timedelta(days=offset) for offset in range((date_to - date_from).days + 1)]
+            calendar_hours = cached[calendar.id]
+            missing = [day for day in days if day not in calendar_hours]
+            if missing:
+                computed = self._compute_day_hours(calendar, min(missing), max(missing))
+                self._store_day_hours(calendar, {day: computed[day] for day in missing})
+                calendar_hours.update(computed)
+            result[calendar.id] = {day: calendar_hours[day] for day in days}
+        return result
+
+    @api.model
+    def _compute_day_hours(self, calendar, date_from, date_to):
+        """
+        Compute the work hours of each day of [date_from, date_to] from one
+        batch of work intervals. Days are UTC days, as ``get_work_hours_count``
+        does with naive datetimes.
+        """
+        start_dt = datetime.combine(date_from, time.min).replace(tzinfo=utc)
+        end_dt = datetime.combine(date_to + timedelta(days=1), time.min).replace(tzinfo=utc)
+        intervals = calendar._work_intervals_batch(start_dt, end_dt)[False]
+
+        day_hours = defaultdict(float)
+        for start, stop, _meta in intervals:
+            start, stop = start.astimezone(utc), stop.astimezone(utc)
+            while start < stop:
+                next_day = datetime.combine(start.date() + timedelta(days=1), time.min).replace(tzinfo=utc)
+                chunk_end = min(stop, next_day)
+                day_hours[start.date()] += (chunk_end - start).total_seconds() / 3600
+                start = chunk_end
+
+        return {
+            date_from + timedelta(days=offset): day_hours.get(date_from + timedelta(days=offset), 0.0)
+            for offset in range((date_to - date_from).days + 1)
+        }
+
+    @api.model
+    def _store_day_hours(self, calendar, day_hours):
+        if not day_hours:
+            return
+        days = list(day_hours)
+        self.env.cr.execute("""
+            INSERT INTO hr_timesheet_expected_hours (calendar_id, date, hours)
+            SELECT %s, day, hours
+              FROM unnest(%s::date[], %s::float8[]) AS v(day, hours)
+            ON CONFLICT DO NOTHING
+        """, (calendar.id, days, [day_hours[day] for day in days]))
+
+    @api.model
+    def _invalidate_calendars(self, calendar_ids=None, date_from=None, date_to=None):
+        """
+        Drop cached days. ``calendar_ids=None`` drops every calendar (global
+        leaves apply to all of them); the optional dates bound the range.
+        """
+        query = "DELETE FROM hr_timesheet_expected_hours WHERE TRUE"
+        params = []
+        if calendar_ids is not None:
+            if not calendar_ids:
+                return
+            query += " AND calendar_id = ANY(%s)"
+            params.append(list(calendar_ids))
+        if date_from:
+            query += " AND date >= %s"
+            params.append(date_from)
+        if date_to:
+            query += " AND date <= %s"
+            params.append(date_to)
+        self.env.cr.execute(query, params)
+        self.invalidate_model()
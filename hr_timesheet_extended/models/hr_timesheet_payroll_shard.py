@@ -0,0 +1,119 @@
+from odoo import models, fields, api, _
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# First key of the advisory locks taken on payroll shards
+PAYROLL_SHARD_LOCK = 731017
+
+
+class HrTimesheetPayrollShard(models.Model):
+    """
+    Part of the payslips of a payroll batch, computed by its own one-shot cron
+    so that the shards of a batch run in parallel on several cron workers.
+    """
+    _name = 'hr.timesheet.payroll.shard'
+    _description = 'Timesheet Payroll Shard'
+    _order = 'batch_id, sequence'
+
+    batch_id = fields.Many2one('hr.payslip.run', string='Payroll Batch', required=True, ondelete='cascade',
+                               index=True)
+    sequence = fields.Integer(string='Shard', default=1)
+    payslip_ids = fields.Many2many('hr.payslip', string='Payslips')
+    payslip_count = fields.Integer(string='Payslips', compute='_compute_payslip_count')
+    chunk_size = fields.Integer(string='Chunk Size', default=100)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, index=True)
+    error = fields.Text(string='Error')
+    cron_id = fields.Many2one('ir.cron', string='Scheduled Action', ondelete='set null')
+
+    @api.depends('payslip_ids')
+    def _compute_payslip_count(self):
+        for shard in self:
+            shard.payslip_count = len(shard.payslip_ids)
+
+    @api.model
+    def _create_shards(self, batch, payslips, shard_count, chunk_size=100):
+        """Split ``payslips`` into ``shard_count`` shards and schedule one cron per shard"""
+        payslips = payslips.sorted('employee_id')
+        shard_count = max(min(shard_count, len(payslips)), 1)
+        shards = self.create([{
+            'batch_id': batch.id,
+            'sequence': index + 1,
+            'payslip_ids': [(6, 0, payslips[index::shard_count].ids)],
+            'chunk_size': chunk_size,
+        } for index in range(shard_count)])
+
+        model = self.env['ir.model']._get(self._name)
+        crons = self.env['ir.cron'].sudo().create([{
+            'name': _('Payroll: Compute %s (shard %s/%s)') % (batch.name, shard.sequence, shard_count),
+            'model_id': model.id,
+            'state': 'code',
+            'code': 'model._run_shard(%d)' % shard.id,
+            'user_id': self.env.uid,
+            'interval_number': 1,
+            'interval_type': 'days',
+            'numbercall': 1,
+            'nextcall': fields.Datetime.now(),
+            'doall': False,
+        } for shard in shards])
+        for shard, cron in zip(shards, crons):
+            shard.cron_id = cron
+        return shards
+
+    @api.model
+    def _run_shard(self, shard_id):
+        """Compute the payslips of one shard; called from the cron of the shard"""
+        self.env.cr.execute("SELECT pg_try_advisory_xact_lock(%s, %s)", (PAYROLL_SHARD_LOCK, shard_id))
+        if not self.env.cr.fetchone()[0]:
+            _logger.info("Payroll shard %s is already being computed by another worker", shard_id)
+            return
+
+        shard = self.browse(shard_id).exists()
+        if not shard or shard.state != 'pending':
+            return
+
+        try:
+            with self.env.cr.savepoint():
+                payslips = shard.payslip_ids.filtered(lambda payslip: payslip.state == 'draft')
+                chunk_size = max(shard.chunk_size, 1)
+                for index in range(0, len(payslips), chunk_size):
+                    payslips[index:index + chunk_size].with_context(salary_simulation=False).compute_sheet()
+                    self.env.flush_all()
+                    self.env.invalidate_all()
+        except Exception as e:
+            _logger.exception("Payroll shard %s failed", shard_id)
+            shard.write({'state': 'failed', 'error': str(e)})
+        else:
+            shard.state = 'done'
+
+        # Finalize the batch in a new transaction, once this shard is committed
+        self.env.ref('hr_timesheet_extended.ir_cron_finalize_payroll_shards')._trigger()
+
+    @api.model
+    def _cron_finalize_batches(self):
+        """Move the batches whose shards are all computed to the 'verify' state"""
+        self.flush_model(['batch_id', 'state'])
+        self.env.cr.execute("""
+            SELECT s.batch_id,
+                   BOOL_AND(s.state = 'done'),
+                   BOOL_AND(s.state != 'pending')
+              FROM hr_timesheet_payroll_shard s
+              JOIN hr_payslip_run r ON r.id = s.batch_id
+             WHERE r.state = 'draft'
+          GROUP BY s.batch_id
+        """)
+        for batch_id, all_done, all_finished in self.env.cr.fetchall():
+            if all_done:
+                self.env['hr.payslip.run'].browse(batch_id).state = 'verify'
+            elif all_finished:
+                _logger.warning("Payroll batch %s has failed shards and was left in draft", batch_id)
+
+    @api.autovacuum
+    def _gc_shard_crons(self):
+        """Remove the one-shot crons of the finished shards"""
+        shards = self.search([('state', '!=', 'pending'), ('cron_id', '!=', False)])
+        shards.cron_id.sudo().unlink()
@@ -0,0 +1,124 @@
+from odoo import models, fields, api, tools, _
+
+TIMESHEET_APPROVER_GROUPS = (
+    'hr_timesheet_extended.group_timesheet_ceo',
+    'hr_timesheet_extended.group_timesheet_hr_approve',
+)
+
+
+class ResUsers(models.Model):
+    _inherit = 'res.users'
+
+    timesheet_signature = fields.Binary(string='Timesheet Signature', attachment=True, copy=False,
+                                        help="Signature used to sign timesheet approvals in one click.")
+    timesheet_auto_submit = fields.Boolean(
+        string='Submit My Generated Timesheets',
+        help="Sign the timesheet approvals generated when a period is closed with the stored signature, "
+             "and submit them to my manager.")
+
+    @property
+    def SELF_READABLE_FIELDS(self):
+        return super().SELF_READABLE_FIELDS + ['timesheet_signature', 'timesheet_auto_submit']
+
+    @property
+    def SELF_WRITEABLE_FIELDS(self):
+        return super().SELF_WRITEABLE_FIELDS + ['timesheet_signature', 'timesheet_auto_submit']
+
+    @api.model
+    @tools.ormcache('group_xmlid', 'company_id')
+    def _get_timesheet_approver_ids(self, group_xmlid, company_id):
+        """Return the ids of the active users of the approver group ``group_xmlid`` allowed in ``company_id``"""
+        group = self.env.ref(group_xmlid, raise_if_not_found=False)
+        if not group:
+            return ()
+        return tuple(self.sudo().search([('groups_id', 'in', group.id), ('company_ids', 'in', company_id)]).ids)
+
+    @api.model
+    def _get_timesheet_approvers(self, group_xmlid, company=None):
+        """Return the approver users of ``group_xmlid`` in ``company`` (default: current company) from the cache"""
+        company = company or self.env.company
+        return self.browse(self._get_timesheet_approver_ids(group_xmlid, company.id))
+
+    @api.model
+    def _get_timesheet_approver_groups(self):
+        groups = self.env['res.groups']
+        for xmlid in TIMESHEET_APPROVER_GROUPS:
+            group = self.env.ref(xmlid, raise_if_not_found=False)
+            if group:
+                groups |= group
+        return groups
+
+    def _has_timesheet_approver(self):
+        """Whether one of these users is in the approver directory cache"""
+        approver_groups = self._get_timesheet_approver_groups()
+        return bool(approver_groups) and any(
+            user.groups_id & approver_groups for user in self.sudo().with_context(active_test=False))
+
+    @api.model
+    def _clear_timesheet_approver_cache(self):
+        # The registry cache is shared by all models and workers: only clear it when the directory changed
+        self.env.registry.clear_cache()
+
+    @api.model
+    def _get_activity_groups(self):
+        activities = super(ResUsers, self)._get_activity_groups()
+        Inbox = self.env['hr.timesheet.approval.inbox']
+        if not Inbox.check_access_rights('read', raise_exception=False):
+            return activities
+        count = sum(Inbox._get_inbox_counters().values())
+        if count:
+            activities.append({
+                'id': self.env['ir.model']._get(Inbox._name).id,
+                'name': _('Timesheet Approval Inbox'),
+                'model': Inbox._name,
+                # Not an activity model: the systray opens the inbox action instead of the activity views
+                'type': 'timesheet_approval_inbox',
+                'icon': '/hr_timesheet/static/description/icon.png',
+                'total_count': count,
+            })
+        return activities
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        users = super(ResUsers, self).create(vals_list)
+        if users._has_timesheet_approver():
+            self._clear_timesheet_approver_cache()
+        return users
+
+    def write(self, vals):
+        directory_changed = {'groups_id', 'active', 'company_ids'}.intersection(vals) or any(
+            key.startswith(('in_group_', 'sel_groups_')) for key in vals)
+        was_approver = directory_changed and self._has_timesheet_approver()
+        res = super(ResUsers, self).write(vals)
+        if directory_changed and (was_approver or self._has_timesheet_approver()):
+            self._clear_timesheet_approver_cache()
+        return res
+
+    def unlink(self):
+        was_approver = self._has_timesheet_approver()
+        res = super(ResUsers, self).unlink()
+        if was_approver:
+            self._clear_timesheet_approver_cache()
+        return res
+
+
+class ResGroups(models.Model):
+    _inherit = 'res.groups'
+
+    def _affects_timesheet_approvers(self):
+        """Whether changing the members of these groups changes the members of an approver group"""
+        approver_groups = self.env['res.users']._get_timesheet_approver_groups()
+        return bool((self | self.trans_implied_ids) & approver_groups)
+
+    def write(self, vals):
+        res = super(ResGroups, self).write(vals)
+        if {'users', 'implied_ids'}.intersection(vals) and self._affects_timesheet_approvers():
+            self.env['res.users']._clear_timesheet_approver_cache()
+        return res
+
+    def unlink(self):
+        affects_approvers = self._affects_timesheet_approvers()
+        res = super(ResGroups, self).unlink()
+        if affects_approvers:
+            self.env['res.users']._clear_timesheet_approver_cache()
+        return res
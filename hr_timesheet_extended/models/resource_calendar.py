@@ -0,0 +1,65 @@
+from odoo import models, api
+
+
+class ResourceCalendar(models.Model):
+    _inherit = 'resource.calendar'
+
+    def write(self, vals):
+        res = super(ResourceCalendar, self).write(vals)
+        self.env['hr.timesheet.expected.hours'].sudo()._invalidate_calendars(self.ids)
+        return res
+
+
+class ResourceCalendarAttendance(models.Model):
+    _inherit = 'resource.calendar.attendance'
+
+    def _invalidate_expected_hours(self):
+        self.env['hr.timesheet.expected.hours'].sudo()._invalidate_calendars(self.calendar_id.ids)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        attendances = super(ResourceCalendarAttendance, self).create(vals_list)
+        attendances._invalidate_expected_hours()
+        return attendances
+
+    def write(self, vals):
+        self._invalidate_expected_hours()
+        res = super(ResourceCalendarAttendance, self).write(vals)
+        if 'calendar_id' in vals:
+            self._invalidate_expected_hours()
+        return res
+
+    def unlink(self):
+        self._invalidate_expected_hours()
+        return super(ResourceCalendarAttendance, self).unlink()
+
+
+class ResourceCalendarLeaves(models.Model):
+    _inherit = 'resource.calendar.leaves'
+
+    def _invalidate_expected_hours(self):
+        ExpectedHours = self.env['hr.timesheet.expected.hours'].sudo()
+        # Leaves of a single resource do not change the calendar-wide hours that are cached
+        for leave in self.filtered(lambda leave: not leave.resource_id):
+            # Leaves without a calendar apply to every calendar
+            ExpectedHours._invalidate_calendars(
+                leave.calendar_id.ids if leave.calendar_id else None,
+                leave.date_from and leave.date_from.date(),
+                leave.date_to and leave.date_to.date(),
+            )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        leaves = super(ResourceCalendarLeaves, self).create(vals_list)
+        leaves._invalidate_expected_hours()
+        return leaves
+
+    def write(self, vals):
+        self._invalidate_expected_hours()
+        res = super(ResourceCalendarLeaves, self).write(vals)
+        self._invalidate_expected_hours()
+        return res
+
+    def unlink(self):
+        self._invalidate_expected_hours()
+        return super(ResourceCalendarLeaves, self).unlink()
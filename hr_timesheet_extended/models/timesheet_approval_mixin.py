@@ -60,17 +60,20 @@ class TimesheetApprovalMixin(models.AbstractModel):
 
     def _get_ceo_partners(self):
         """Get CEO partners for notifications"""
-        ceo_users = self.env['res.users'].search([
-            ('groups_id', 'in', self.env.ref('hr_timesheet_extended.group_timesheet_ceo').id)
-        ])
-        return ceo_users.mapped('partner_id')
+        return self._get_group_approvers('hr_timesheet_extended.group_timesheet_ceo').mapped('partner_id')
 
     def _get_hr_manager_partners(self):
         """الحصول على شركاء معتمدي الموارد البشرية للإشعارات"""
-        hr_approvers = self.env['res.users'].search([
-            ('groups_id', 'in', self.env.ref('hr_timesheet_extended.group_timesheet_hr_approve').id)
-        ])
-        return hr_approvers.mapped('partner_id')
+        return self._get_group_approvers('hr_timesheet_extended.group_timesheet_hr_approve').mapped('partner_id')
+
+    def _get_group_approvers(self, group_xmlid):
+        """Get the approvers of ``group_xmlid`` allowed in the companies of these records"""
+        Users = self.env['res.users']
+        companies = self.company_id if 'company_id' in self._fields else self.env['res.company']
+        approvers = Users
+        for company in companies or self.env.company:
+            approvers |= Users._get_timesheet_approvers(group_xmlid, company)
+        return approvers
 
     def _get_employee_partner(self):
         """Get employee partner for notifications"""
@@ -79,262 +82,304 @@ class TimesheetApprovalMixin(models.AbstractModel):
             return self.employee_id.user_id.partner_id
         return False
 
-    def _create_approval_activity(self, user, summary, note, days=0):
-        """Create an activity for approval workflow"""
-        activity_type_id = self.env.ref('mail.mail_activity_data_todo').id
-        model_id = self.env['ir.model']._get(self._name).id
+    def _get_manager_user(self):
+        """Get the user expected to give the manager approval"""
+        self.ensure_one()
+        if self.employee_id.timesheet_manager_id:
+            return self.employee_id.timesheet_manager_id
+        elif self.employee_id.parent_id and self.employee_id.parent_id.user_id:
+            return self.employee_id.parent_id.user_id
+        return self.env['res.users']
 
-        self.env['mail.activity'].create({
-            'activity_type_id': activity_type_id,
+    def _prepare_approval_activity_vals(self, user, summary, note):
+        """Return the values of an approval workflow activity of this record"""
+        self.ensure_one()
+        return {
+            'activity_type_id': self.env.ref('mail.mail_activity_data_todo').id,
             'automated': True,
+            'summary': summary,
             'note': note,
             'res_id': self.id,
-            'res_model_id': model_id,
+            'res_model_id': self.env['ir.model']._get(self._name).id,
             'user_id': user.id,
             'date_deadline': fields.Date.today(),  # Make it due immediately
-        })
+        }
+
+    def _create_approval_activity(self, user, summary, note, days=0):
+        """Create an activity for approval workflow"""
+        self._create_approval_activities([self._prepare_approval_activity_vals(user, summary, note)])
+
+    def _create_approval_activities(self, vals_list):
+        """Create many approval workflow activities in a single batch, or queue them for the digest"""
+        if not vals_list:
+            return
+        Notification = self.env['hr.timesheet.approval.notification']
+        if Notification._is_digest_mode():
+            Notification._queue_from_activity_vals(vals_list)
+        else:
+            self.env['mail.activity'].create(vals_list)
 
     def _cancel_pending_activities(self):
-        """Cancel all pending activities related to this record"""
+        """Cancel all pending activities related to these records"""
         activities = self.env['mail.activity'].search([
-            ('res_id', '=', self.id),
+            ('res_id', 'in', self.ids),
             ('res_model_id', '=', self.env['ir.model']._get(self._name).id),
         ])
         activities.unlink()
+        self.env['hr.timesheet.approval.inbox']._close(self)
 
-    def action_submit(self):
-        """Submit for approval workflow"""
-        if self.state != 'draft':
-            raise UserError(_("Only draft records can be submitted for approval."))
+    def _has_signature(self, field_name):
+        """Check a signature field without loading the image"""
+        self.ensure_one()
+        return field_name not in self._fields or bool(self.with_context(bin_size=True)[field_name])
+
+    def _get_transition_error(self, transition):
+        """
+        Return the reason why this record cannot go through ``transition``
+        (submit, manager_approve, ceo_approve, hr_approve, reject or
+        reset_to_draft), or False when it can.
+        """
+        self.ensure_one()
+        if transition == 'submit':
+            if self.state != 'draft':
+                return _("Only draft records can be submitted for approval.")
+            if not self._has_signature('employee_signature'):
+                return _("Please provide your signature before submitting for approval.")
+            if not self._get_manager_partner():
+                return _("Cannot submit for approval: No manager defined for employee %s.") % self.employee_id.name
+        elif transition == 'manager_approve':
+            if self.state != 'submitted':
+                return _("Only submitted records can be approved by the manager.")
+            if not self._check_manager_access():
+                return _("Only the assigned manager can approve this record.")
+            if not self._has_signature('manager_signature'):
+                return _("Please provide your signature before approving.")
+        elif transition == 'ceo_approve':
+            if self.state != 'manager_approved':
+                return _("Only manager-approved records can be approved by the CEO.")
+            if not self._check_ceo_access():
+                return _("Only the CEO can approve this record.")
+            if not self._has_signature('ceo_signature'):
+                return _("Please provide your signature before approving.")
+        elif transition == 'hr_approve':
+            if self.state != 'ceo_approved':
+                return _("Only CEO-approved records can be approved by HR.")
+            if not self._check_hr_manager_access():
+                return _("Only HR managers can approve this record.")
+            if not self._has_signature('hr_signature'):
+                return _("Please provide your signature before approving.")
+        elif transition == 'reject':
+            if self.state in ['draft', 'hr_approved']:
+                return _("Cannot reject records that are in draft or already approved by HR.")
+        elif transition == 'reset_to_draft':
+            if self.state == 'hr_approved':
+                return _("Cannot reset records that are already approved by HR.")
+            # تحقق من وجود سجلات timesheet محققة - لا نستطيع إعادة تعيينها إلى مسودة
+            if 'validated_line_count' in self._fields and (
+                    self.line_count and self.validated_line_count == self.line_count):
+                return _("Cannot reset to draft: All timesheet entries are validated.")
+        return False
 
-        # Check if employee signature exists
-        if hasattr(self, 'employee_signature') and not self.employee_signature:
-            raise UserError(_("Please provide your signature before submitting for approval."))
+    def _split_transition(self, transition):
+        """
+        Validate the whole recordset for ``transition`` at once.
+
+        :return: tuple of the records that can go through the transition and a
+            ``{record: reason}`` dict of the others
+        :raise UserError: when none of the records can go through it
+        """
+        valid_ids = []
+        failures = {}
+        for record in self:
+            error = record._get_transition_error(transition)
+            if error:
+                failures[record] = error
+            else:
+                valid_ids.append(record.id)
+        if failures and not valid_ids:
+            raise UserError("\n".join(dict.fromkeys(failures.values())))
+        return self.browse(valid_ids), failures
+
+    def _transition_result(self, failures):
+        """Return the action reporting the records skipped by a batch transition"""
+        if not failures:
+            return True
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('%s record(s) could not be processed') % len(failures),
+                'message': "\n".join("%s: %s" % (record.display_name, reason) for record, reason in failures.items()),
+                'sticky': True,
+                'type': 'warning',
+            }
+        }
+
+    def _log_validated_lines(self):
+        """Log the validated timesheet entries going through the workflow"""
+        if 'validated_line_count' in self._fields:
+            validated_count = sum(self.mapped('validated_line_count'))
+            if validated_count:
+                _logger.info("Processing %s validated timesheet entries", validated_count)
+
+    def _after_transition(self, state, vals):
+        """Hook called on the records that reached ``state``, with the values written on them"""
+        return True
 
-        # Check for validated timesheets
-        if hasattr(self, 'timesheet_line_ids'):
-            validated_lines = self.timesheet_line_ids.filtered(
-                lambda line: hasattr(line, 'validated') and line.validated)
-            if validated_lines:
-                _logger.info(
-                    "This approval contains validated timesheet entries. They will be processed but cannot be modified.")
+    def action_submit(self):
+        """Submit for approval workflow"""
+        records, failures = self._split_transition('submit')
+        records._log_validated_lines()
 
         # Set the state to submitted
-        self.write({
+        vals = {
             'state': 'submitted',
             'submitted_date': fields.Datetime.now(),
-        })
-
-        # Create notification for the manager
-        manager_partner = self._get_manager_partner()
-        if not manager_partner:
-            raise UserError(
-                _("Cannot submit for approval: No manager defined for employee %s.") % self.employee_id.name)
+        }
+        records.write(vals)
 
         # Create activity for manager
-        manager_user = None
-        if self.employee_id.timesheet_manager_id:
-            manager_user = self.employee_id.timesheet_manager_id
-        elif hasattr(self, 'employee_id') and self.employee_id.parent_id and self.employee_id.parent_id.user_id:
-            manager_user = self.employee_id.parent_id.user_id
-
-        if manager_user:
-            self._create_approval_activity(
-                manager_user,
-                _('Timesheet Approval Needed'),
-                _('Please review and approve the timesheet submitted by %s') % self.employee_id.name
-            )
+        activity_vals = []
+        for record in records:
+            manager_user = record._get_manager_user()
+            if manager_user:
+                activity_vals.append(record._prepare_approval_activity_vals(
+                    manager_user,
+                    _('Timesheet Approval Needed'),
+                    _('Please review and approve the timesheet submitted by %s') % record.employee_id.name
+                ))
+        records._create_approval_activities(activity_vals)
+
+        records._after_transition('submitted', vals)
+        return self._transition_result(failures)
 
     def action_manager_approve(self):
         """Manager approval action"""
-        if self.state != 'submitted':
-            raise UserError(_("Only submitted records can be approved by the manager."))
-
-        # Check if the current user is the manager
-        if not self._check_manager_access():
-            raise UserError(_("Only the assigned manager can approve this record."))
-
-        # Check if manager signature exists
-        if hasattr(self, 'manager_signature') and not self.manager_signature:
-            raise UserError(_("Please provide your signature before approving."))
-
-        # تحقق من وجود سجلات timesheet محققة
-        if hasattr(self, 'timesheet_line_ids'):
-            validated_lines = self.timesheet_line_ids.filtered(
-                lambda line: hasattr(line, 'validated') and line.validated)
-            if validated_lines:
-                _logger.info("This approval contains %s validated timesheet entries", len(validated_lines))
+        records, failures = self._split_transition('manager_approve')
+        records._log_validated_lines()
 
         # Mark as approved by manager
-        self.write({
+        vals = {
             'state': 'manager_approved',
             'manager_approval_date': fields.Datetime.now(),
-        })
+        }
+        records.write(vals)
 
         # Revert manager's activity feedback
-        self.activity_feedback(['mail.mail_activity_data_todo'])
+        if records:
+            records.activity_feedback(['mail.mail_activity_data_todo'])
 
-        # Create notification for the CEO
+        # Put the records in the shared inbox of the CEOs
         try:
             ceo_partners = self._get_ceo_partners()
             if not ceo_partners:
                 # Don't post a message, just log the info
                 _logger.info('Approved by manager, no CEO defined in the system.')
-                return True
-
-            # Create activity for CEO users
-            ceo_users = self.env['res.users'].search([
-                ('groups_id', 'in', self.env.ref('hr_timesheet_extended.group_timesheet_ceo').id)
-            ])
-            for ceo_user in ceo_users:
-                self._create_approval_activity(
-                    ceo_user,
-                    _('CEO Approval Needed'),
-                    _('Please review and approve the timesheet of %s after manager approval') % self.employee_id.name
-                )
+            else:
+                self.env['hr.timesheet.approval.inbox']._post(records, 'ceo')
         except Exception as e:
             # Log the error but don't block the approval
             _logger.error("Error notifying CEO: %s", str(e))
 
-        return True
+        records._after_transition('manager_approved', vals)
+        return self._transition_result(failures)
 
     def action_ceo_approve(self):
         """CEO approval action"""
-        if self.state != 'manager_approved':
-            raise UserError(_("Only manager-approved records can be approved by the CEO."))
+        records, failures = self._split_transition('ceo_approve')
 
-        # Check if the current user is a CEO
-        if not self._check_ceo_access():
-            raise UserError(_("Only the CEO can approve this record."))
-
-        # Check if CEO signature exists
-        if hasattr(self, 'ceo_signature') and not self.ceo_signature:
-            raise UserError(_("Please provide your signature before approving."))
-
-        # تحقق من وجود سجلات timesheet محققة
-        if hasattr(self, 'timesheet_line_ids'):
-            validated_lines = self.timesheet_line_ids.filtered(
-                lambda line: hasattr(line, 'validated') and line.validated)
-            if validated_lines:
-                _logger.info("This approval contains %s validated timesheet entries", len(validated_lines))
+        # Get HR managers for the notifications
+        if records and not self._get_hr_manager_partners():
+            raise UserError(_("Cannot proceed with approval: No HR manager found in the system."))
+        records._log_validated_lines()
 
         # Mark as approved by CEO
-        self.write({
+        vals = {
             'state': 'ceo_approved',
             'ceo_approval_date': fields.Datetime.now(),
-        })
+        }
+        records.write(vals)
 
         # Revert CEO's activity feedback
-        self.activity_feedback(['mail.mail_activity_data_todo'])
+        if records:
+            records.activity_feedback(['mail.mail_activity_data_todo'])
 
-        # Get HR managers and create notification
-        hr_manager_partners = self._get_hr_manager_partners()
-        if not hr_manager_partners:
-            raise UserError(_("Cannot proceed with approval: No HR manager found in the system."))
+        # Move the records from the CEO inbox to the shared inbox of the HR approvers
+        Inbox = self.env['hr.timesheet.approval.inbox']
+        Inbox._close(records, ['ceo'])
+        Inbox._post(records, 'hr')
 
-        # Create activity for HR managers
-        hr_managers = self.env['res.users'].search([
-            ('groups_id', 'in', self.env.ref('hr_timesheet_extended.group_timesheet_hr_approve').id)
-        ])
-        for hr_manager in hr_managers:
-            self._create_approval_activity(
-                hr_manager,
-                _('HR Final Approval Needed'),
-                _('Please review and give final approval for the timesheet of %s') % self.employee_id.name
-            )
+        records._after_transition('ceo_approved', vals)
+        return self._transition_result(failures)
 
     def action_hr_approve(self):
         """HR approval action"""
-        if self.state != 'ceo_approved':
-            raise UserError(_("Only CEO-approved records can be approved by HR."))
-
-        # Check if the current user is an HR manager
-        if not self._check_hr_manager_access():
-            raise UserError(_("Only HR managers can approve this record."))
-
-        # Check if HR signature exists
-        if hasattr(self, 'hr_signature') and not self.hr_signature:
-            raise UserError(_("Please provide your signature before approving."))
-
-        # تحقق من وجود سجلات timesheet محققة
-        if hasattr(self, 'timesheet_line_ids'):
-            validated_lines = self.timesheet_line_ids.filtered(
-                lambda line: hasattr(line, 'validated') and line.validated)
-            if validated_lines:
-                _logger.info("This approval contains %s validated timesheet entries", len(validated_lines))
+        records, failures = self._split_transition('hr_approve')
+        records._log_validated_lines()
 
         # Mark as approved by HR
-        self.write({
+        vals = {
             'state': 'hr_approved',
             'hr_approval_date': fields.Datetime.now(),
-        })
+        }
+        records.write(vals)
 
         # Revert HR's activity feedback
-        self.activity_feedback(['mail.mail_activity_data_todo'])
+        if records:
+            records.activity_feedback(['mail.mail_activity_data_todo'])
+        self.env['hr.timesheet.approval.inbox']._close(records)
 
         # Create notification for the employee using activity instead of message
-        employee = self.employee_id
-        if employee and employee.user_id:
-            self._create_approval_activity(
-                employee.user_id,
+        records._create_approval_activities([
+            record._prepare_approval_activity_vals(
+                record.employee_id.user_id,
                 _('Timesheet Approved'),
                 _('Your timesheet has been approved by HR')
             )
+            for record in records if record.employee_id.user_id
+        ])
+
+        records._after_transition('hr_approved', vals)
+        return self._transition_result(failures)
 
     def action_reject(self, reason=None):
         """Reject approval action"""
-        if self.state in ['draft', 'hr_approved']:
-            raise UserError(_("Cannot reject records that are in draft or already approved by HR."))
-
-        # تحقق من وجود سجلات timesheet محققة
-        if hasattr(self, 'timesheet_line_ids'):
-            validated_lines = self.timesheet_line_ids.filtered(
-                lambda line: hasattr(line, 'validated') and line.validated)
-            if validated_lines:
-                _logger.info("This approval contains %s validated timesheet entries", len(validated_lines))
+        records, failures = self._split_transition('reject')
+        records._log_validated_lines()
 
         # Mark as rejected
-        self.write({
+        vals = {
             'state': 'rejected',
             'rejection_date': fields.Datetime.now(),
             'rejection_reason': reason,
             'rejected_by': self.env.user.id,
-        })
+        }
+        records.write(vals)
 
         # Revert rejection feedback
-        self.activity_feedback(['mail.mail_activity_data_todo'])
+        if records:
+            records.activity_feedback(['mail.mail_activity_data_todo'])
+        self.env['hr.timesheet.approval.inbox']._close(records)
 
         # Create notification for the employee about the rejection
-        employee = self.employee_id
-        if employee and employee.user_id:
-            self._create_approval_activity(
-                employee.user_id,
+        records._create_approval_activities([
+            record._prepare_approval_activity_vals(
+                record.employee_id.user_id,
                 _('Timesheet Rejected'),
                 _('Your timesheet has been rejected. Reason: %s') % (reason or _('No reason provided'))
             )
+            for record in records if record.employee_id.user_id
+        ])
+
+        records._after_transition('rejected', vals)
+        return self._transition_result(failures)
 
     def action_reset_to_draft(self):
         """Reset to draft action"""
-        if self.state == 'hr_approved':
-            raise UserError(_("Cannot reset records that are already approved by HR."))
-
-        # تحقق من وجود سجلات timesheet محققة - لا نستطيع إعادة تعيينها إلى مسودة
-        if hasattr(self, 'timesheet_line_ids'):
-            validated_lines = self.timesheet_line_ids.filtered(
-                lambda line: hasattr(line, 'validated') and line.validated)
-
-            if validated_lines and len(validated_lines) == len(self.timesheet_line_ids):
-                raise UserError(_("Cannot reset to draft: All timesheet entries are validated."))
-
-            if validated_lines:
-                # عرض تحذير للمستخدم
-                self.env.user.notify_warning(
-                    title=_("Warning"),
-                    message=_("Some timesheet entries are validated and will remain in their current state.")
-                )
+        records, failures = self._split_transition('reset_to_draft')
 
         # Reset to draft
-        self.write({
+        vals = {
             'state': 'draft',
             'submitted_date': False,
             'manager_approval_date': False,
@@ -343,7 +388,11 @@ class TimesheetApprovalMixin(models.AbstractModel):
             'rejection_date': False,
             'rejection_reason': False,
             'rejected_by': False,
-        })
+        }
+        records.write(vals)
 
         # Cancel any pending activities
-        self._cancel_pending_activities()
+        records._cancel_pending_activities()
+
+        records._after_transition('draft', vals)
+        return self._transition_result(failures)
@@ -2,3 +2,5 @@
 
 # report/__init__.py
 from . import timesheet_approval_report
+from . import timesheet_line_report
+from . import report_timesheet_approval
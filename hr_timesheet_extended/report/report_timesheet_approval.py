@@ -0,0 +1,89 @@
+from odoo import api, models
+from odoo.tools.pdf import PdfFileReader, PdfFileWriter
+import logging
+import tempfile
+
+_logger = logging.getLogger(__name__)
+
+APPROVAL_REPORT_NAME = 'hr_timesheet_extended.report_timesheet_approval'
+
+
+class ReportTimesheetApproval(models.AbstractModel):
+    _name = 'report.hr_timesheet_extended.report_timesheet_approval'
+    _description = 'Timesheet Approval Form'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        """
+        Load the lines, projects and tasks of all documents in bulk. The
+        signature images are left to the rendering, which loads them for the
+        documents being rendered only: one chunk at a time for large batches.
+        """
+        docs = self.env['hr.timesheet.approval'].browse(docids)
+        docs.fetch(['name', 'state', 'employee_id', 'department_id', 'date_start', 'date_end', 'total_hours',
+                    'minimum_hours', 'overtime_hours'])
+        lines = docs.timesheet_line_ids
+        lines.fetch(['date', 'name', 'unit_amount', 'project_id', 'task_id', 'timesheet_approval_id'])
+        lines.project_id.fetch(['name'])
+        lines.task_id.fetch(['name'])
+
+        lines_by_doc = {doc.id: [] for doc in docs}
+        line_totals = dict.fromkeys(docs.ids, 0.0)
+        for line in lines:
+            lines_by_doc[line.timesheet_approval_id.id].append(line)
+            line_totals[line.timesheet_approval_id.id] += line.unit_amount
+
+        return {
+            'doc_ids': docids,
+            'doc_model': 'hr.timesheet.approval',
+            'docs': docs,
+            'lines_by_doc': lines_by_doc,
+            'line_totals': line_totals,
+        }
+
+
+class IrActionsReport(models.Model):
+    _inherit = 'ir.actions.report'
+
+    def _render_qweb_pdf(self, report_ref, res_ids=None, data=None):
+        """
+        Render large batches of timesheet approval forms chunk by chunk,
+        releasing the record cache between chunks and merging the chunk PDFs
+        from temporary files.
+        """
+        report = self._get_report(report_ref)
+        chunk_size = int(self.env['ir.config_parameter'].sudo().get_param(
+            'hr_timesheet_extended.report_chunk_size', 50))
+        if report.report_name != APPROVAL_REPORT_NAME or not res_ids or chunk_size <= 0 \
+                or len(res_ids) <= chunk_size:
+            return super(IrActionsReport, self)._render_qweb_pdf(report_ref, res_ids=res_ids, data=data)
+
+        chunk_files = []
+        try:
+            for index in range(0, len(res_ids), chunk_size):
+                content, _content_type = super(IrActionsReport, self)._render_qweb_pdf(
+                    report_ref, res_ids=res_ids[index:index + chunk_size], data=data)
+                chunk_file = tempfile.TemporaryFile()
+                chunk_file.write(content)
+                chunk_files.append(chunk_file)
+                del content
+                self.env.invalidate_all()
+
+            # The pages are read from the chunk files while the merged file is written, and the
+            # merged file is only loaded once, as the returned content
+            writer = PdfFileWriter()
+            for chunk_file in chunk_files:
+                chunk_file.seek(0)
+                reader = PdfFileReader(chunk_file, strict=False)
+                for page in range(reader.getNumPages()):
+                    writer.addPage(reader.getPage(page))
+            with tempfile.TemporaryFile() as result:
+                writer.write(result)
+                del writer
+                result.seek(0)
+                content = result.read()
+            _logger.info("Rendered %s timesheet approval forms in %s chunks", len(res_ids), len(chunk_files))
+            return content, 'pdf'
+        finally:
+            for chunk_file in chunk_files:
+                chunk_file.close()
@@ -1,7 +1,18 @@
 from odoo import api, fields, models, tools, _
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Key of the approval ids waiting for a report refresh in cr.precommit.data
+REFRESH_KEY = 'timesheet.approval.report.refresh'
 
 
 class TimesheetApprovalReport(models.Model):
+    """
+    Analysis of the timesheet approvals, kept in a table rather than a view:
+    rows are refreshed incrementally when approvals change, right before the
+    transaction commits, and fully rebuilt by a cron as a safety net.
+    """
     _name = "timesheet.approval.report"
     _description = "Timesheet Approval Analysis Report"
     _auto = False
@@ -97,36 +108,55 @@ class TimesheetApprovalReport(models.Model):
             WHERE 1=1
         """
 
-    def _group_by(self):
-        return """
-            GROUP BY
-                t.id,
-                t.name,
-                t.date_start,
-                t.date_end,
-                t.employee_id,
-                t.department_id,
-                t.manager_id,
-                t.ceo_id,
-                t.hr_manager_id,
-                t.state,
-                t.total_hours,
-                t.overtime_hours,
-                t.minimum_hours,
-                t.submitted_date,
-                t.manager_approval_date,
-                t.ceo_approval_date,
-                t.hr_approval_date,
-                e.company_id
-        """
-
     def init(self):
         tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("DROP TABLE IF EXISTS %s" % self._table)
         self.env.cr.execute("""
-            CREATE OR REPLACE VIEW %s AS (
+            CREATE TABLE %s AS (
+                %s
                 %s
                 %s
+            )
+        """ % (self._table, self._select(), self._from(), self._where()))
+        self.env.cr.execute("ALTER TABLE %s ADD PRIMARY KEY (id)" % self._table)
+        for column in ('date_start', 'department_id', 'state', 'company_id'):
+            tools.create_index(self.env.cr, '%s_%s_index' % (self._table, column), self._table, [column])
+
+    @api.model
+    def _refresh_approvals(self, approval_ids):
+        """Recompute the report rows of the given approvals"""
+        approval_ids = list(approval_ids)
+        if not approval_ids:
+            return
+        self.env['hr.timesheet.approval'].flush_model()
+        self.env.cr.execute("DELETE FROM %s WHERE id = ANY(%%s)" % self._table, [approval_ids])
+        self.env.cr.execute("""
+            INSERT INTO %s (
                 %s
                 %s
+                %s AND t.id = ANY(%%s)
             )
-        """ % (self._table, self._select(), self._from(), self._where(), self._group_by()))
\ No newline at end of file
+        """ % (self._table, self._select(), self._from(), self._where()), [approval_ids])
+        self.invalidate_model()
+
+    @api.model
+    def _refresh_all(self):
+        """Rebuild the whole report from the approvals"""
+        self.env['hr.timesheet.approval'].flush_model()
+        self.env.cr.execute("DELETE FROM %s" % self._table)
+        self.env.cr.execute("INSERT INTO %s (%s %s %s)" % (self._table, self._select(), self._from(), self._where()))
+        self.invalidate_model()
+        _logger.info("Rebuilt the timesheet approval report")
+
+    @api.model
+    def _schedule_refresh(self, approval_ids):
+        """Refresh the rows of the approvals once, right before the transaction commits"""
+        if not approval_ids:
+            return
+        pending = self.env.cr.precommit.data.setdefault(REFRESH_KEY, set())
+        if not pending:
+            self.env.cr.precommit.add(self.sudo()._run_scheduled_refresh)
+        pending.update(approval_ids)
+
+    def _run_scheduled_refresh(self):
+        self._refresh_approvals(self.env.cr.precommit.data.pop(REFRESH_KEY, set()))
@@ -0,0 +1,180 @@
+from odoo import api, fields, models, tools, _
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Key of the (employee_id, date) pairs waiting for a report refresh in cr.precommit.data
+REFRESH_KEY = 'timesheet.line.report.refresh'
+
+
+class TimesheetLineReport(models.Model):
+    """
+    Timesheet hours per employee, project, task, day and approval state, with
+    the employee, department and approval already joined. Rows are kept in a
+    table refreshed per employee and day before the transaction commits, and
+    rebuilt by a cron as a safety net.
+    """
+    _name = "timesheet.line.report"
+    _description = "Timesheet Line Analysis Report"
+    _auto = False
+    _order = 'date desc'
+    _rec_name = 'date'
+
+    date = fields.Date(string='Date', readonly=True)
+    employee_id = fields.Many2one('hr.employee', string='Employee', readonly=True)
+    department_id = fields.Many2one('hr.department', string='Department', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    project_id = fields.Many2one('project.project', string='Project', readonly=True)
+    task_id = fields.Many2one('project.task', string='Task', readonly=True)
+    timesheet_approval_id = fields.Many2one('hr.timesheet.approval', string='Timesheet Approval', readonly=True)
+
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('submitted', 'Submitted'),
+        ('manager_approved', 'Manager Approved'),
+        ('ceo_approved', 'CEO Approved'),
+        ('hr_approved', 'HR Approved'),
+        ('rejected', 'Rejected'),
+    ], string='Status', readonly=True)
+
+    unit_amount = fields.Float(string='Hours', readonly=True)
+    work_hours = fields.Float(string='Worked Hours', readonly=True)
+    leave_hours = fields.Float(string='Time Off Hours', readonly=True)
+    overtime_hours = fields.Float(string='Overtime Hours', readonly=True)
+    validated_hours = fields.Float(string='Validated Hours', readonly=True)
+    line_count = fields.Integer(string='Timesheet Entries', readonly=True)
+
+    def _select(self):
+        # The overtime of the day comes from the daily summary and is spread
+        # over the rows of that day in proportion to their hours
+        return """
+            SELECT
+                l.date as date,
+                l.employee_id as employee_id,
+                e.department_id as department_id,
+                e.company_id as company_id,
+                l.project_id as project_id,
+                l.task_id as task_id,
+                l.timesheet_approval_id as timesheet_approval_id,
+                COALESCE(l.state, 'draft') as state,
+                SUM(l.unit_amount) as unit_amount,
+                COALESCE(SUM(l.unit_amount) FILTER (
+                    WHERE l.holiday_id IS NULL AND l.global_leave_id IS NULL), 0) as work_hours,
+                COALESCE(SUM(l.unit_amount) FILTER (
+                    WHERE l.holiday_id IS NOT NULL OR l.global_leave_id IS NOT NULL), 0) as leave_hours,
+                COALESCE(MAX(s.overtime_hours) * SUM(l.unit_amount) / NULLIF(MAX(s.worked_hours), 0), 0)
+                    as overtime_hours,
+                COALESCE(SUM(l.unit_amount) FILTER (WHERE l.validated), 0) as validated_hours,
+                COUNT(*) as line_count
+        """
+
+    def _from(self):
+        return """
+            FROM account_analytic_line l
+            JOIN hr_employee e ON e.id = l.employee_id
+            LEFT JOIN hr_timesheet_daily_summary s ON s.employee_id = l.employee_id AND s.date = l.date
+        """
+
+    def _where(self):
+        return """
+            WHERE l.project_id IS NOT NULL
+        """
+
+    def _group_by(self):
+        return """
+            GROUP BY
+                l.date,
+                l.employee_id,
+                e.department_id,
+                e.company_id,
+                l.project_id,
+                l.task_id,
+                l.timesheet_approval_id,
+                COALESCE(l.state, 'draft')
+        """
+
+    def _columns(self):
+        return """
+            date, employee_id, department_id, company_id, project_id, task_id, timesheet_approval_id,
+            state, unit_amount, work_hours, leave_hours, overtime_hours, validated_hours, line_count
+        """
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("DROP TABLE IF EXISTS %s" % self._table)
+        self.env.cr.execute("""
+            CREATE TABLE %s (
+                id SERIAL PRIMARY KEY,
+                date DATE,
+                employee_id INTEGER,
+                department_id INTEGER,
+                company_id INTEGER,
+                project_id INTEGER,
+                task_id INTEGER,
+                timesheet_approval_id INTEGER,
+                state VARCHAR,
+                unit_amount DOUBLE PRECISION,
+                work_hours DOUBLE PRECISION,
+                leave_hours DOUBLE PRECISION,
+                overtime_hours DOUBLE PRECISION,
+                validated_hours DOUBLE PRECISION,
+                line_count INTEGER
+            )
+        """ % self._table)
+        for columns in (['employee_id', 'date'], ['date'], ['project_id'], ['department_id'], ['state'],
+                        ['company_id']):
+            tools.create_index(self.env.cr, '%s_%s_index' % (self._table, '_'.join(columns)),
+                               self._table, columns)
+        self._refresh_all()
+
+    @api.model
+    def _refresh_days(self, keys):
+        """Recompute the report rows of the given (employee_id, date) pairs"""
+        keys = list({key for key in keys if key[0] and key[1]})
+        if not keys:
+            return
+        self.env['account.analytic.line'].flush_model()
+        self.env['hr.timesheet.daily.summary'].flush_model()
+        params = ([key[0] for key in keys], [key[1] for key in keys])
+        self.env.cr.execute("""
+            DELETE FROM %s r
+             USING unnest(%%s::int[], %%s::date[]) AS k(employee_id, date)
+             WHERE r.employee_id = k.employee_id
+               AND r.date = k.date
+        """ % self._table, params)
+        self.env.cr.execute("""
+            INSERT INTO %s (%s)
+            %s
+            %s
+              JOIN unnest(%%s::int[], %%s::date[]) AS k(employee_id, date)
+                ON k.employee_id = l.employee_id
+               AND k.date = l.date
+            %s
+            %s
+        """ % (self._table, self._columns(), self._select(), self._from(), self._where(), self._group_by()),
+                            params)
+        self.invalidate_model()
+
+    @api.model
+    def _refresh_all(self):
+        """Rebuild the whole report from the timesheet lines"""
+        self.env['account.analytic.line'].flush_model()
+        self.env['hr.timesheet.daily.summary'].flush_model()
+        self.env.cr.execute("DELETE FROM %s" % self._table)
+        self.env.cr.execute("INSERT INTO %s (%s) %s %s %s %s" % (
+            self._table, self._columns(), self._select(), self._from(), self._where(), self._group_by()))
+        self.invalidate_model()
+        _logger.info("Rebuilt the timesheet line report")
+
+    @api.model
+    def _schedule_refresh(self, keys):
+        """Refresh the rows of the (employee_id, date) pairs once, right before the transaction commits"""
+        if not keys:
+            return
+        pending = self.env.cr.precommit.data.setdefault(REFRESH_KEY, set())
+        if not pending:
+            self.env.cr.precommit.add(self.sudo()._run_scheduled_refresh)
+        pending.update(keys)
+
+    def _run_scheduled_refresh(self):
+        self._refresh_days(self.env.cr.precommit.data.pop(REFRESH_KEY, set()))
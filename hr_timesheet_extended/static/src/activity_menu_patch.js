@@ -0,0 +1,17 @@
+/** @odoo-module **/
+
+import { ActivityMenu } from "@mail/core/web/activity_menu";
+import { patch } from "@web/core/utils/patch";
+
+patch(ActivityMenu.prototype, {
+    openActivityGroup(group) {
+        if (group.model === "hr.timesheet.approval.inbox") {
+            document.body.click(); // hack to close dropdown
+            this.action.doAction("hr_timesheet_extended.action_hr_timesheet_approval_inbox", {
+                clearBreadcrumbs: true,
+            });
+        } else {
+            super.openActivityGroup(...arguments);
+        }
+    },
+});
@@ -0,0 +1,16 @@
+from . import test_approval_digest
+from . import test_approval_export
+from . import test_approval_job
+from . import test_approval_overlap
+from . import test_approval_report
+from . import test_approval_signature
+from . import test_approval_transitions
+from . import test_approver_directory
+from . import test_calendar_sync
+from . import test_daily_summary
+from . import test_expected_hours
+from . import test_line_stats
+from . import test_minimum_hours
+from . import test_pending_summary
+from . import test_period_close
+from . import test_timesheet_import
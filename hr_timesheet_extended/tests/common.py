@@ -0,0 +1,81 @@
+from datetime import date
+
+from odoo.tests import TransactionCase, new_test_user
+
+# A 1x1 transparent PNG
+SIGNATURE = b'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII='
+
+
+class TimesheetExtendedCommon(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Monday to Friday, 8 hours a day, in UTC so that calendar days match the cached days
+        cls.calendar = cls.env['resource.calendar'].create({'name': 'Standard 40 hours', 'tz': 'UTC'})
+        cls.monday = date(2024, 1, 1)
+
+        groups = 'base.group_user,hr_timesheet.group_hr_timesheet_user,project.group_project_user'
+        cls.manager_user = new_test_user(cls.env, login='ts_manager', groups=groups)
+        cls.user = new_test_user(cls.env, login='ts_employee', groups=groups)
+        cls.other_user = new_test_user(cls.env, login='ts_colleague', groups=groups)
+
+        Employee = cls.env['hr.employee']
+        cls.manager = Employee.create({
+            'name': 'Timesheet Manager',
+            'user_id': cls.manager_user.id,
+            'resource_calendar_id': cls.calendar.id,
+        })
+        cls.employee = Employee.create({
+            'name': 'Timesheet Employee',
+            'user_id': cls.user.id,
+            'parent_id': cls.manager.id,
+            'resource_calendar_id': cls.calendar.id,
+        })
+        cls.other_employee = Employee.create({
+            'name': 'Timesheet Colleague',
+            'user_id': cls.other_user.id,
+            'parent_id': cls.manager.id,
+            'resource_calendar_id': cls.calendar.id,
+        })
+
+        cls.project = cls.env['project.project'].create({'name': 'Timesheet Project', 'allow_timesheets': True})
+        cls.task = cls.env['project.task'].create({'name': 'Meeting', 'project_id': cls.project.id})
+
+    def _store_signature(self, user):
+        """Store a timesheet signature on ``user`` and return its attachment"""
+        user.timesheet_signature = SIGNATURE
+        return self.env['ir.attachment'].search([
+            ('res_model', '=', 'res.users'),
+            ('res_field', '=', 'timesheet_signature'),
+            ('res_id', '=', user.id),
+        ])
+
+    def _get_signature_attachment(self, approval, field_name):
+        return self.env['ir.attachment'].search([
+            ('res_model', '=', approval._name),
+            ('res_field', '=', field_name),
+            ('res_id', '=', approval.id),
+        ])
+
+    def _create_line(self, employee, day, unit_amount=8.0, **values):
+        return self.env['account.analytic.line'].create({
+            'name': 'Work',
+            'project_id': self.project.id,
+            'task_id': self.task.id,
+            'employee_id': employee.id,
+            'date': day,
+            'unit_amount': unit_amount,
+            **values,
+        })
+
+    def _create_contract(self, employee, date_start, date_end=False, state='open'):
+        return self.env['hr.contract'].create({
+            'name': 'Contract of %s' % employee.name,
+            'employee_id': employee.id,
+            'date_start': date_start,
+            'date_end': date_end,
+            'resource_calendar_id': self.calendar.id,
+            'wage': 1000.0,
+            'state': state,
+        })
@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from odoo.tests import tagged
+
+from .common import SIGNATURE, TimesheetExtendedCommon
+
+
+@tagged('post_install', '-at_install')
+class TestApprovalDigest(TimesheetExtendedCommon):
+
+    def setUp(self):
+        super().setUp()
+        self.env['ir.config_parameter'].sudo().set_param(
+            'hr_timesheet_extended.approval_notification_mode', 'digest')
+        self.manager_user.email = 'ts_manager@example.com'
+        self.Notification = self.env['hr.timesheet.approval.notification']
+
+    def _submit(self, employee):
+        approval = self.env['hr.timesheet.approval'].create({
+            'employee_id': employee.id,
+            'date_start': self.monday,
+            'date_end': self.monday + timedelta(days=6),
+        })
+        approval.employee_signature = SIGNATURE
+        approval.action_submit()
+        self.assertEqual(approval.state, 'submitted')
+        return approval
+
+    def _get_manager_items(self):
+        rows = self.Notification.search([('user_id', '=', self.manager_user.id)])
+        return rows._get_digest_items(self.manager_user)
+
+    def test_submission_is_queued_for_the_manager(self):
+        approval = self._submit(self.employee)
+        row = self.Notification.search([('res_id', '=', approval.id)])
+        self.assertEqual(row.user_id, self.manager_user)
+        self.assertEqual(row.res_state, 'submitted')
+        self.assertEqual([record for record, _summary in self._get_manager_items()], [approval])
+
+    def test_processed_approvals_are_left_out(self):
+        pending = self._submit(self.employee)
+        processed = self._submit(self.other_employee)
+        processed.action_reset_to_draft()
+        self.assertEqual([record for record, _summary in self._get_manager_items()], [pending])
+
+        # Submitted again: waiting for the manager once more
+        processed.employee_signature = SIGNATURE
+        processed.action_submit()
+        self.assertEqual({record for record, _summary in self._get_manager_items()}, {pending, processed})
+
+    def test_approvals_of_another_manager_are_left_out(self):
+        approval = self._submit(self.employee)
+        self.employee.timesheet_manager_id = self.other_user
+        self.assertFalse(self._get_manager_items())
+        self.assertEqual(approval._get_manager_user(), self.other_user)
+
+    def test_digest_lists_pending_approvals_only(self):
+        pending = self._submit(self.employee)
+        self._submit(self.other_employee).action_reset_to_draft()
+
+        self.Notification._cron_send_digest()
+
+        mail = self.env['mail.mail'].search([('email_to', '=', self.manager_user.email_formatted)])
+        self.assertEqual(len(mail), 1)
+        self.assertIn(pending.display_name, mail.body_html)
+        self.assertIn('1 pending', mail.subject)
+        self.assertFalse(self.Notification.search([]))
+
+    def test_digest_without_pending_approvals_sends_nothing(self):
+        self._submit(self.employee).action_reset_to_draft()
+
+        self.Notification._cron_send_digest()
+
+        self.assertFalse(self.env['mail.mail'].search([('email_to', '=', self.manager_user.email_formatted)]))
+        self.assertFalse(self.Notification.search([]))
@@ -0,0 +1,79 @@
+import csv
+import hashlib
+import io
+import zipfile
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from .common import TimesheetExtendedCommon
+
+EXPORT_WIZARD = 'odoo.addons.hr_timesheet_extended.wizards.hr_timesheet_approval_export_wizard'
+
+
+@tagged('post_install', '-at_install')
+class TestApprovalExport(TimesheetExtendedCommon):
+
+    def setUp(self):
+        super().setUp()
+        Approval = self.env['hr.timesheet.approval']
+        sunday = self.monday + timedelta(days=6)
+        self.approval = Approval.create({
+            'employee_id': self.employee.id, 'date_start': self.monday, 'date_end': sunday,
+        })
+        self.empty_approval = Approval.create({
+            'employee_id': self.other_employee.id, 'date_start': self.monday, 'date_end': sunday,
+        })
+        # Lines are attached to the draft approval covering their day
+        for day in range(3):
+            self._create_line(self.employee, self.monday + timedelta(days=day))
+
+    def _export(self, file_format, chunk_size=1):
+        wizard = self.env['hr.timesheet.approval.export.wizard'].create({
+            'approval_ids': [(6, 0, (self.approval | self.empty_approval).ids)],
+            'file_format': file_format,
+            'chunk_size': chunk_size,
+        })
+        wizard.action_export()
+        return wizard.attachment_id
+
+    def test_csv_export_in_chunks(self):
+        attachment = self._export('csv')
+        rows = list(csv.reader(io.StringIO(attachment.raw.decode())))
+        # Header, one row per line of the first approval, one row for the approval without lines
+        self.assertEqual(len(rows), 5)
+        self.assertEqual([row[0] for row in rows[1:]], [self.approval.name] * 3 + [self.empty_approval.name])
+        self.assertEqual([row[14] for row in rows[1:4]], ['2024-01-01', '2024-01-02', '2024-01-03'])
+        self.assertEqual(rows[4][14], '')
+
+    def test_export_is_stored_in_the_filestore(self):
+        attachment = self._export('csv')
+        raw = attachment.raw
+        self.assertTrue(raw)
+        self.assertEqual(attachment.file_size, len(raw))
+        self.assertEqual(attachment.checksum, hashlib.sha1(raw).hexdigest())
+        if self.env['ir.attachment']._storage() == 'file':
+            self.assertTrue(attachment.store_fname)
+
+    def test_xlsx_export_splits_full_sheets(self):
+        with patch('%s.XLSX_MAX_ROWS' % EXPORT_WIZARD, 3):
+            attachment = self._export('xlsx', chunk_size=2)
+        with zipfile.ZipFile(io.BytesIO(attachment.raw)) as workbook:
+            sheets = [name for name in workbook.namelist() if name.startswith('xl/worksheets/sheet')]
+        # 4 rows with 2 rows per sheet after the header
+        self.assertEqual(len(sheets), 2)
+
+    def test_xlsx_export_single_sheet(self):
+        attachment = self._export('xlsx')
+        with zipfile.ZipFile(io.BytesIO(attachment.raw)) as workbook:
+            sheets = [name for name in workbook.namelist() if name.startswith('xl/worksheets/sheet')]
+        self.assertEqual(len(sheets), 1)
+
+    def test_export_without_approvals(self):
+        wizard = self.env['hr.timesheet.approval.export.wizard'].create({
+            'date_from': self.monday + timedelta(days=3650),
+        })
+        with self.assertRaises(UserError):
+            wizard.action_export()
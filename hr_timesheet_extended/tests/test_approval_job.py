@@ -0,0 +1,68 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo.tests import tagged
+
+from .common import TimesheetExtendedCommon
+
+
+@tagged('post_install', '-at_install')
+class TestApprovalJob(TimesheetExtendedCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Approval = cls.env['hr.timesheet.approval']
+        cls.approvals = Approval
+        for week in range(4):
+            date_start = cls.monday + timedelta(weeks=week)
+            cls.approvals |= Approval.create({
+                'employee_id': cls.employee.id,
+                'date_start': date_start,
+                'date_end': date_start + timedelta(days=6),
+            })
+        cls.approvals[:3].write({'state': 'submitted'})
+
+    def _run_job(self, approvals):
+        job = self.env['hr.timesheet.approval.job']._enqueue(approvals, 'reject', 'Missing entries')
+        job.chunk_size = len(approvals)
+        job._process()
+        return job
+
+    def test_transition_error_fails_the_approval_only(self):
+        draft = self.approvals[3]
+        job = self._run_job(self.approvals)
+
+        self.assertEqual(job.state, 'done')
+        failed = job.line_ids.filtered(lambda line: line.state == 'failed')
+        self.assertEqual(failed.approval_id, draft)
+        self.assertTrue(failed.error)
+        self.assertEqual(draft.state, 'draft')
+        self.assertEqual(set(self.approvals[:3].mapped('state')), {'rejected'})
+
+    def test_unexpected_exception_retries_the_chunk_one_by_one(self):
+        Approval = self.registry['hr.timesheet.approval']
+        action_reject = Approval.action_reject
+        broken = self.approvals[1]
+
+        def action_reject_failing(records, reason=None):
+            if broken in records:
+                raise KeyError('broken approval')
+            return action_reject(records, reason)
+
+        with patch.object(Approval, 'action_reject', action_reject_failing):
+            job = self._run_job(self.approvals[:3])
+
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(job.failed_count, 1)
+        self.assertEqual(job.done_count, 2)
+        failed = job.line_ids.filtered(lambda line: line.state == 'failed')
+        self.assertEqual(failed.approval_id, broken)
+        self.assertIn('broken approval', failed.error)
+        self.assertEqual(broken.state, 'submitted')
+        self.assertEqual(set((self.approvals[:3] - broken).mapped('state')), {'rejected'})
+
+    def test_job_fails_when_every_approval_fails(self):
+        job = self._run_job(self.approvals[3])
+        self.assertEqual(job.state, 'failed')
+        self.assertEqual(job.failed_count, 1)
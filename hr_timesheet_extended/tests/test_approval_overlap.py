@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from psycopg2 import IntegrityError
+
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+from odoo.tools import mute_logger
+
+from .common import TimesheetExtendedCommon
+
+
+@tagged('post_install', '-at_install')
+class TestApprovalOverlap(TimesheetExtendedCommon):
+
+    def _create_approval(self, employee, date_start, date_end):
+        return self.env['hr.timesheet.approval'].create({
+            'employee_id': employee.id,
+            'date_start': date_start,
+            'date_end': date_end,
+        })
+
+    def test_overlapping_period_is_rejected(self):
+        sunday = self.monday + timedelta(days=6)
+        self._create_approval(self.employee, self.monday, sunday)
+
+        # Either the exclusion constraint or its Python fallback rejects the period
+        with self.assertRaises((IntegrityError, ValidationError)), mute_logger('odoo.sql_db'):
+            with self.env.cr.savepoint():
+                self._create_approval(self.employee, self.monday + timedelta(days=3), sunday + timedelta(days=3))
+                self.env.flush_all()
+
+    def test_shared_boundary_is_rejected(self):
+        sunday = self.monday + timedelta(days=6)
+        self._create_approval(self.employee, self.monday, sunday)
+
+        with self.assertRaises((IntegrityError, ValidationError)), mute_logger('odoo.sql_db'):
+            with self.env.cr.savepoint():
+                self._create_approval(self.employee, sunday, sunday + timedelta(days=6))
+                self.env.flush_all()
+
+    def test_adjacent_and_other_employee_periods_are_allowed(self):
+        sunday = self.monday + timedelta(days=6)
+        self._create_approval(self.employee, self.monday, sunday)
+        self._create_approval(self.employee, sunday + timedelta(days=1), sunday + timedelta(days=7))
+        self._create_approval(self.other_employee, self.monday, sunday)
+        self.env.flush_all()
+        self.assertEqual(self.env['hr.timesheet.approval'].search_count([
+            ('employee_id', 'in', (self.employee | self.other_employee).ids),
+        ]), 3)
@@ -0,0 +1,68 @@
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo.addons.base.models.ir_actions_report import IrActionsReport
+from odoo.tests import tagged
+from odoo.tools.pdf import PdfFileReader, PdfFileWriter
+
+from .common import TimesheetExtendedCommon
+
+REPORT_NAME = 'hr_timesheet_extended.report_timesheet_approval'
+
+
+@tagged('post_install', '-at_install')
+class TestApprovalReport(TimesheetExtendedCommon):
+
+    def setUp(self):
+        super().setUp()
+        Approval = self.env['hr.timesheet.approval']
+        self.approvals = Approval
+        for week in range(5):
+            date_start = self.monday + timedelta(weeks=week)
+            self.approvals |= Approval.create({
+                'employee_id': self.employee.id,
+                'date_start': date_start,
+                'date_end': date_start + timedelta(days=6),
+            })
+        self._create_line(self.employee, self.monday, 6.0)
+        self._create_line(self.employee, self.monday + timedelta(days=1), 3.0)
+        self.env['ir.config_parameter'].sudo().set_param('hr_timesheet_extended.report_chunk_size', 2)
+
+    def _render(self):
+        """Render the forms with a stand-in for wkhtmltopdf: one blank page per document"""
+        rendered_chunks = []
+
+        def render_qweb_pdf(report, report_ref, res_ids=None, data=None):
+            rendered_chunks.append(list(res_ids))
+            writer = PdfFileWriter()
+            for _res_id in res_ids:
+                writer.addBlankPage(72, 72)
+            stream = io.BytesIO()
+            writer.write(stream)
+            return stream.getvalue(), 'pdf'
+
+        with patch.object(IrActionsReport, '_render_qweb_pdf', autospec=True, side_effect=render_qweb_pdf):
+            content, content_type = self.env['ir.actions.report']._render_qweb_pdf(REPORT_NAME, self.approvals.ids)
+        return content, content_type, rendered_chunks
+
+    def test_large_batch_is_rendered_in_chunks(self):
+        content, content_type, rendered_chunks = self._render()
+        self.assertEqual(content_type, 'pdf')
+        self.assertEqual([len(chunk) for chunk in rendered_chunks], [2, 2, 1])
+        self.assertEqual(sum(rendered_chunks, []), self.approvals.ids)
+        self.assertEqual(PdfFileReader(io.BytesIO(content), strict=False).getNumPages(), 5)
+
+    def test_small_batch_is_rendered_at_once(self):
+        self.env['ir.config_parameter'].sudo().set_param('hr_timesheet_extended.report_chunk_size', 10)
+        content, _content_type, rendered_chunks = self._render()
+        self.assertEqual(rendered_chunks, [self.approvals.ids])
+        self.assertEqual(PdfFileReader(io.BytesIO(content), strict=False).getNumPages(), 5)
+
+    def test_report_values(self):
+        values = self.env['report.%s' % REPORT_NAME]._get_report_values(self.approvals.ids)
+        first = self.approvals.filtered(lambda approval: approval.date_start == self.monday)
+        self.assertEqual(values['docs'], self.approvals)
+        self.assertEqual(len(values['lines_by_doc'][first.id]), 2)
+        self.assertEqual(values['line_totals'][first.id], 9.0)
+        self.assertEqual(values['line_totals'][(self.approvals - first)[0].id], 0.0)
@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from .common import TimesheetExtendedCommon
+
+
+@tagged('post_install', '-at_install')
+class TestApprovalSignature(TimesheetExtendedCommon):
+
+    def setUp(self):
+        super().setUp()
+        self.approval = self.env['hr.timesheet.approval'].create({
+            'employee_id': self.employee.id,
+            'date_start': self.monday,
+            'date_end': self.monday + timedelta(days=6),
+        })
+
+    def test_sign_with_stored_signature_copies_the_content(self):
+        source = self._store_signature(self.user)
+        self.assertTrue(source.raw)
+
+        self.approval.with_user(self.user).action_sign_with_stored_signature()
+
+        attachment = self._get_signature_attachment(self.approval, 'employee_signature')
+        self.assertEqual(len(attachment), 1)
+        self.assertEqual(attachment.raw, source.raw)
+        self.assertEqual(attachment.checksum, source.checksum)
+        self.assertTrue(self.approval._has_signature('employee_signature'))
+        self.assertEqual(self.approval.employee_signature, self.user.timesheet_signature)
+
+    def test_sign_again_replaces_the_signature(self):
+        self._store_signature(self.user)
+        self.approval.with_user(self.user).action_sign_with_stored_signature()
+        self.approval.with_user(self.user).action_sign_with_stored_signature()
+        self.assertEqual(len(self._get_signature_attachment(self.approval, 'employee_signature')), 1)
+
+    def test_sign_without_stored_signature(self):
+        with self.assertRaises(UserError):
+            self.approval.with_user(self.user).action_sign_with_stored_signature()
+
+    def test_sign_at_another_stage_is_refused(self):
+        self._store_signature(self.user)
+        self.approval.state = 'submitted'
+        with self.assertRaises(UserError):
+            self.approval.with_user(self.user).action_sign_with_stored_signature()
@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from .common import SIGNATURE, TimesheetExtendedCommon
+
+
+@tagged('post_install', '-at_install')
+class TestApprovalTransitions(TimesheetExtendedCommon):
+
+    def setUp(self):
+        super().setUp()
+        self.approvals = self.env['hr.timesheet.approval'].create([{
+            'employee_id': employee.id,
+            'date_start': self.monday,
+            'date_end': self.monday + timedelta(days=6),
+            'employee_signature': SIGNATURE,
+        } for employee in (self.employee, self.other_employee)])
+
+    def _get_activities(self, approvals, user):
+        return self.env['mail.activity'].search([
+            ('res_model', '=', 'hr.timesheet.approval'),
+            ('res_id', 'in', approvals.ids),
+            ('user_id', '=', user.id),
+        ])
+
+    def test_submit_batch(self):
+        self.assertIs(self.approvals.action_submit(), True)
+        self.assertEqual(set(self.approvals.mapped('state')), {'submitted'})
+        self.assertTrue(all(self.approvals.mapped('submitted_date')))
+        self.assertEqual(self._get_activities(self.approvals, self.manager_user).mapped('res_id'),
+                         self.approvals.ids)
+
+    def test_submit_skips_invalid_records(self):
+        unsigned = self.approvals[1]
+        unsigned.employee_signature = False
+
+        action = self.approvals.action_submit()
+
+        self.assertEqual(self.approvals[0].state, 'submitted')
+        self.assertEqual(unsigned.state, 'draft')
+        self.assertEqual(action['tag'], 'display_notification')
+        self.assertIn(unsigned.display_name, action['params']['message'])
+        self.assertFalse(self._get_activities(unsigned, self.manager_user))
+
+    def test_submit_without_valid_records_raises(self):
+        self.approvals.employee_signature = False
+        with self.assertRaises(UserError):
+            self.approvals.action_submit()
+        self.assertEqual(set(self.approvals.mapped('state')), {'draft'})
+
+    def test_manager_approve_batch(self):
+        self.approvals.action_submit()
+        self.approvals.manager_signature = SIGNATURE
+
+        self.approvals.with_user(self.manager_user).action_manager_approve()
+
+        self.assertEqual(set(self.approvals.mapped('state')), {'manager_approved'})
+        self.assertTrue(all(self.approvals.mapped('manager_approval_date')))
+        self.assertFalse(self._get_activities(self.approvals, self.manager_user))
+
+    def test_manager_approve_by_another_user_raises(self):
+        self.approvals.action_submit()
+        self.approvals.manager_signature = SIGNATURE
+        with self.assertRaises(UserError):
+            self.approvals.with_user(self.other_user).action_manager_approve()
+        self.assertEqual(set(self.approvals.mapped('state')), {'submitted'})
+
+    def test_reject_batch(self):
+        self.approvals.action_submit()
+
+        self.approvals.action_reject('Missing entries')
+
+        self.assertEqual(set(self.approvals.mapped('state')), {'rejected'})
+        self.assertEqual(set(self.approvals.mapped('rejection_reason')), {'Missing entries'})
+        self.assertEqual(self.approvals.rejected_by, self.env.user)
+        self.assertEqual(len(self._get_activities(self.approvals[0], self.user)), 1)
+        self.assertEqual(len(self._get_activities(self.approvals[1], self.other_user)), 1)
+
+    def test_reject_skips_drafts(self):
+        self.approvals[0].action_submit()
+
+        action = self.approvals.action_reject()
+
+        self.assertEqual(self.approvals[0].state, 'rejected')
+        self.assertEqual(self.approvals[1].state, 'draft')
+        self.assertIn(self.approvals[1].display_name, action['params']['message'])
+
+    def test_reset_to_draft_batch(self):
+        self.approvals.action_submit()
+
+        self.approvals.action_reset_to_draft()
+
+        self.assertEqual(set(self.approvals.mapped('state')), {'draft'})
+        self.assertFalse(any(self.approvals.mapped('submitted_date')))
+        self.assertFalse(self._get_activities(self.approvals, self.manager_user))
@@ -0,0 +1,49 @@
+from odoo.tests import tagged, new_test_user
+
+from .common import TimesheetExtendedCommon
+
+CEO_GROUP = 'hr_timesheet_extended.group_timesheet_ceo'
+
+
+@tagged('post_install', '-at_install')
+class TestApproverDirectory(TimesheetExtendedCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company = cls.env.company
+        cls.other_company = cls.env['res.company'].create({'name': 'Other Company'})
+        cls.ceo = new_test_user(cls.env, login='ts_ceo', groups='base.group_user,%s' % CEO_GROUP)
+        cls.other_ceo = new_test_user(
+            cls.env, login='ts_other_ceo', groups='base.group_user,%s' % CEO_GROUP,
+            company_id=cls.other_company.id, company_ids=[(6, 0, cls.other_company.ids)])
+
+    def _approvers(self, company):
+        return self.env['res.users']._get_timesheet_approvers(CEO_GROUP, company)
+
+    def test_approvers_are_limited_to_their_company(self):
+        self.assertIn(self.ceo, self._approvers(self.company))
+        self.assertNotIn(self.other_ceo, self._approvers(self.company))
+        self.assertIn(self.other_ceo, self._approvers(self.other_company))
+        self.assertNotIn(self.ceo, self._approvers(self.other_company))
+
+    def test_record_approvers_follow_the_record_company(self):
+        approval = self.env['hr.timesheet.approval'].create({
+            'employee_id': self.employee.id,
+            'date_start': self.monday,
+            'date_end': self.monday,
+        })
+        partners = approval._get_ceo_partners()
+        self.assertIn(self.ceo.partner_id, partners)
+        self.assertNotIn(self.other_ceo.partner_id, partners)
+
+    def test_directory_follows_user_changes(self):
+        self.assertNotIn(self.ceo, self._approvers(self.other_company))
+        self.ceo.company_ids = [(4, self.other_company.id)]
+        self.assertIn(self.ceo, self._approvers(self.other_company))
+
+        self.ceo.groups_id = [(3, self.env.ref(CEO_GROUP).id)]
+        self.assertNotIn(self.ceo, self._approvers(self.company))
+
+        self.user.groups_id = [(4, self.env.ref(CEO_GROUP).id)]
+        self.assertIn(self.user, self._approvers(self.company))
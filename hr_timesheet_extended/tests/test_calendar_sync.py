@@ -0,0 +1,121 @@
+from datetime import date, datetime, timedelta
+
+from odoo.tests import tagged
+
+from .common import TimesheetExtendedCommon
+
+
+@tagged('post_install', '-at_install')
+class TestCalendarSync(TimesheetExtendedCommon):
+
+    def setUp(self):
+        super().setUp()
+        # The organizer is a plain timesheet user, without access to the colleague's timesheets
+        self.event = self.env['calendar.event'].with_user(self.user).create({
+            'name': 'Weekly Meeting',
+            'start': datetime(2024, 1, 2, 9, 0),
+            'stop': datetime(2024, 1, 2, 10, 0),
+            'partner_ids': [(6, 0, (self.user.partner_id | self.other_user.partner_id).ids)],
+            'timesheet_project_id': self.project.id,
+            'timesheet_task_id': self.task.id,
+        })
+
+    def _meeting_lines(self):
+        return self.env['account.analytic.line'].search([('calendar_event_id', '=', self.event.id)])
+
+    def test_meeting_creates_attendee_timesheets(self):
+        lines = self._meeting_lines()
+        self.assertEqual(lines.employee_id, self.employee | self.other_employee)
+        self.assertEqual(set(lines.mapped('unit_amount')), {1.0})
+
+    def test_organizer_moves_meeting(self):
+        self.event.with_user(self.user).write({
+            'start': datetime(2024, 1, 3, 9, 0),
+            'stop': datetime(2024, 1, 3, 11, 0),
+        })
+        lines = self._meeting_lines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(set(lines.mapped('date')), {datetime(2024, 1, 3).date()})
+        self.assertEqual(set(lines.mapped('unit_amount')), {2.0})
+
+    def test_organizer_removes_attendee(self):
+        self.event.with_user(self.user).write({'partner_ids': [(3, self.other_user.partner_id.id)]})
+        self.assertEqual(self._meeting_lines().employee_id, self.employee)
+
+    def test_organizer_deletes_meeting(self):
+        lines = self._meeting_lines()
+        self.event.with_user(self.user).unlink()
+        self.assertFalse(lines.exists())
+
+    def _lock_colleague_week(self):
+        approval = self.env['hr.timesheet.approval'].create({
+            'employee_id': self.other_employee.id,
+            'date_start': self.monday,
+            'date_end': self.monday + timedelta(days=6),
+        })
+        self._meeting_lines().filtered(lambda line: line.employee_id == self.other_employee).write({
+            'timesheet_approval_id': approval.id,
+        })
+        approval.state = 'submitted'
+        return approval
+
+    def test_lines_of_submitted_approvals_are_kept(self):
+        self._lock_colleague_week()
+        colleague_line = self._meeting_lines().filtered(lambda line: line.employee_id == self.other_employee)
+
+        self.event.with_user(self.user).write({
+            'start': datetime(2024, 1, 3, 9, 0),
+            'stop': datetime(2024, 1, 3, 11, 0),
+        })
+        self.assertEqual(colleague_line.date, date(2024, 1, 2))
+        self.assertEqual(colleague_line.unit_amount, 1.0)
+        own_line = self._meeting_lines() - colleague_line
+        self.assertEqual(own_line.date, date(2024, 1, 3))
+
+        lines = self._meeting_lines()
+        self.event.with_user(self.user).unlink()
+        self.assertEqual(lines.exists(), colleague_line)
+
+    def test_validated_lines_are_kept(self):
+        colleague_line = self._meeting_lines().filtered(lambda line: line.employee_id == self.other_employee)
+        colleague_line.validated = True
+        self.event.with_user(self.user).write({'partner_ids': [(3, self.other_user.partner_id.id)]})
+        self.assertTrue(colleague_line.exists())
+
+    def test_no_lines_on_locked_days(self):
+        self.event.with_user(self.user).write({'partner_ids': [(3, self.other_user.partner_id.id)]})
+        approval = self.env['hr.timesheet.approval'].create({
+            'employee_id': self.other_employee.id,
+            'date_start': self.monday,
+            'date_end': self.monday + timedelta(days=6),
+        })
+        approval.state = 'manager_approved'
+        self.event.with_user(self.user).write({'partner_ids': [(4, self.other_user.partner_id.id)]})
+        self.assertEqual(self._meeting_lines().employee_id, self.employee)
+
+    def test_project_unreadable_by_the_organizer(self):
+        private_project = self.env['project.project'].create({
+            'name': 'Private Project',
+            'allow_timesheets': True,
+            'privacy_visibility': 'followers',
+        })
+        private_task = self.env['project.task'].create({'name': 'Meeting', 'project_id': private_project.id})
+        self.assertFalse(private_project.with_user(self.user)._filter_access_rules('read'))
+
+        event = self.env['calendar.event'].create({
+            'name': 'Private Meeting',
+            'user_id': self.user.id,
+            'start': datetime(2024, 1, 4, 9, 0),
+            'stop': datetime(2024, 1, 4, 10, 0),
+            'partner_ids': [(6, 0, (self.user.partner_id | self.other_user.partner_id).ids)],
+            'timesheet_project_id': private_project.id,
+            'timesheet_task_id': private_task.id,
+        })
+        self.assertFalse(self.env['account.analytic.line'].search([('calendar_event_id', '=', event.id)]))
+
+        # Moving a meeting to a project the organizer cannot read leaves its lines as they are
+        self.event.with_user(self.user).write({
+            'timesheet_project_id': private_project.id,
+            'timesheet_task_id': private_task.id,
+        })
+        self.assertEqual(self._meeting_lines().project_id, self.project)
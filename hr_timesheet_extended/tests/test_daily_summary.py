@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+from odoo.tests import tagged
+
+from .common import TimesheetExtendedCommon
+
+
+@tagged('post_install', '-at_install')
+class TestDailySummary(TimesheetExtendedCommon):
+
+    def setUp(self):
+        super().setUp()
+        self._create_contract(self.employee, self.monday - timedelta(days=30))
+
+    def _summary(self, day):
+        return self.env['hr.timesheet.daily.summary'].search([
+            ('employee_id', '=', self.employee.id),
+            ('date', '=', day),
+        ])
+
+    def test_working_day_line(self):
+        self._create_line(self.employee, self.monday, 6.0)
+        self._create_line(self.employee, self.monday, 4.0)
+        summary = self._summary(self.monday)
+        self.assertEqual(summary.worked_hours, 10.0)
+        self.assertEqual(summary.expected_hours, 8.0)
+        self.assertEqual(summary.overtime_hours, 2.0)
+        self.assertEqual(summary.line_count, 2)
+
+    def test_weekend_line_expects_no_hours(self):
+        saturday = self.monday + timedelta(days=5)
+        self._create_line(self.employee, saturday, 3.0)
+        summary = self._summary(saturday)
+        self.assertEqual(summary.expected_hours, 0.0)
+        self.assertEqual(summary.overtime_hours, 3.0)
+
+    def test_holiday_line_expects_no_hours(self):
+        self.env['resource.calendar.leaves'].create({
+            'name': 'Public Holiday',
+            'calendar_id': self.calendar.id,
+            'date_from': datetime(2024, 1, 1, 0, 0),
+            'date_to': datetime(2024, 1, 1, 23, 59, 59),
+        })
+        self._create_line(self.employee, self.monday, 2.0)
+        summary = self._summary(self.monday)
+        self.assertEqual(summary.expected_hours, 0.0)
+        # The time off entries generated for the holiday, if any, are worked hours of the day too
+        self.assertEqual(summary.overtime_hours, summary.worked_hours)
+        self.assertGreaterEqual(summary.worked_hours, 2.0)
+
+    def test_days_without_lines(self):
+        approval = self.env['hr.timesheet.approval'].create({
+            'employee_id': self.employee.id,
+            'date_start': self.monday,
+            'date_end': self.monday + timedelta(days=6),
+        })
+        tuesday = self.monday + timedelta(days=1)
+        self.assertEqual(self._summary(tuesday).expected_hours, 8.0)
+        self.assertEqual(self._summary(tuesday).worked_hours, 0.0)
+        self.assertFalse(self._summary(self.monday + timedelta(days=5)))
+        self.assertEqual(sum(self.env['hr.timesheet.daily.summary'].search([
+            ('employee_id', '=', self.employee.id),
+            ('date', '>=', approval.date_start),
+            ('date', '<=', approval.date_end),
+        ]).mapped('expected_hours')), approval.minimum_hours)
+
+    def test_deleting_the_last_line_keeps_the_expected_hours(self):
+        line = self._create_line(self.employee, self.monday, 10.0)
+        line.unlink()
+        summary = self._summary(self.monday)
+        self.assertEqual(summary.worked_hours, 0.0)
+        self.assertEqual(summary.expected_hours, 8.0)
+        self.assertEqual(summary.line_count, 0)
+
+    def test_rebuild_matches_the_incremental_rows(self):
+        saturday = self.monday + timedelta(days=5)
+        self._create_line(self.employee, self.monday, 10.0)
+        self._create_line(self.employee, saturday, 3.0)
+        Summary = self.env['hr.timesheet.daily.summary']
+        fields = ['date', 'worked_hours', 'expected_hours', 'overtime_hours', 'line_count']
+        domain = [('employee_id', '=', self.employee.id)]
+        before = Summary.search_read(domain, fields, order='date')
+        Summary._rebuild_all()
+        after = Summary.search_read(domain, fields, order='date')
+        self.assertEqual([dict(row, id=0) for row in before], [dict(row, id=0) for row in after])
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from odoo.tests import tagged
+
+from .common import TimesheetExtendedCommon
+
+
+@tagged('post_install', '-at_install')
+class TestExpectedHours(TimesheetExtendedCommon):
+
+    def _cached_days(self):
+        return set(self.env['hr.timesheet.expected.hours'].search(
+            [('calendar_id', '=', self.calendar.id)]).mapped('date'))
+
+    def test_expected_hours_are_cached(self):
+        ExpectedHours = self.env['hr.timesheet.expected.hours']
+        sunday = self.monday + timedelta(days=6)
+        hours = ExpectedHours._get_expected_hours(self.calendar, self.monday, sunday)
+        self.assertEqual(hours[self.monday], 8.0)
+        self.assertEqual(hours[sunday], 0.0)
+        self.assertEqual(len(self._cached_days()), 7)
+
+    def test_calendar_leave_invalidates_its_days(self):
+        ExpectedHours = self.env['hr.timesheet.expected.hours']
+        tuesday = self.monday + timedelta(days=1)
+        ExpectedHours._get_expected_hours(self.calendar, self.monday, self.monday + timedelta(days=6))
+
+        self.env['resource.calendar.leaves'].create({
+            'name': 'Public Holiday',
+            'calendar_id': self.calendar.id,
+            'date_from': datetime(2024, 1, 1, 0, 0),
+            'date_to': datetime(2024, 1, 1, 23, 59, 59),
+        })
+        self.assertNotIn(self.monday, self._cached_days())
+        self.assertIn(tuesday, self._cached_days())
+        hours = ExpectedHours._get_expected_hours(self.calendar, self.monday, self.monday)
+        self.assertEqual(hours[self.monday], 0.0)
+
+    def test_resource_leave_keeps_the_cache(self):
+        ExpectedHours = self.env['hr.timesheet.expected.hours']
+        ExpectedHours._get_expected_hours(self.calendar, self.monday, self.monday + timedelta(days=6))
+
+        self.env['resource.calendar.leaves'].create({
+            'name': 'Time Off',
+            'calendar_id': self.calendar.id,
+            'resource_id': self.employee.resource_id.id,
+            'date_from': datetime(2024, 1, 2, 0, 0),
+            'date_to': datetime(2024, 1, 2, 23, 59, 59),
+        })
+        self.assertEqual(len(self._cached_days()), 7)
+
+    def test_attendance_change_invalidates_the_calendar(self):
+        ExpectedHours = self.env['hr.timesheet.expected.hours']
+        ExpectedHours._get_expected_hours(self.calendar, self.monday, self.monday + timedelta(days=6))
+
+        self.calendar.attendance_ids.filtered(lambda attendance: attendance.dayofweek == '0').unlink()
+        self.assertFalse(self._cached_days())
+        hours = ExpectedHours._get_expected_hours(self.calendar, self.monday, self.monday)
+        self.assertEqual(hours[self.monday], 0.0)
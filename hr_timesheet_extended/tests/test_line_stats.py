@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+from odoo.tests import tagged
+
+from .common import TimesheetExtendedCommon
+
+
+@tagged('post_install', '-at_install')
+class TestLineStats(TimesheetExtendedCommon):
+
+    def setUp(self):
+        super().setUp()
+        Approval = self.env['hr.timesheet.approval']
+        sunday = self.monday + timedelta(days=6)
+        self.approval = Approval.create({'employee_id': self.employee.id, 'date_start': self.monday,
+                                         'date_end': sunday})
+        self.empty_approval = Approval.create({'employee_id': self.other_employee.id, 'date_start': self.monday,
+                                               'date_end': sunday})
+        # The new lines join the draft approval covering their day
+        self.lines = self.env['account.analytic.line']
+        for day in range(3):
+            self.lines |= self._create_line(self.employee, self.monday + timedelta(days=day))
+
+    def _create_global_leave(self):
+        # On a calendar of its own, so that no time off timesheets are generated for the employees
+        calendar = self.env['resource.calendar'].create({'name': 'Line Stats Calendar', 'tz': 'UTC'})
+        return self.env['resource.calendar.leaves'].create({
+            'name': 'Holiday',
+            'calendar_id': calendar.id,
+            'date_from': datetime(2024, 1, 1),
+            'date_to': datetime(2024, 1, 1, 23, 59, 59),
+        })
+
+    def test_counts_lines(self):
+        self.assertEqual(self.approval.timesheet_line_ids, self.lines)
+        self.assertEqual(self.approval.line_count, 3)
+        self.assertEqual(self.approval.timeoff_line_count, 0)
+        self.assertEqual(self.approval.validated_line_count, 0)
+        self.assertFalse(self.approval.has_timeoff_entries)
+        self.assertFalse(self.approval.has_validated_entries)
+
+    def test_approval_without_lines(self):
+        self.assertEqual(self.empty_approval.line_count, 0)
+        self.assertFalse(self.empty_approval.has_timeoff_entries)
+        self.assertFalse(self.empty_approval.has_validated_entries)
+
+    def test_counts_validated_and_timeoff_lines(self):
+        self.lines[0].sudo().validated = True
+        self.lines[1].sudo().global_leave_id = self._create_global_leave()
+
+        self.assertEqual(self.approval.line_count, 3)
+        self.assertEqual(self.approval.validated_line_count, 1)
+        self.assertEqual(self.approval.timeoff_line_count, 1)
+        self.assertTrue(self.approval.has_validated_entries)
+        self.assertTrue(self.approval.has_timeoff_entries)
+
+    def test_moving_lines_updates_both_approvals(self):
+        self.lines[0].sudo().validated = True
+        self.lines[:2].with_context(skip_timesheet_validation=True).write({
+            'timesheet_approval_id': self.empty_approval.id,
+        })
+
+        self.assertEqual(self.approval.line_count, 1)
+        self.assertFalse(self.approval.has_validated_entries)
+        self.assertEqual(self.empty_approval.line_count, 2)
+        self.assertEqual(self.empty_approval.validated_line_count, 1)
+
+    def test_new_record_counts_from_the_cache(self):
+        self.lines[0].sudo().validated = True
+        approval = self.env['hr.timesheet.approval'].new({
+            'employee_id': self.employee.id,
+            'timesheet_line_ids': [(6, 0, self.lines.ids)],
+        })
+        self.assertEqual(approval.line_count, 3)
+        self.assertEqual(approval.validated_line_count, 1)
+        self.assertTrue(approval.has_validated_entries)
+        self.assertFalse(approval.has_timeoff_entries)
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from odoo.tests import tagged
+
+from .common import TimesheetExtendedCommon
+
+
+@tagged('post_install', '-at_install')
+class TestMinimumHours(TimesheetExtendedCommon):
+
+    def _day_hours(self, employee):
+        period = (employee.id, self.monday, self.monday + timedelta(days=6))
+        return self.env['hr.timesheet.approval']._get_period_day_hours([period])[period]
+
+    def test_no_contract_assumes_standard_weekdays(self):
+        day_hours = self._day_hours(self.employee)
+        self.assertEqual(sum(day_hours.values()), 40.0)
+        self.assertEqual(day_hours[self.monday + timedelta(days=5)], 0.0)
+
+    def test_contract_covering_the_period(self):
+        self._create_contract(self.employee, self.monday - timedelta(days=30))
+        self.assertEqual(sum(self._day_hours(self.employee).values()), 40.0)
+
+    def test_hire_during_the_period(self):
+        wednesday = self.monday + timedelta(days=2)
+        self._create_contract(self.employee, wednesday)
+        day_hours = self._day_hours(self.employee)
+        self.assertEqual(day_hours[self.monday], 0.0)
+        self.assertEqual(day_hours[self.monday + timedelta(days=1)], 0.0)
+        self.assertEqual(day_hours[wednesday], 8.0)
+        self.assertEqual(sum(day_hours.values()), 24.0)
+
+    def test_contract_outside_the_period(self):
+        self._create_contract(self.employee, self.monday + timedelta(days=30))
+        self.assertEqual(sum(self._day_hours(self.employee).values()), 0.0)
+
+    def test_approval_minimum_hours(self):
+        self._create_contract(self.employee, self.monday + timedelta(days=2))
+        approval = self.env['hr.timesheet.approval'].create({
+            'employee_id': self.employee.id,
+            'date_start': self.monday,
+            'date_end': self.monday + timedelta(days=6),
+        })
+        self.assertEqual(approval.minimum_hours, 24.0)
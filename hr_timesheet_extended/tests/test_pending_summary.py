@@ -0,0 +1,84 @@
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo.tests import tagged
+
+from odoo.addons.hr_timesheet_extended.models.hr_timesheet_approval import (
+    PENDING_SUMMARY_INVALIDATION_KEY, PENDING_SUMMARY_SEQUENCE)
+
+from .common import SIGNATURE, TimesheetExtendedCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPendingSummary(TimesheetExtendedCommon):
+
+    def setUp(self):
+        super().setUp()
+        self.Approval = self.env['hr.timesheet.approval']
+        self.approvals = self.Approval.create([{
+            'employee_id': employee.id,
+            'date_start': self.monday,
+            'date_end': self.monday + timedelta(days=6),
+            'employee_signature': SIGNATURE,
+        } for employee in (self.employee, self.other_employee)])
+        self.env.registry.clear_cache()
+
+    @contextmanager
+    def _count_computes(self):
+        # Frozen clock, so that the cache time slot does not change during the test
+        with patch('odoo.addons.hr_timesheet_extended.models.hr_timesheet_approval.time') as clock, \
+                patch.object(type(self.Approval), '_compute_pending_summary', autospec=True,
+                             side_effect=lambda model: {'stages': []}) as compute:
+            clock.time.return_value = 1700000000.0
+            yield compute
+
+    def _get_invalidation_callbacks(self):
+        return [func for func in self.env.cr.postcommit._funcs
+                if getattr(func, '__name__', None) == '_invalidate_pending_summary']
+
+    def _bump_generation(self):
+        """Do what the postcommit callback does, without opening another cursor"""
+        self.env.cr.execute("SELECT nextval(%s)", [PENDING_SUMMARY_SEQUENCE])
+
+    def test_summary_is_cached_per_user(self):
+        with self._count_computes() as compute:
+            self.Approval.with_user(self.manager_user)._get_pending_summary()
+            self.Approval.with_user(self.manager_user)._get_pending_summary()
+            self.assertEqual(compute.call_count, 1)
+            self.Approval.with_user(self.user)._get_pending_summary()
+            self.assertEqual(compute.call_count, 2)
+
+    def test_committed_state_change_expires_the_summary(self):
+        Approval = self.Approval.with_user(self.manager_user)
+        with self._count_computes() as compute:
+            Approval._get_pending_summary()
+            self._bump_generation()
+            Approval._get_pending_summary()
+            self.assertEqual(compute.call_count, 2)
+
+    def test_invalidation_is_scheduled_once_per_transaction(self):
+        self.env.cr.postcommit.clear()
+        self.approvals.action_submit()
+        self.assertEqual(set(self.approvals.mapped('state')), {'submitted'})
+        self.approvals[0].action_reset_to_draft()
+        self.approvals[0].write({'state': 'submitted'})
+        self.assertEqual(len(self._get_invalidation_callbacks()), 1)
+        self.assertTrue(self.env.cr.postcommit.data.get(PENDING_SUMMARY_INVALIDATION_KEY))
+
+        # The next transaction schedules it again
+        self.env.cr.postcommit.clear()
+        self.approvals[0].action_reset_to_draft()
+        self.assertEqual(len(self._get_invalidation_callbacks()), 1)
+
+    def test_other_writes_schedule_nothing(self):
+        self.env.cr.postcommit.clear()
+        self.approvals.write({'date_end': self.monday + timedelta(days=5)})
+        self.assertFalse(self._get_invalidation_callbacks())
+
+    def test_summary_counts_waiting_approvals(self):
+        self.approvals.action_submit()
+        summary = self.Approval.with_user(self.manager_user)._compute_pending_summary()
+        stage = next(stage for stage in summary['stages'] if stage['state'] == 'submitted')
+        self.assertEqual(stage['count'], 2)
+        self.assertFalse(self.Approval.with_user(self.other_user)._compute_pending_summary()['stages'])
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from odoo.tests import tagged
+
+from .common import TimesheetExtendedCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPeriodClose(TimesheetExtendedCommon):
+
+    def setUp(self):
+        super().setUp()
+        self.sunday = self.monday + timedelta(days=6)
+        self.lines = self._create_line(self.employee, self.monday) | self._create_line(self.employee, self.sunday)
+        self.other_lines = self._create_line(self.other_employee, self.monday + timedelta(days=1))
+
+    def _generate(self, auto_submit=False):
+        return self.env['hr.timesheet.approval']._generate_period_approvals(
+            self.monday, self.sunday, auto_submit=auto_submit)
+
+    def test_generate_links_the_lines(self):
+        approvals = self._generate()
+        self.assertEqual(approvals.employee_id, self.employee | self.other_employee)
+        self.assertEqual(set(approvals.mapped('state')), {'draft'})
+        approval = approvals.filtered(lambda a: a.employee_id == self.employee)
+        self.assertEqual(approval.timesheet_line_ids, self.lines)
+        self.assertEqual(approval.total_hours, 16.0)
+        self.assertEqual(approval.line_count, 2)
+        self.assertFalse(approval._has_signature('employee_signature'))
+
+    def test_generate_again_creates_nothing(self):
+        self._generate()
+        self.assertFalse(self._generate())
+
+    def test_auto_submit_signs_only_opted_in_employees(self):
+        source = self._store_signature(self.user)
+        self.user.timesheet_auto_submit = True
+        # A stored signature without the opt-in is never used
+        self._store_signature(self.other_user)
+
+        approvals = self._generate(auto_submit=True)
+
+        approval = approvals.filtered(lambda a: a.employee_id == self.employee)
+        self.assertEqual(approval.state, 'submitted')
+        self.assertEqual(self._get_signature_attachment(approval, 'employee_signature').raw, source.raw)
+        other_approval = approvals - approval
+        self.assertEqual(other_approval.state, 'draft')
+        self.assertFalse(self._get_signature_attachment(other_approval, 'employee_signature'))
+
+    def test_auto_submit_without_signature_stays_draft(self):
+        self.user.timesheet_auto_submit = True
+        approval = self._generate(auto_submit=True).filtered(lambda a: a.employee_id == self.employee)
+        self.assertEqual(approval.state, 'draft')
+        self.assertFalse(self._get_signature_attachment(approval, 'employee_signature'))
+
+    def test_auto_submit_replaces_empty_signature(self):
+        source = self._store_signature(self.user)
+        self.user.timesheet_auto_submit = True
+        approval = self.env['hr.timesheet.approval'].create({
+            'employee_id': self.employee.id,
+            'date_start': self.monday,
+            'date_end': self.sunday,
+        })
+        # An attachment without content, as left by a failed copy
+        self.env['ir.attachment'].create({
+            'name': 'employee_signature',
+            'res_model': approval._name,
+            'res_field': 'employee_signature',
+            'res_id': approval.id,
+            'raw': b'',
+        })
+        self.assertEqual(approval._sign_with_employee_signatures(), approval)
+        self.assertEqual(self._get_signature_attachment(approval, 'employee_signature').raw, source.raw)
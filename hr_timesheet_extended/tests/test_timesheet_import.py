@@ -0,0 +1,53 @@
+from odoo.tests import tagged
+
+from .common import TimesheetExtendedCommon
+
+
+@tagged('post_install', '-at_install')
+class TestTimesheetImport(TimesheetExtendedCommon):
+
+    def _row(self, **values):
+        row = {
+            'employee_id': self.employee.id,
+            'project_id': self.project.id,
+            'date': '2024-01-02',
+            'unit_amount': 2.0,
+            'name': 'Imported work',
+        }
+        row.update(values)
+        return row
+
+    def test_import_reports_each_row(self):
+        Project = self.env['project.project']
+        Project.create([{'name': 'Duplicated Project', 'allow_timesheets': True}] * 2)
+
+        results = self.env['account.analytic.line'].import_timesheet_rows([
+            self._row(),
+            'not a row',
+            self._row(employee_id=[self.employee.id]),
+            self._row(project_id=False, project='Duplicated Project'),
+            self._row(unit_amount=30),
+            self._row(project_id=False, project='Unknown Project'),
+        ])
+
+        self.assertEqual([result['index'] for result in results], list(range(6)))
+        self.assertEqual([result['status'] for result in results],
+                         ['created', 'error', 'error', 'error', 'error', 'error'])
+
+        line = self.env['account.analytic.line'].browse(results[0]['id'])
+        self.assertEqual(line.employee_id, self.employee)
+        self.assertEqual(line.project_id, self.project)
+        self.assertEqual(line.unit_amount, 2.0)
+
+        self.assertIn('dictionary', results[1]['error'])
+        self.assertIn('employee_id', results[2]['error'])
+        self.assertIn('Ambiguous', results[3]['error'])
+        self.assertIn('24', results[4]['error'])
+        self.assertIn('Unknown project', results[5]['error'])
+
+    def test_import_by_unique_project_name(self):
+        results = self.env['account.analytic.line'].import_timesheet_rows([
+            self._row(project_id=False, project=self.project.name),
+        ])
+        self.assertEqual(results[0]['status'], 'created', results[0]['error'])
+        self.assertEqual(self.env['account.analytic.line'].browse(results[0]['id']).project_id, self.project)
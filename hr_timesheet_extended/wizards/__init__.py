@@ -1,2 +1,4 @@
 from . import hr_timesheet_rejection_wizard
 from . import hr_timesheet_to_payroll_wizard
+from . import hr_timesheet_approval_export_wizard
+from . import hr_timesheet_period_close_wizard
@@ -0,0 +1,231 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+import csv
+import hashlib
+import io
+import logging
+import os
+import shutil
+import tempfile
+import xlsxwriter
+
+_logger = logging.getLogger(__name__)
+
+# Rows of an XLSX worksheet, header included: further rows go to an additional sheet
+XLSX_MAX_ROWS = 1048576
+# Block size used to hash and copy the export file without loading it in memory
+COPY_BLOCK_SIZE = 1024 * 1024
+
+
+class HrTimesheetApprovalExportWizard(models.TransientModel):
+    _name = 'hr.timesheet.approval.export.wizard'
+    _description = 'Export Timesheet Approvals with Lines'
+
+    approval_ids = fields.Many2many('hr.timesheet.approval', string='Timesheet Approvals',
+                                    help="Leave empty to export every approval of the period.")
+    date_from = fields.Date(string='Start Date')
+    date_to = fields.Date(string='End Date')
+    file_format = fields.Selection([
+        ('xlsx', 'Excel (XLSX)'),
+        ('csv', 'CSV'),
+    ], string='Format', default='xlsx', required=True)
+    chunk_size = fields.Integer(string='Chunk Size', default=5000,
+                                help="Number of rows fetched from the database at a time.")
+    attachment_id = fields.Many2one('ir.attachment', string='Export File', readonly=True)
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super(HrTimesheetApprovalExportWizard, self).default_get(fields_list)
+        if self.env.context.get('active_model') == 'hr.timesheet.approval' and self.env.context.get('active_ids'):
+            res['approval_ids'] = [(6, 0, self.env.context['active_ids'])]
+        return res
+
+    def _get_export_header(self):
+        return [
+            _('Approval'), _('Employee'), _('Department'), _('Period Start'), _('Period End'),
+            _('Approval Status'), _('Total Hours'), _('Minimum Hours'), _('Overtime Hours'),
+            _('Submitted On'), _('Manager Approved On'), _('CEO Approved On'), _('HR Approved On'),
+            _('Rejected On'), _('Date'), _('Project'), _('Task'), _('Description'), _('Hours'),
+            _('Entry Status'),
+        ]
+
+    def _get_approval_ids(self):
+        """Return the ids of the approvals to export that the current user may read"""
+        self.ensure_one()
+        if self.approval_ids:
+            return self.approval_ids._filter_access_rules('read').ids
+        domain = []
+        if self.date_from:
+            domain.append(('date_end', '>=', self.date_from))
+        if self.date_to:
+            domain.append(('date_start', '<=', self.date_to))
+        return self.env['hr.timesheet.approval'].search(domain, order='id').ids
+
+    def _iter_chunks(self, approval_ids):
+        """
+        Yield the export rows in chunks of ``chunk_size``, paginating on
+        (approval id, line id) so that every chunk is an index range scan and
+        no chunk depends on the size of the previous ones.
+        """
+        self.env['hr.timesheet.approval'].flush_model()
+        self.env['account.analytic.line'].flush_model()
+        last_key = (0, 0)
+        while True:
+            self.env.cr.execute("""
+                SELECT a.id, COALESCE(l.id, 0), a.name, a.employee_id, a.department_id, a.date_start,
+                       a.date_end, a.state, a.total_hours, a.minimum_hours, a.overtime_hours,
+                       a.submitted_date, a.manager_approval_date, a.ceo_approval_date, a.hr_approval_date,
+                       a.rejection_date, l.date, l.project_id, l.task_id, l.name, l.unit_amount, l.state
+                  FROM hr_timesheet_approval a
+             LEFT JOIN account_analytic_line l ON l.timesheet_approval_id = a.id
+                 WHERE a.id = ANY(%s)
+                   AND (a.id, COALESCE(l.id, 0)) > (%s, %s)
+              ORDER BY a.id, COALESCE(l.id, 0)
+                 LIMIT %s
+            """, (approval_ids, last_key[0], last_key[1], max(self.chunk_size, 1)))
+            rows = self.env.cr.fetchall()
+            if not rows:
+                return
+            last_key = rows[-1][:2]
+            yield self._format_rows(rows)
+            # Names resolved for this chunk are not needed by the next one
+            self.env.invalidate_all()
+
+    def _format_rows(self, rows):
+        """Turn raw rows into export rows, resolving the names of the chunk in bulk"""
+        names = {}
+        for model, index in (('hr.employee', 3), ('hr.department', 4), ('project.project', 17),
+                             ('project.task', 18)):
+            ids = list({row[index] for row in rows if row[index]})
+            names[index] = {record.id: record.display_name for record in self.env[model].sudo().browse(ids)}
+
+        approval_states = dict(self.env['hr.timesheet.approval']._fields['state']._description_selection(self.env))
+        line_states = dict(self.env['account.analytic.line']._fields['state']._description_selection(self.env))
+        result = []
+        for row in rows:
+            result.append([
+                row[2],
+                names[3].get(row[3], ''),
+                names[4].get(row[4], ''),
+                row[5], row[6],
+                approval_states.get(row[7], row[7] or ''),
+                row[8] or 0.0, row[9] or 0.0, row[10] or 0.0,
+                row[11], row[12], row[13], row[14], row[15],
+                row[16],
+                names[17].get(row[17], ''),
+                names[18].get(row[18], ''),
+                row[19] or '',
+                row[20] or 0.0,
+                line_states.get(row[21], row[21] or ''),
+            ])
+        return result
+
+    def _write_csv(self, output, approval_ids):
+        text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+        writer = csv.writer(text)
+        writer.writerow(self._get_export_header())
+        count = 0
+        for rows in self._iter_chunks(approval_ids):
+            writer.writerows([['' if value is None else value for value in row] for row in rows])
+            count += len(rows)
+        text.flush()
+        text.detach()
+        return count
+
+    def _write_xlsx(self, output, approval_ids):
+        # constant_memory flushes every row to disk as soon as the next one starts
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+        bold = workbook.add_format({'bold': True})
+        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+        datetime_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm'})
+        formats = {3: date_format, 4: date_format, 9: datetime_format, 10: datetime_format,
+                   11: datetime_format, 12: datetime_format, 13: datetime_format, 14: date_format}
+        header = self._get_export_header()
+        sheet_count = 0
+        sheet_row = XLSX_MAX_ROWS
+        count = 0
+        for rows in self._iter_chunks(approval_ids):
+            for row in rows:
+                if sheet_row >= XLSX_MAX_ROWS:
+                    # The sheet is full: go on with a new one instead of losing rows
+                    sheet_count += 1
+                    name = _('Timesheet Approvals')
+                    sheet = workbook.add_worksheet(name if sheet_count == 1 else '%s (%s)' % (name, sheet_count))
+                    sheet.write_row(0, 0, header, bold)
+                    sheet_row = 1
+                for column, value in enumerate(row):
+                    if value is None or value is False:
+                        continue
+                    if column in formats:
+                        sheet.write_datetime(sheet_row, column, value, formats[column])
+                    else:
+                        sheet.write(sheet_row, column, value)
+                sheet_row += 1
+                count += 1
+        workbook.close()
+        return count
+
+    def _create_export_attachment(self, output, vals):
+        """
+        Store the ``output`` file as an attachment without loading it in memory:
+        the file is hashed and copied to the filestore block by block, then the
+        attachment is pointed at the copy (``ir.attachment.create()`` only takes
+        the content itself). With database storage the content has to go
+        through memory.
+        """
+        Attachment = self.env['ir.attachment']
+        output.seek(0)
+        if Attachment._storage() != 'file':
+            return Attachment.create(dict(vals, raw=output.read()))
+
+        sha = hashlib.sha1()
+        for block in iter(lambda: output.read(COPY_BLOCK_SIZE), b''):
+            sha.update(block)
+        checksum = sha.hexdigest()
+        file_size = output.tell()
+        fname = '%s/%s' % (checksum[:2], checksum)
+        full_path = Attachment._full_path(fname)
+        if not os.path.exists(full_path):
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            output.seek(0)
+            with open(full_path, 'wb') as target:
+                shutil.copyfileobj(output, target, COPY_BLOCK_SIZE)
+            # Removed by the filestore garbage collector if no attachment ends up using it
+            Attachment._mark_for_gc(fname)
+
+        attachment = Attachment.create(vals)
+        self.env.cr.execute("""
+            UPDATE ir_attachment
+               SET store_fname = %s, checksum = %s, file_size = %s, db_datas = NULL
+             WHERE id = %s
+        """, (fname, checksum, file_size, attachment.id))
+        attachment.invalidate_recordset()
+        return attachment
+
+    def action_export(self):
+        """Write the export file chunk by chunk to a temporary file, then store it as an attachment"""
+        self.ensure_one()
+        approval_ids = self._get_approval_ids()
+        if not approval_ids:
+            raise UserError(_("There are no timesheet approvals to export."))
+
+        with tempfile.TemporaryFile() as output:
+            if self.file_format == 'csv':
+                count = self._write_csv(output, approval_ids)
+                mimetype = 'text/csv'
+            else:
+                count = self._write_xlsx(output, approval_ids)
+                mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            self.attachment_id = self._create_export_attachment(output, {
+                'name': 'timesheet_approvals_%s.%s' % (fields.Date.today(), self.file_format),
+                'mimetype': mimetype,
+                'res_model': self._name,
+                'res_id': self.id,
+            })
+        _logger.info("Exported %s rows of %s timesheet approvals", count, len(approval_ids))
+
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/web/content/%s?download=true' % self.attachment_id.id,
+            'target': 'self',
+        }
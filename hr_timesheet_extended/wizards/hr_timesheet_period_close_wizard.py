@@ -0,0 +1,46 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+
+class HrTimesheetPeriodCloseWizard(models.TransientModel):
+    _name = 'hr.timesheet.period.close.wizard'
+    _description = 'Close a Timesheet Period'
+
+    period = fields.Selection([
+        ('week', 'Week'),
+        ('month', 'Month'),
+    ], string='Period', default='week', required=True)
+    date_anchor = fields.Date(string='Any Day of the Period', required=True,
+                              default=fields.Date.context_today)
+    date_start = fields.Date(string='Start Date', compute='_compute_period_bounds')
+    date_end = fields.Date(string='End Date', compute='_compute_period_bounds')
+    auto_submit = fields.Boolean(string='Submit Approvals',
+                                 help="Submit the new approvals to the managers. Only the employees who "
+                                      "chose so in their preferences are signed for with their stored "
+                                      "signature; the other approvals stay in draft.")
+
+    @api.depends('period', 'date_anchor')
+    def _compute_period_bounds(self):
+        Approval = self.env['hr.timesheet.approval']
+        for wizard in self:
+            if wizard.date_anchor:
+                wizard.date_start, wizard.date_end = Approval._get_period_bounds(wizard.date_anchor, wizard.period)
+            else:
+                wizard.date_start = wizard.date_end = False
+
+    def action_close_period(self):
+        """Generate the missing approvals of the period for all employees"""
+        self.ensure_one()
+        approvals = self.env['hr.timesheet.approval']._generate_period_approvals(
+            self.date_start, self.date_end, auto_submit=self.auto_submit)
+        if not approvals:
+            raise UserError(_("Every employee with draft timesheet entries from %s to %s already has an approval.")
+                            % (self.date_start, self.date_end))
+        return {
+            'name': _('Generated Timesheet Approvals'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'hr.timesheet.approval',
+            'view_mode': 'tree,form',
+            'domain': [('id', 'in', approvals.ids)],
+            'target': 'current',
+        }
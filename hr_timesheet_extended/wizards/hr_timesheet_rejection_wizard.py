@@ -52,11 +52,10 @@ class HrTimesheetRejectionWizard(models.TransientModel):
             }
         elif self.timesheet_ids:
             # Reject individual timesheet entries
-            for timesheet in self.timesheet_ids:
-                if timesheet.state in ['draft', 'hr_approved']:
-                    raise UserError(_("Cannot reject timesheet that is in draft or already approved by HR."))
+            if any(timesheet.state in ['draft', 'hr_approved'] for timesheet in self.timesheet_ids):
+                raise UserError(_("Cannot reject timesheet that is in draft or already approved by HR."))
 
-                timesheet.action_reject(self.rejection_reason)
+            self.timesheet_ids.action_reject(self.rejection_reason)
 
             # Show a success message
             return {
@@ -1,5 +1,6 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
+from collections import defaultdict
 
 
 class HrTimesheetToPayrollWizard(models.TransientModel):
@@ -14,6 +15,15 @@ class HrTimesheetToPayrollWizard(models.TransientModel):
     date_to = fields.Date(string='End Date', required=True)
     batch_name = fields.Char(string='Batch Name', required=True,
                              default=lambda self: f'Batch {fields.Date.today()}')
+    compute_chunk_size = fields.Integer(string='Compute Chunk Size', default=100,
+                                        help="Number of payslips computed together before the record cache is released.")
+    compute_mode = fields.Selection([
+        ('serial', 'In this request'),
+        ('parallel', 'In parallel shards'),
+    ], string='Compute Payslips', default='serial', required=True,
+        help="Parallel shards are computed by separate scheduled actions, so that multi-worker "
+             "servers can compute large batches on several cores.")
+    shard_count = fields.Integer(string='Number of Shards', default=4)
 
     # Computed fields
     employee_count = fields.Integer(string='Number of Employees', compute='_compute_employee_count')
@@ -85,20 +95,8 @@ class HrTimesheetToPayrollWizard(models.TransientModel):
 
         # Verify all employees have active contracts
         employees = self.timesheet_approval_ids.mapped('employee_id')
-        employees_without_contracts = []
-
-        for employee in employees:
-            contract = self.env['hr.contract'].search([
-                ('employee_id', '=', employee.id),
-                ('state', '=', 'open'),
-                ('date_start', '<=', self.date_to),
-                '|',
-                ('date_end', '>=', self.date_from),
-                ('date_end', '=', False)
-            ], limit=1)
-
-            if not contract:
-                employees_without_contracts.append(employee.name)
+        contracts = self._get_employee_contracts(employees)
+        employees_without_contracts = [employee.name for employee in employees if not contracts[employee.id]]
 
         if employees_without_contracts:
             raise UserError(
@@ -111,30 +109,39 @@ class HrTimesheetToPayrollWizard(models.TransientModel):
         # Create payroll batch
         batch = self._create_payroll_batch()
 
-        # Create payslips for each employee
-        employees = self.timesheet_approval_ids.mapped('employee_id')
-        created_payslips = self.env['hr.payslip']
-
-        for employee in employees:
-            # Get the timesheet approvals for this employee
-            employee_approvals = self.timesheet_approval_ids.filtered(
-                lambda a: a.employee_id.id == employee.id)
-
-            # Sum the overtime hours for this employee
-            employee_hours = sum(employee_approvals.mapped('overtime_hours'))
+        # Group the approvals by employee in a single pass
+        approval_ids_by_employee = defaultdict(list)
+        for approval in self.timesheet_approval_ids:
+            approval_ids_by_employee[approval.employee_id].append(approval.id)
+        approvals_by_employee = {
+            employee: self.env['hr.timesheet.approval'].browse(approval_ids)
+            for employee, approval_ids in approval_ids_by_employee.items()
+        }
 
-            # Create the payslip
-            payslip = self._create_employee_payslip(employee, batch, work_entry_type, employee_hours)
-            created_payslips |= payslip
+        # Create all payslips with their worked days at once
+        employee_hours = {
+            employee: sum(approvals.mapped('overtime_hours'))
+            for employee, approvals in approvals_by_employee.items()
+        }
+        payslips = self._create_employee_payslips(batch, work_entry_type, employee_hours, contracts)
 
-            # Link the payslip to the timesheet approvals
-            employee_approvals.write({
-                'payslip_id': payslip.id,
+        # Link the payslips to the timesheet approvals
+        for employee, approvals in approvals_by_employee.items():
+            approvals.write({
+                'payslip_id': payslips[employee.id].id,
                 'work_entry_type_id': work_entry_type.id,
                 'payroll_batch_id': batch.id,
                 'payroll_processed': True
             })
 
+        # Compute the payslips without regenerating the worked days
+        payslips = self.env['hr.payslip'].concat(*payslips.values())
+        if self.compute_mode == 'parallel':
+            self.env['hr.timesheet.payroll.shard']._create_shards(
+                batch, payslips, self.shard_count, chunk_size=self.compute_chunk_size)
+        else:
+            self._compute_payslip_sheets(payslips)
+
         # Return an action to view the batch
         return {
             'name': _('Payroll Batch'),
@@ -147,26 +154,42 @@ class HrTimesheetToPayrollWizard(models.TransientModel):
             'flags': {'initial_mode': 'edit'},
         }
 
-    def _create_employee_payslip(self, employee, batch, work_entry_type, hours):
-        """Create a payslip for an employee"""
-        Payslip = self.env['hr.payslip']
-
-        # Find active contract for the employee
-        contract = self.env['hr.contract'].search([
-            ('employee_id', '=', employee.id),
-            ('state', '=', 'open'),
-            ('date_start', '<=', self.date_to),
-            '|',
-            ('date_end', '>=', self.date_from),
-            ('date_end', '=', False)
-        ], limit=1)
+    def _get_employee_contracts(self, employees):
+        """Return {employee_id: contract} of the open contracts in the wizard period, resolved in one query"""
+        contracts = self.env['hr.contract']._get_open_contracts_batch(
+            (employee.id, self.date_from, self.date_to) for employee in employees)
+        return {
+            employee.id: contracts.get((employee.id, self.date_from, self.date_to), self.env['hr.contract'])[:1]
+            for employee in employees
+        }
 
-        if not contract:
+    def _create_employee_payslips(self, batch, work_entry_type, employee_hours, contracts):
+        """
+        Create the payslips and their worked days lines of many employees with
+        one create call per model.
+
+        :param employee_hours: dict mapping ``hr.employee`` records to their overtime hours
+        :param contracts: dict mapping employee ids to their contract
+        :return: dict mapping employee ids to their new payslip
+        """
+        missing = [employee.name for employee in employee_hours if not contracts.get(employee.id)]
+        if missing:
             raise UserError(
-                _("No active contract found for employee %s. Create a contract for this employee first.") % employee.name)
-
-        # Create a new payslip with the contract
-        payslip = Payslip.create({
+                _("No active contract found for employee %s. Create a contract for this employee first.") % ", ".join(
+                    missing))
+
+        employees = list(employee_hours)
+        payslips = self.env['hr.payslip'].create([
+            self._prepare_payslip_vals(employee, batch, contracts[employee.id]) for employee in employees
+        ])
+        self.env['hr.payslip.worked_days'].create([
+            self._prepare_worked_days_vals(payslip, work_entry_type, employee_hours[employee])
+            for employee, payslip in zip(employees, payslips)
+        ])
+        return {employee.id: payslip for employee, payslip in zip(employees, payslips)}
+
+    def _prepare_payslip_vals(self, employee, batch, contract):
+        return {
             'name': f"{employee.name} - {batch.name}",
             'employee_id': employee.id,
             'date_from': self.date_from,
@@ -177,22 +200,25 @@ class HrTimesheetToPayrollWizard(models.TransientModel):
             'contract_id': contract.id,
             # Impedir que se generen días trabajados automáticamente
             'worked_days_line_ids': False,
-        })
+        }
 
-        # Create worked days line for the work entry type
-        self.env['hr.payslip.worked_days'].create({
+    def _prepare_worked_days_vals(self, payslip, work_entry_type, hours):
+        return {
             'payslip_id': payslip.id,
             'work_entry_type_id': work_entry_type.id,
             'number_of_days': hours / 8.0 if hours else 0,  # Convert hours to days (assuming 8 hours per day)
             'number_of_hours': hours,
             'amount': 0.0,  # This will be calculated by the payslip
             'code': work_entry_type.code,
-        })
-
-        # Compute the payslip without regenerating the worked days
-        payslip.with_context(salary_simulation=False).compute_sheet()
+        }
 
-        return payslip
+    def _compute_payslip_sheets(self, payslips):
+        """Compute the payslips chunk by chunk, releasing the record cache between chunks"""
+        chunk_size = max(self.compute_chunk_size, 1)
+        for index in range(0, len(payslips), chunk_size):
+            payslips[index:index + chunk_size].with_context(salary_simulation=False).compute_sheet()
+            payslips.env.flush_all()
+            payslips.env.invalidate_all()
 
     def _get_or_create_work_entry_type(self):
         """Get or create the 'End to End Sprints' work entry type"""